@@ -1,17 +1,59 @@
 """Main CLI application using Typer."""
 
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+import sys
 import typer
 import logging
 
-from opensessionscribe import ProcessingPipeline, Config
-from opensessionscribe.hardware import HardwareDetector
-
 
 app = typer.Typer(name="opensessionscribe", help="Local podcast and webinar processing toolkit")
 
 
+def _get_cached_hardware() -> dict:
+    """Return the hardware summary, reusing the on-disk cache when fresh."""
+    from opensessionscribe.hardware import HardwareDetector
+    
+    return HardwareDetector.get_hardware_summary_cached()
+
+
+def _setup_logging(verbose: bool) -> None:
+    """Configure root logging once; later calls only adjust the level."""
+    log_level = logging.DEBUG if verbose else logging.INFO
+    root = logging.getLogger()
+    if root.handlers:
+        root.setLevel(log_level)
+    else:
+        logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+
+
+def _version_callback(value: bool) -> None:
+    """Print the package version and exit before any command runs."""
+    if value:
+        from opensessionscribe import __version__
+        typer.echo(f"opensessionscribe {__version__}")
+        raise typer.Exit()
+
+
+@app.callback()
+def main(
+    version: bool = typer.Option(
+        False, "--version", callback=_version_callback, is_eager=True,
+        help="Show version and exit"
+    ),
+    refresh_hardware: bool = typer.Option(
+        False, "--refresh-hardware", help="Re-detect hardware instead of using the cached summary"
+    ),
+):
+    """Local podcast and webinar processing toolkit."""
+    if refresh_hardware:
+        # Re-detect up front: the refreshed cache then serves every command,
+        # including the config that Config.auto_detect memoizes
+        from opensessionscribe.config import Config
+        
+        Config.auto_detect(refresh=True)
+
+
 @app.command()
 def process(
     url: str = typer.Argument(..., help="URL to process (YouTube, podcast, etc.)"),
@@ -26,14 +68,13 @@ def process(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose logging"),
 ):
     """Process a URL and generate transcript package."""
+    from opensessionscribe import ProcessingPipeline, Config
     
-    # Setup logging
-    log_level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+    _setup_logging(verbose)
     
     # Create config
     if whisper_model is None:
-        whisper_model = HardwareDetector.recommend_whisper_model()
+        whisper_model = _get_cached_hardware()["recommendations"]["whisper_model"]
         typer.echo(f"Auto-detected optimal Whisper model: {whisper_model}")
     
     config = Config(
@@ -50,15 +91,18 @@ def process(
     config.validate()
     
     # Run pipeline
-    pipeline = ProcessingPipeline(config)
-    
     try:
-        package = pipeline.process_url(url, output)
-        typer.echo(f"✅ Processing complete! Output saved to: {output}")
-        typer.echo(f"📄 Package: {output}/package.json")
+        with ProcessingPipeline(config) as pipeline:
+            package = pipeline.process_url(url, output)
+        lines = [
+            f"✅ Processing complete! Output saved to: {output}",
+            f"📄 Package: {output}/package.json",
+        ]
         
         if slides and package.slides:
-            typer.echo(f"🖼️  Slides: {len(package.slides)} slides extracted")
+            lines.append(f"🖼️  Slides: {len(package.slides)} slides extracted")
+        
+        typer.echo("\n".join(lines))
             
     except Exception as e:
         typer.echo(f"❌ Processing failed: {e}", err=True)
@@ -70,6 +114,7 @@ def info(
     url: str = typer.Argument(..., help="URL to get information about")
 ):
     """Get information about a URL without processing."""
+    from opensessionscribe.config import Config
     from opensessionscribe.ingest.downloader import MediaDownloader
     
     try:
@@ -79,15 +124,19 @@ def info(
         typer.echo(f"🔍 Getting information for: {url}")
         info = downloader.get_info(url)
         
-        typer.echo("\n📺 Video Information:")
-        typer.echo(f"   Title: {info.get('title', 'N/A')}")
-        typer.echo(f"   Uploader: {info.get('uploader', 'N/A')}")
-        typer.echo(f"   Duration: {info.get('duration', 0)} seconds")
-        typer.echo(f"   View count: {info.get('view_count', 'N/A')}")
+        lines = [
+            "\n📺 Video Information:",
+            f"   Title: {info.get('title', 'N/A')}",
+            f"   Uploader: {info.get('uploader', 'N/A')}",
+            f"   Duration: {info.get('duration', 0)} seconds",
+            f"   View count: {info.get('view_count', 'N/A')}",
+        ]
         
         if info.get('description'):
             desc = info['description'][:200]
-            typer.echo(f"   Description: {desc}{'...' if len(info['description']) > 200 else ''}")
+            lines.append(f"   Description: {desc}{'...' if len(info['description']) > 200 else ''}")
+        
+        typer.echo("\n".join(lines))
             
     except Exception as e:
         typer.echo(f"❌ Failed to get info: {e}", err=True)
@@ -95,27 +144,32 @@ def info(
 
 
 @app.command()
-def hardware():
+def hardware(
+    json_output: bool = typer.Option(False, "--json", help="Print the hardware summary as JSON"),
+):
     """Show system hardware information and recommendations."""
-    import json
-    
-    hardware_summary = HardwareDetector.get_hardware_summary()
+    hardware_summary = _get_cached_hardware()
     
-    typer.echo("🖥️  Hardware Information:")
-    typer.echo(f"   CPU: {hardware_summary['cpu']['cores']} cores ({hardware_summary['cpu']['architecture']})")
-    typer.echo(f"   RAM: {hardware_summary['memory']['total_gb']} GB")
+    if json_output:
+        from opensessionscribe.utils.jsonio import dumps
+        typer.echo(dumps(hardware_summary).decode("utf-8"))
+        return
     
     gpu = hardware_summary['gpu']
-    typer.echo(f"   GPU: {'Yes' if gpu['available'] else 'No'} ({gpu['type'] or 'N/A'})")
-    
-    typer.echo()
-    typer.echo("📊 Recommendations:")
     rec = hardware_summary['recommendations']
-    typer.echo(f"   Whisper model: {rec['whisper_model']}")
-    typer.echo(f"   Device: {rec['device']}")
     
-    typer.echo()
-    typer.echo("🔧 System Dependencies:")
+    lines = [
+        "🖥️  Hardware Information:",
+        f"   CPU: {hardware_summary['cpu']['cores']} cores ({hardware_summary['cpu']['architecture']})",
+        f"   RAM: {hardware_summary['memory']['total_gb']} GB",
+        f"   GPU: {'Yes' if gpu['available'] else 'No'} ({gpu['type'] or 'N/A'})",
+        "",
+        "📊 Recommendations:",
+        f"   Whisper model: {rec['whisper_model']}",
+        f"   Device: {rec['device']}",
+        "",
+        "🔧 System Dependencies:",
+    ]
     
     # Check system dependencies
     from opensessionscribe.utils.ffmpeg import FFmpegProcessor
@@ -129,35 +183,44 @@ def hardware():
     
     for name, available in deps:
         status = "✅" if available else "❌"
-        typer.echo(f"   {status} {name}")
+        lines.append(f"   {status} {name}")
     
     # Check if any dependencies missing
     missing = [name for name, available in deps if not available]
     if missing:
-        typer.echo()
-        typer.echo("⚠️  Missing dependencies. Install with:")
-        typer.echo("   macOS: ./install-deps.sh")
-        typer.echo("   Docker: ./scripts/docker-setup.sh")
+        lines.extend([
+            "",
+            "⚠️  Missing dependencies. Install with:",
+            "   macOS: ./install-deps.sh",
+            "   Docker: ./scripts/docker-setup.sh",
+        ])
+    
+    typer.echo("\n".join(lines))
 
 
 @app.command()
 def check():
     """Check system setup and dependencies."""
+    from opensessionscribe.config import Config
+    
     typer.echo("🔍 Checking OpenSessionScribe setup...")
     
     # Run hardware check
-    hardware()
+    hardware(json_output=False)
     
     # Test configuration
-    typer.echo()
-    typer.echo("⚙️  Configuration:")
+    lines = ["", "⚙️  Configuration:"]
     try:
         config = Config.auto_detect()
-        typer.echo("   ✅ Configuration loaded successfully")
-        typer.echo(f"   📁 Models dir: {config.models_dir}")
-        typer.echo(f"   📁 Cache dir: {config.cache_dir}")
+        lines.extend([
+            "   ✅ Configuration loaded successfully",
+            f"   📁 Models dir: {config.models_dir}",
+            f"   📁 Cache dir: {config.cache_dir}",
+        ])
     except Exception as e:
-        typer.echo(f"   ❌ Configuration error: {e}")
+        lines.append(f"   ❌ Configuration error: {e}")
+    
+    typer.echo("\n".join(lines))
 
 
 @app.command()
@@ -168,16 +231,13 @@ def transcribe(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose logging"),
 ):
     """Test transcription of an audio file."""
-    from opensessionscribe.asr.whisperx_adapter import WhisperXAdapter
-    import json
+    from opensessionscribe.config import Config
     
-    # Setup logging
-    log_level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+    _setup_logging(verbose)
     
     # Create config
     if whisper_model is None:
-        whisper_model = HardwareDetector.recommend_whisper_model()
+        whisper_model = _get_cached_hardware()["recommendations"]["whisper_model"]
         typer.echo(f"Auto-detected optimal Whisper model: {whisper_model}")
     
     config = Config(
@@ -190,15 +250,19 @@ def transcribe(
         typer.echo(f"❌ Audio file not found: {audio_file}", err=True)
         raise typer.Exit(1)
     
+    from opensessionscribe.asr.whisperx_adapter import WhisperXAdapter
+    
     # Check WhisperX availability
     if not WhisperXAdapter.check_whisperx():
         typer.echo("❌ WhisperX not available. Install with: pip install whisperx", err=True)
         raise typer.Exit(1)
     
-    typer.echo(f"🎙️ Transcribing: {audio_file}")
-    typer.echo(f"📄 Output: {output}")
-    typer.echo(f"🤖 Model: {config.whisper_model}")
-    typer.echo(f"⚙️ Device: {config.device or 'auto'}")
+    typer.echo("\n".join([
+        f"🎙️ Transcribing: {audio_file}",
+        f"📄 Output: {output}",
+        f"🤖 Model: {config.whisper_model}",
+        f"⚙️ Device: {config.device or 'auto'}",
+    ]))
     
     try:
         # Initialize WhisperX adapter
@@ -208,23 +272,27 @@ def transcribe(
         result = adapter.transcribe(audio_file)
         
         # Save results
+        from opensessionscribe.utils.jsonio import write_json
         output.parent.mkdir(parents=True, exist_ok=True)
-        with open(output, 'w') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        write_json(output, result)
         
         # Show summary
-        typer.echo(f"✅ Transcription complete!")
-        typer.echo(f"📊 Language: {result['language']}")
-        typer.echo(f"📊 Segments: {len(result['segments'])}")
-        typer.echo(f"📊 Words: {len(result['word_segments'])}")
+        lines = [
+            "✅ Transcription complete!",
+            f"📊 Language: {result['language']}",
+            f"📊 Segments: {len(result['segments'])}",
+            f"📊 Words: {len(result['word_segments'])}",
+        ]
         
         # Show first few segments as preview
-        typer.echo("\n📝 Preview:")
+        lines.append("\n📝 Preview:")
         for i, segment in enumerate(result['segments'][:3]):
-            typer.echo(f"   [{segment['start']:.1f}s-{segment['end']:.1f}s]: {segment['text'][:100]}...")
+            lines.append(f"   [{segment['start']:.1f}s-{segment['end']:.1f}s]: {segment['text'][:100]}...")
         
         if len(result['segments']) > 3:
-            typer.echo(f"   ... and {len(result['segments']) - 3} more segments")
+            lines.append(f"   ... and {len(result['segments']) - 3} more segments")
+        
+        typer.echo("\n".join(lines))
         
         # Cleanup
         adapter.cleanup()
@@ -241,12 +309,9 @@ def diarize(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose logging"),
 ):
     """Test speaker diarization on an audio file."""
-    from opensessionscribe.diarize.pyannote_adapter import PyAnnoteAdapter
-    import json
+    from opensessionscribe.config import Config
     
-    # Setup logging
-    log_level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+    _setup_logging(verbose)
     
     # Create config
     config = Config(
@@ -259,14 +324,18 @@ def diarize(
         typer.echo(f"❌ Audio file not found: {audio_file}", err=True)
         raise typer.Exit(1)
     
+    from opensessionscribe.diarize.pyannote_adapter import PyAnnoteAdapter
+    
     # Check pyannote availability
     if not PyAnnoteAdapter.check_pyannote():
         typer.echo("❌ pyannote.audio not available. Install with: pip install pyannote.audio", err=True)
         raise typer.Exit(1)
     
-    typer.echo(f"👥 Running speaker diarization: {audio_file}")
-    typer.echo(f"📄 Output: {output}")
-    typer.echo(f"🤖 Model: {config.diarization_model}")
+    typer.echo("\n".join([
+        f"👥 Running speaker diarization: {audio_file}",
+        f"📄 Output: {output}",
+        f"🤖 Model: {config.diarization_model}",
+    ]))
     
     try:
         # Initialize adapter
@@ -276,24 +345,28 @@ def diarize(
         result = adapter.diarize(audio_file)
         
         # Save results
+        from opensessionscribe.utils.jsonio import write_json
         output.parent.mkdir(parents=True, exist_ok=True)
-        with open(output, 'w') as f:
-            json.dump(result, f, indent=2)
+        write_json(output, result)
         
         # Show summary
-        typer.echo(f"✅ Diarization complete!")
-        typer.echo(f"📊 Speakers found: {result['total_speakers']}")
-        typer.echo(f"📊 Segments: {result['total_segments']}")
-        typer.echo(f"📊 Speaker labels: {', '.join(result['speakers'])}")
+        lines = [
+            "✅ Diarization complete!",
+            f"📊 Speakers found: {result['total_speakers']}",
+            f"📊 Segments: {result['total_segments']}",
+            f"📊 Speaker labels: {', '.join(result['speakers'])}",
+        ]
         
         # Show segment preview
-        typer.echo("\n📝 Segment Preview:")
+        lines.append("\n📝 Segment Preview:")
         for i, segment in enumerate(result['segments'][:5]):
             duration = segment['end'] - segment['start']
-            typer.echo(f"   [{segment['start']:.1f}s-{segment['end']:.1f}s] {segment['speaker']} ({duration:.1f}s)")
+            lines.append(f"   [{segment['start']:.1f}s-{segment['end']:.1f}s] {segment['speaker']} ({duration:.1f}s)")
         
         if len(result['segments']) > 5:
-            typer.echo(f"   ... and {len(result['segments']) - 5} more segments")
+            lines.append(f"   ... and {len(result['segments']) - 5} more segments")
+        
+        typer.echo("\n".join(lines))
         
         # Cleanup
         adapter.cleanup()
@@ -308,20 +381,17 @@ def process_combined(
     audio_file: Path = typer.Argument(..., help="Audio file to process"),
     output: Path = typer.Option("./combined_output.json", "--output", "-o", help="Output JSON file"),
     whisper_model: Optional[str] = typer.Option(None, "--whisper-model", help="Whisper model size"),
+    sequential: bool = typer.Option(False, "--sequential", help="Run transcription and diarization one after another (for low-VRAM GPUs)"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose logging"),
 ):
     """Test combined transcription + diarization."""
-    from opensessionscribe.asr.whisperx_adapter import WhisperXAdapter
-    from opensessionscribe.diarize.pyannote_adapter import PyAnnoteAdapter
-    import json
+    from opensessionscribe.config import Config
     
-    # Setup logging
-    log_level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+    _setup_logging(verbose)
     
     # Create config
     if whisper_model is None:
-        whisper_model = HardwareDetector.recommend_whisper_model()
+        whisper_model = _get_cached_hardware()["recommendations"]["whisper_model"]
         typer.echo(f"Auto-detected optimal Whisper model: {whisper_model}")
     
     config = Config(
@@ -335,21 +405,52 @@ def process_combined(
         typer.echo(f"❌ Audio file not found: {audio_file}", err=True)
         raise typer.Exit(1)
     
-    typer.echo(f"🎯 Processing audio with transcription + diarization: {audio_file}")
-    typer.echo(f"📄 Output: {output}")
+    typer.echo("\n".join([
+        f"🎯 Processing audio with transcription + diarization: {audio_file}",
+        f"📄 Output: {output}",
+    ]))
+    
+    from opensessionscribe.asr.whisperx_adapter import WhisperXAdapter
+    from opensessionscribe.diarize.pyannote_adapter import PyAnnoteAdapter
     
     try:
-        # Step 1: Transcription
-        typer.echo("🎙️ Step 1: Running transcription...")
         asr_adapter = WhisperXAdapter(config)
-        transcript_result = asr_adapter.transcribe(audio_file)
-        typer.echo(f"✅ Found {len(transcript_result['segments'])} transcript segments")
-        
-        # Step 2: Diarization  
-        typer.echo("👥 Step 2: Running speaker diarization...")
         diarize_adapter = PyAnnoteAdapter(config)
-        diarization_result = diarize_adapter.diarize(audio_file)
-        typer.echo(f"✅ Found {diarization_result['total_speakers']} speakers")
+        
+        # Decode once; both adapters read the same memory-mapped samples
+        from opensessionscribe.utils.audio import AudioBuffer
+        
+        scratch_path = AudioBuffer.decode_to_memmap(audio_file, config.cache_dir)
+        audio = AudioBuffer.open(scratch_path)
+        
+        try:
+            if sequential:
+                # Step 1: Transcription
+                typer.echo("🎙️ Step 1: Running transcription...")
+                transcript_result = asr_adapter.transcribe(audio_file, audio)
+                
+                # Step 2: Diarization
+                typer.echo("👥 Step 2: Running speaker diarization...")
+                diarization_result = diarize_adapter.diarize(audio_file, audio)
+            else:
+                # Steps 1+2: Transcription and diarization are independent until the
+                # merge, so run them side by side (torch releases the GIL)
+                from concurrent.futures import ThreadPoolExecutor
+                
+                typer.echo("🎙️👥 Steps 1-2: Running transcription and speaker diarization concurrently...")
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    transcript_future = executor.submit(asr_adapter.transcribe, audio_file, audio)
+                    diarization_future = executor.submit(diarize_adapter.diarize, audio_file, audio)
+                    transcript_result = transcript_future.result()
+                    diarization_result = diarization_future.result()
+        finally:
+            del audio
+            scratch_path.unlink(missing_ok=True)
+        
+        typer.echo("\n".join([
+            f"✅ Found {len(transcript_result['segments'])} transcript segments",
+            f"✅ Found {diarization_result['total_speakers']} speakers",
+        ]))
         
         # Step 3: Merge results
         typer.echo("🔄 Step 3: Merging transcript with speakers...")
@@ -372,23 +473,27 @@ def process_combined(
         }
         
         # Save results
+        from opensessionscribe.utils.jsonio import write_json
         output.parent.mkdir(parents=True, exist_ok=True)
-        with open(output, 'w') as f:
-            json.dump(combined_result, f, indent=2, ensure_ascii=False)
+        write_json(output, combined_result)
         
         # Show summary
-        typer.echo(f"\n🎉 Combined processing complete!")
-        typer.echo(f"📊 Language: {transcript_result['language']}")
-        typer.echo(f"📊 Speakers: {diarization_result['total_speakers']}")
-        typer.echo(f"📊 Merged segments: {len(merged_segments)}")
+        lines = [
+            "\n🎉 Combined processing complete!",
+            f"📊 Language: {transcript_result['language']}",
+            f"📊 Speakers: {diarization_result['total_speakers']}",
+            f"📊 Merged segments: {len(merged_segments)}",
+        ]
         
         # Show preview with speakers
-        typer.echo("\n📝 Preview with Speaker Labels:")
+        lines.append("\n📝 Preview with Speaker Labels:")
         for i, segment in enumerate(merged_segments[:3]):
-            typer.echo(f"   [{segment['start']:.1f}s-{segment['end']:.1f}s] {segment['speaker']}: {segment['text'][:80]}...")
+            lines.append(f"   [{segment['start']:.1f}s-{segment['end']:.1f}s] {segment['speaker']}: {segment['text'][:80]}...")
         
         if len(merged_segments) > 3:
-            typer.echo(f"   ... and {len(merged_segments) - 3} more segments")
+            lines.append(f"   ... and {len(merged_segments) - 3} more segments")
+        
+        typer.echo("\n".join(lines))
         
         # Cleanup
         asr_adapter.cleanup()
@@ -409,12 +514,9 @@ def slides(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose logging"),
 ):
     """Test slide processing on a video file."""
-    from opensessionscribe.slides.processor import SlideProcessor
-    import json
+    from opensessionscribe.config import Config
     
-    # Setup logging
-    log_level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+    _setup_logging(verbose)
     
     # Create config
     config = Config(
@@ -433,21 +535,27 @@ def slides(
     # Create output directory
     output.mkdir(parents=True, exist_ok=True)
     
-    typer.echo(f"🎬 Processing slides from: {video_file}")
-    typer.echo(f"📁 Output directory: {output}")
-    typer.echo(f"🔍 OCR engine: {ocr_engine}")
+    lines = [
+        f"🎬 Processing slides from: {video_file}",
+        f"📁 Output directory: {output}",
+        f"🔍 OCR engine: {ocr_engine}",
+    ]
     if descriptions:
-        typer.echo(f"🤖 VLM model: {vlm_model}")
+        lines.append(f"🤖 VLM model: {vlm_model}")
+    typer.echo("\n".join(lines))
+    
+    from opensessionscribe.slides.processor import SlideProcessor
     
     try:
         # Check dependencies
         processor = SlideProcessor(config)
         deps = processor.check_dependencies()
         
-        typer.echo("\n🔧 Dependencies:")
+        lines = ["\n🔧 Dependencies:"]
         for dep, available in deps.items():
             status = "✅" if available else "❌"
-            typer.echo(f"   {status} {dep}")
+            lines.append(f"   {status} {dep}")
+        typer.echo("\n".join(lines))
         
         # Check critical dependencies
         missing_critical = []
@@ -462,8 +570,10 @@ def slides(
             missing_critical.append(f"VLM model ({vlm_model})")
         
         if missing_critical:
-            typer.echo(f"\n❌ Missing critical dependencies: {', '.join(missing_critical)}")
-            typer.echo("Install missing dependencies and try again.")
+            typer.echo("\n".join([
+                f"\n❌ Missing critical dependencies: {', '.join(missing_critical)}",
+                "Install missing dependencies and try again.",
+            ]))
             raise typer.Exit(1)
         
         # Process slides
@@ -475,34 +585,36 @@ def slides(
             raise typer.Exit(1)
         
         # Save results
+        from opensessionscribe.utils.jsonio import write_json
         results_file = output / "slides.json"
-        slides_dict = [slide.model_dump() for slide in slides_data]
-        
-        with open(results_file, 'w') as f:
-            json.dump(slides_dict, f, indent=2, ensure_ascii=False)
+        write_json(results_file, (slide.model_dump() for slide in slides_data))
         
         # Show summary
-        typer.echo(f"\n✅ Slide processing complete!")
-        typer.echo(f"📊 Slides extracted: {len(slides_data)}")
-        typer.echo(f"📄 Results saved to: {results_file}")
+        lines = [
+            "\n✅ Slide processing complete!",
+            f"📊 Slides extracted: {len(slides_data)}",
+            f"📄 Results saved to: {results_file}",
+        ]
         
         # Show preview
-        typer.echo("\n📝 Slide Preview:")
+        lines.append("\n📝 Slide Preview:")
         for i, slide in enumerate(slides_data[:3]):
             timestamp = slide.timestamp
-            typer.echo(f"\n   📸 Slide {i+1} [{timestamp:.1f}s]:")
-            typer.echo(f"       Image: {Path(slide.image_path).name}")
+            lines.append(f"\n   📸 Slide {i+1} [{timestamp:.1f}s]:")
+            lines.append(f"       Image: {Path(slide.image_path).name}")
             
             if slide.ocr and slide.ocr.text:
                 ocr_preview = slide.ocr.text[:100]
-                typer.echo(f"       OCR: {ocr_preview}{'...' if len(slide.ocr.text) > 100 else ''}")
+                lines.append(f"       OCR: {ocr_preview}{'...' if len(slide.ocr.text) > 100 else ''}")
             
             if slide.description:
                 desc_preview = slide.description[:100]
-                typer.echo(f"       Description: {desc_preview}{'...' if len(slide.description) > 100 else ''}")
+                lines.append(f"       Description: {desc_preview}{'...' if len(slide.description) > 100 else ''}")
         
         if len(slides_data) > 3:
-            typer.echo(f"       ... and {len(slides_data) - 3} more slides")
+            lines.append(f"       ... and {len(slides_data) - 3} more slides")
+        
+        typer.echo("\n".join(lines))
         
         # Cleanup
         processor.cleanup()
@@ -512,5 +624,32 @@ def slides(
         raise typer.Exit(1)
 
 
+def _command_name(command_info) -> str:
+    """Return the CLI name Typer will expose for a registered command."""
+    from typer.main import get_command_name
+    return command_info.name or get_command_name(command_info.callback.__name__)
+
+
+def _sniff_subcommand(args: List[str]) -> Optional[str]:
+    """Return the first non-option argument, which Click treats as the subcommand."""
+    for arg in args:
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+
+def run() -> None:
+    """Console entry point: build only the parser for the requested subcommand."""
+    name = _sniff_subcommand(sys.argv[1:])
+    selected = [c for c in app.registered_commands if _command_name(c) == name]
+    
+    # Unknown or missing subcommand (e.g. bare --help): keep everything so
+    # Click can list all commands or suggest the closest match.
+    if selected:
+        app.registered_commands = selected
+    
+    app()
+
+
 if __name__ == "__main__":
-    app()
\ No newline at end of file
+    run()
\ No newline at end of file
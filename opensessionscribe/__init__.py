@@ -2,7 +2,19 @@
 
 __version__ = "0.1.0"
 
-from .pipeline import ProcessingPipeline
-from .config import Config
+__all__ = ["ProcessingPipeline", "Config"]
 
-__all__ = ["ProcessingPipeline", "Config"]
\ No newline at end of file
+
+def __getattr__(name):
+    """Lazily import public classes so `import opensessionscribe` stays cheap."""
+    if name == "ProcessingPipeline":
+        from .pipeline import ProcessingPipeline
+        return ProcessingPipeline
+    if name == "Config":
+        from .config import Config
+        return Config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
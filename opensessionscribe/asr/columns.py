@@ -0,0 +1,75 @@
+"""Columnar storage for word-level timestamps."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass(eq=False)
+class WordColumns(Sequence):
+    """Flat word list stored as parallel arrays instead of one dict per word.
+
+    Indexing and iteration yield the same `{"start", "end", "text", "conf"}`
+    dicts as before, built on demand, so JSON output and existing callers
+    are unchanged without keeping a second dict per word resident. Once
+    speakers are assigned, each dict also carries a "speaker" key.
+    """
+
+    starts: "np.ndarray"
+    ends: "np.ndarray"
+    scores: "np.ndarray"
+    texts: List[str]
+    speakers: Optional[List[str]] = None
+
+    @classmethod
+    def from_segments(cls, segments: List[Dict[str, Any]]) -> "WordColumns":
+        """Collect the words of processed transcript segments in one pass."""
+        import numpy as np
+
+        total = sum(len(segment.get("words", ())) for segment in segments)
+        starts = np.empty(total, dtype=np.float64)
+        ends = np.empty(total, dtype=np.float64)
+        scores = np.empty(total, dtype=np.float64)
+        texts = []
+
+        i = 0
+        for segment in segments:
+            for word in segment.get("words", ()):
+                starts[i] = word["start"]
+                ends[i] = word["end"]
+                scores[i] = word["conf"]
+                texts.append(word["text"])
+                i += 1
+
+        return cls(starts, ends, scores, texts)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return WordColumns(
+                self.starts[index], self.ends[index], self.scores[index], self.texts[index],
+                self.speakers[index] if self.speakers is not None else None
+            )
+        word = {
+            "start": float(self.starts[index]),
+            "end": float(self.ends[index]),
+            "text": self.texts[index],
+            "conf": float(self.scores[index])
+        }
+        if self.speakers is not None:
+            word["speaker"] = self.speakers[index]
+        return word
+
+    def __iter__(self):
+        columns = zip(self.starts.tolist(), self.ends.tolist(), self.texts, self.scores.tolist())
+        if self.speakers is None:
+            for start, end, text, conf in columns:
+                yield {"start": start, "end": end, "text": text, "conf": conf}
+        else:
+            for (start, end, text, conf), speaker in zip(columns, self.speakers):
+                yield {"start": start, "end": end, "text": text, "conf": conf, "speaker": speaker}
@@ -1,15 +1,23 @@
 """WhisperX adapter for speech recognition with word-level timestamps."""
 
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import importlib.util
 import logging
-import torch
 
 from ..config import Config
+from .columns import WordColumns
 
 
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 16000  # WhisperX decodes all audio to 16 kHz mono
+ALIGN_CHUNK_SEGMENTS = 30  # Segments per whisperx.align call, bounds peak activation memory
+
+# (minimum free VRAM in GB, Whisper batch size), largest first
+VRAM_BATCH_SIZES = ((24, 64), (16, 32), (12, 24), (8, 16), (6, 8))
+
 
 class WhisperXAdapter:
     """Adapter for WhisperX ASR with forced alignment."""
@@ -17,25 +25,36 @@ class WhisperXAdapter:
     def __init__(self, config: Config):
         self.config = config
         self.model = None
-        self.align_model = None
-        self.metadata = None
+        self.language: Optional[str] = None  # Last detected language
+        self._align_models: Dict[str, Tuple[Any, Any]] = {}  # language -> (model, metadata)
+        self._audio_cache: Dict[Tuple[str, float], Any] = {}
+        self.batch_size = 16
     
     def load_models(self) -> None:
         """Load WhisperX models."""
+        self.config.apply_runtime()
+        
         import whisperx
         
         device = self.config.device if self.config.device else "cpu"
         if self.config.force_cpu:
             device = "cpu"
         
-        logger.info(f"Loading WhisperX model '{self.config.whisper_model}' on device '{device}'")
+        compute_type = self._get_compute_type(device)
+        self.batch_size = self._get_batch_size(device)
+        
+        logger.info(
+            f"Loading WhisperX model '{self.config.whisper_model}' on device '{device}' "
+            f"({compute_type}, batch_size={self.batch_size})"
+        )
         
         try:
-            # Load WhisperX model for transcription
+            # Load WhisperX model for transcription (CTranslate2 faster-whisper backend)
             self.model = whisperx.load_model(
                 self.config.whisper_model, 
                 device=device,
-                compute_type="float16" if device != "cpu" else "int8",
+                compute_type=compute_type,
+                threads=self._get_cpu_threads(),
                 asr_options={
                     "suppress_numerals": True,
                     "max_new_tokens": None,
@@ -50,8 +69,98 @@ class WhisperXAdapter:
             logger.error(f"Failed to load WhisperX model: {e}")
             raise RuntimeError(f"Failed to load WhisperX model: {e}")
     
-    def transcribe(self, audio_path: Path) -> Dict[str, Any]:
-        """Transcribe audio file with word-level timestamps."""
+    def _get_compute_type(self, device: str) -> str:
+        """Pick the CTranslate2 compute type for the Whisper model.
+        
+        int8 weights with 16-bit activations use CT2's int8 GEMM kernels on
+        GPU, with bfloat16 on Ampere and newer to avoid float16 overflow on
+        large-v3; plain int8 is the fastest option on CPU.
+        """
+        if self.config.compute_type:
+            return self.config.compute_type
+        
+        from ..hardware import HardwareDetector
+        
+        if device == "cuda":
+            return "int8_bfloat16" if HardwareDetector.gpu_supports_bf16() else "int8_float16"
+        return "int8"
+    
+    def _get_batch_size(self, device: str) -> int:
+        """Pick the Whisper batch size from free VRAM (config override wins)."""
+        if self.config.batch_size:
+            return self.config.batch_size
+        if device != "cuda":
+            return 16
+        
+        try:
+            import torch
+            free_bytes, _ = torch.cuda.mem_get_info()
+        except Exception as e:
+            logger.debug(f"Could not query free VRAM, using default batch size: {e}")
+            return 16
+        
+        free_gb = free_bytes / 1024**3
+        for min_gb, batch_size in VRAM_BATCH_SIZES:
+            if free_gb >= min_gb:
+                return batch_size
+        return 4
+    
+    @staticmethod
+    def _get_cpu_threads() -> int:
+        """Number of CTranslate2 CPU threads (physical cores)."""
+        import psutil
+        return psutil.cpu_count(logical=False) or 4
+    
+    def preload(self, languages: List[str]) -> None:
+        """Eagerly load the Whisper model and alignment models for `languages`.
+        
+        Long-running callers (servers, batch jobs, the editor) can pay all
+        model loading up front instead of on the first request per language.
+        """
+        if self.model is None:
+            self.load_models()
+        
+        for language in languages:
+            self._load_align_model(language)
+    
+    def transcribe_batch(self, audio_paths: List[Path]) -> List[Dict[str, Any]]:
+        """Transcribe several files, decoding the next one while the current runs.
+        
+        ffmpeg decoding happens in a background thread, so the model is not
+        idle between files. At most one prefetched file is held in memory.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        import whisperx
+        
+        if self.model is None:
+            self.load_models()
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(whisperx.load_audio, str(audio_paths[0])) if audio_paths else None
+            for i, audio_path in enumerate(audio_paths):
+                audio = pending.result()
+                if i + 1 < len(audio_paths):
+                    pending = executor.submit(whisperx.load_audio, str(audio_paths[i + 1]))
+                
+                self._load_audio_cached(audio_path, decoded=audio)
+                results.append(self.transcribe(audio_path))
+        
+        return results
+    
+    def transcribe(
+        self,
+        audio_path: Path,
+        audio: Optional[Any] = None,
+        keep_raw_result: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """Transcribe audio file with word-level timestamps.
+        
+        `audio` may hold the file already decoded to 16 kHz mono float32
+        (e.g. a shared memmap), in which case it is not decoded again. Such
+        audio belongs to the caller and is not kept in the audio cache.
+        `keep_raw_result` overrides the adapter config for this call.
+        """
         if self.model is None:
             self.load_models()
         
@@ -61,11 +170,14 @@ class WhisperXAdapter:
             import whisperx
             
             # Load audio
-            audio = whisperx.load_audio(str(audio_path))
+            if audio is None:
+                audio = self._load_audio_cached(audio_path)
             
             # 1. Transcribe with Whisper model
-            result = self.model.transcribe(audio, batch_size=16)
+            with self._inference_context():
+                result = self.model.transcribe(audio, batch_size=self.batch_size)
             detected_language = result.get("language", "en")
+            self.language = detected_language
             
             logger.info(f"Transcription complete. Detected language: {detected_language}")
             logger.info(f"Found {len(result.get('segments', []))} segments")
@@ -76,22 +188,24 @@ class WhisperXAdapter:
             # 3. Perform forced alignment for word-level timestamps
             if align_model is not None:
                 logger.info("Running forced alignment for word-level timestamps")
-                aligned_result = whisperx.align(
-                    result["segments"], 
-                    align_model, 
-                    metadata, 
-                    audio, 
-                    self.config.device or "cpu",
-                    return_char_alignments=False
-                )
-                segments = aligned_result["segments"]
+                segments = []
+                with self._inference_context(autocast=True):
+                    for i in range(0, len(result["segments"]), ALIGN_CHUNK_SEGMENTS):
+                        aligned_result = whisperx.align(
+                            result["segments"][i:i + ALIGN_CHUNK_SEGMENTS], 
+                            align_model, 
+                            metadata, 
+                            audio, 
+                            self.config.device or "cpu",
+                            return_char_alignments=False
+                        )
+                        segments.extend(aligned_result["segments"])
             else:
                 logger.warning("Alignment model not available, using segment-level timestamps only")
                 segments = result["segments"]
             
             # 4. Structure the output
             processed_segments = []
-            all_words = []
             
             for i, segment in enumerate(segments):
                 segment_id = f"seg_{i:06d}"
@@ -99,44 +213,69 @@ class WhisperXAdapter:
                 # Extract words with timestamps if available
                 words = segment.get("words", [])
                 processed_words = []
+                seg_start = segment.get("start", 0)
+                seg_end = segment.get("end", 0)
                 
                 for word in words:
                     word_data = {
-                        "start": word.get("start", segment.get("start", 0)),
-                        "end": word.get("end", segment.get("end", 0)),
+                        "start": word.get("start", seg_start),
+                        "end": word.get("end", seg_end),
                         "text": word.get("word", "").strip(),
                         "conf": word.get("score", 0.0)
                     }
                     processed_words.append(word_data)
-                    all_words.append(word_data)
                 
                 # Create segment entry
                 segment_data = {
                     "id": segment_id,
-                    "start": segment.get("start", 0),
-                    "end": segment.get("end", 0),
+                    "start": seg_start,
+                    "end": seg_end,
                     "text": segment.get("text", "").strip(),
                     "speaker": "SPEAKER_00",  # Will be updated by diarization
                     "words": processed_words
                 }
                 processed_segments.append(segment_data)
             
-            logger.info(f"Processed {len(processed_segments)} segments with {len(all_words)} words")
+            word_columns = WordColumns.from_segments(processed_segments)
+            
+            logger.info(f"Processed {len(processed_segments)} segments with {len(word_columns)} words")
             
-            return {
+            transcript = {
                 "model": self.config.whisper_model,
                 "language": detected_language,
                 "segments": processed_segments,
-                "word_segments": all_words,
-                "raw_result": result  # Keep original for debugging
+                "word_segments": word_columns,
             }
+            if self.config.keep_raw_result if keep_raw_result is None else keep_raw_result:
+                transcript["raw_result"] = result  # Keep original for debugging
+            return transcript
             
         except Exception as e:
             logger.error(f"Transcription failed: {e}")
             raise RuntimeError(f"Transcription failed: {e}")
     
-    def _load_align_model(self, language: str) -> tuple[Any, Any]:
-        """Load alignment model for specific language."""
+    def _inference_context(self, autocast: bool = False) -> ExitStack:
+        """Disable autograd tracking, optionally with FP16 autocast on GPU.
+        
+        Alignment otherwise runs the wav2vec2 model in FP32 even when Whisper
+        uses FP16. Autocast is skipped on CPU, where the model may already be
+        int8-quantized.
+        """
+        import torch
+        
+        stack = ExitStack()
+        stack.enter_context(torch.inference_mode())
+        
+        device = "cpu" if self.config.force_cpu else (self.config.device or "cpu")
+        if autocast and device in ("cuda", "mps"):
+            stack.enter_context(torch.autocast(device_type=device, dtype=torch.float16))
+        return stack
+    
+    def _load_align_model(self, language: str) -> Tuple[Any, Any]:
+        """Load alignment model for specific language, reusing loaded ones."""
+        if language in self._align_models:
+            return self._align_models[language]
+        
         try:
             import whisperx
             
@@ -155,9 +294,17 @@ class WhisperXAdapter:
                 device=device
             )
             
-            # Cache for potential reuse
-            self.align_model = align_model
-            self.metadata = metadata
+            self._enable_sdpa(align_model)
+            align_model.eval()
+            
+            if self.config.cpu_quantize_alignment and device == "cpu":
+                align_model = self._quantize_align_model(align_model)
+            
+            if self.config.compile_alignment and device == "cuda":
+                self._compile_align_model(align_model, device)
+            
+            # Keep resident for later transcriptions and re-alignment
+            self._align_models[language] = (align_model, metadata)
             
             return align_model, metadata
             
@@ -165,41 +312,157 @@ class WhisperXAdapter:
             logger.warning(f"Could not load alignment model for {language}: {e}")
             return None, None
     
-    def align_segment(self, audio_path: Path, text: str, start: float, end: float) -> List[Dict[str, Any]]:
-        """Re-align a specific segment after editing."""
-        if self.align_model is None or self.metadata is None:
+    @staticmethod
+    def _enable_sdpa(align_model: Any) -> None:
+        """Switch HuggingFace wav2vec2 alignment models to fused SDPA attention.
+        
+        torch's scaled_dot_product_attention picks Flash/memory-efficient
+        kernels when available instead of materializing the full attention
+        matrix. torchaudio bundles (used for a few languages) have no HF
+        config and already use their own attention, so they are left alone.
+        """
+        model_config = getattr(align_model, "config", None)
+        if model_config is None or not hasattr(model_config, "_attn_implementation"):
+            return
+        
+        if model_config._attn_implementation != "sdpa":
+            logger.debug(f"Switching alignment attention from {model_config._attn_implementation} to sdpa")
+            model_config._attn_implementation = "sdpa"
+    
+    @staticmethod
+    def _quantize_align_model(align_model: Any) -> Any:
+        """Quantize the alignment model's Linear layers to dynamic int8.
+        
+        CPU only: quantized int8 kernels have no CUDA/MPS implementation.
+        The wav2vec2 projections dominate alignment cost and tolerate int8
+        well; on failure the float model is returned unchanged.
+        """
+        import torch
+        from torch.ao.quantization import quantize_dynamic
+        
+        try:
+            logger.info("Quantizing alignment model to dynamic int8 for CPU")
+            return quantize_dynamic(align_model, {torch.nn.Linear}, dtype=torch.qint8)
+        except Exception as e:
+            logger.warning(f"Alignment model quantization failed, using float model: {e}")
+            return align_model
+    
+    def _compile_align_model(self, align_model: Any, device: str) -> None:
+        """Compile the alignment model's forward pass with TorchInductor.
+        
+        whisperx.align feeds one audio slice per segment, so input lengths
+        vary; compile with dynamic shapes rather than CUDA graphs to avoid a
+        recompile per segment length. A warmup call pays the compile cost up
+        front, and any failure restores the eager forward.
+        """
+        import torch
+        
+        eager_forward = align_model.forward
+        try:
+            logger.info("Compiling alignment model with torch.compile")
+            align_model.forward = torch.compile(eager_forward, dynamic=True)
+            with torch.inference_mode():
+                align_model(torch.zeros(1, 16000, device=device))
+        except Exception as e:
+            logger.warning(f"torch.compile failed for alignment model, using eager mode: {e}")
+            align_model.forward = eager_forward
+    
+    def _load_audio_cached(self, audio_path: Path, decoded: Optional[Any] = None) -> Any:
+        """Decode audio once and reuse it until the file changes.
+        
+        Only the most recent file stays resident. `decoded` lets callers hand
+        in audio they already decoded (e.g. prefetched in another thread).
+        """
+        import whisperx
+        
+        path = str(audio_path)
+        key = (path, Path(audio_path).stat().st_mtime)
+        if key not in self._audio_cache:
+            self._audio_cache.clear()
+            self._audio_cache[key] = decoded if decoded is not None else whisperx.load_audio(path)
+        return self._audio_cache[key]
+    
+    def _read_audio_window(self, audio_path: Path, start: float, end: float) -> Any:
+        """Return 16 kHz mono float32 samples for [start, end].
+        
+        Reuses the cached full decode if this file was just transcribed;
+        otherwise seeks into the file with soundfile and reads only the
+        window. Files soundfile cannot read as 16 kHz fall back to a full
+        whisperx (ffmpeg) decode.
+        """
+        path = str(audio_path)
+        key = (path, Path(audio_path).stat().st_mtime)
+        first, last = int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)
+        
+        if key not in self._audio_cache:
+            try:
+                import soundfile as sf
+                
+                with sf.SoundFile(path) as f:
+                    if f.samplerate == SAMPLE_RATE:
+                        f.seek(min(first, f.frames))
+                        audio = f.read(max(last - first, 0), dtype="float32", always_2d=True)
+                        return audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+            except ImportError:
+                pass
+            except Exception as e:
+                logger.debug(f"soundfile cannot read {path}, decoding with ffmpeg: {e}")
+        
+        return self._load_audio_cached(audio_path)[first:last]
+    
+    def align_segment(
+        self,
+        audio_path: Path,
+        text: str,
+        start: float,
+        end: float,
+        language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Re-align a specific segment after editing.
+        
+        Uses the language of the last transcription unless `language` is given.
+        """
+        language = language or self.language
+        if language is None:
+            logger.warning("Language unknown, cannot re-align segment")
+            return []
+        
+        align_model, metadata = self._load_align_model(language)
+        if align_model is None:
             logger.warning("Alignment model not loaded, cannot re-align segment")
             return []
         
         try:
             import whisperx
             
-            # Load audio for the specific segment
-            audio = whisperx.load_audio(str(audio_path))
+            # Times passed to whisperx are relative to the window and
+            # shifted back below
+            audio = self._read_audio_window(audio_path, start, end)
             
             # Create a temporary segment structure
             temp_segment = {
-                "start": start,
-                "end": end,
+                "start": 0.0,
+                "end": end - start,
                 "text": text
             }
             
             # Perform alignment
-            aligned_result = whisperx.align(
-                [temp_segment],
-                self.align_model,
-                self.metadata,
-                audio,
-                self.config.device or "cpu",
-                return_char_alignments=False
-            )
+            with self._inference_context(autocast=True):
+                aligned_result = whisperx.align(
+                    [temp_segment],
+                    align_model,
+                    metadata,
+                    audio,
+                    self.config.device or "cpu",
+                    return_char_alignments=False
+                )
             
             # Extract word-level alignments
             words = aligned_result["segments"][0].get("words", [])
             
             return [{
-                "start": word.get("start", start),
-                "end": word.get("end", end),
+                "start": word["start"] + start if "start" in word else start,
+                "end": word["end"] + start if "end" in word else end,
                 "text": word.get("word", "").strip(),
                 "conf": word.get("score", 0.0)
             } for word in words]
@@ -210,12 +473,8 @@ class WhisperXAdapter:
     
     @staticmethod
     def check_whisperx() -> bool:
-        """Check if WhisperX is available."""
-        try:
-            import whisperx
-            return True
-        except ImportError:
-            return False
+        """Check if WhisperX is installed (without importing it)."""
+        return importlib.util.find_spec("whisperx") is not None
     
     def cleanup(self) -> None:
         """Clean up loaded models to free memory."""
@@ -223,13 +482,11 @@ class WhisperXAdapter:
             del self.model
             self.model = None
             
-        if self.align_model is not None:
-            del self.align_model
-            self.align_model = None
-            
-        self.metadata = None
+        self._align_models.clear()
+        self._audio_cache.clear()
         
         # Clear CUDA cache if using GPU
+        import torch
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
         
@@ -1,12 +1,18 @@
 """Configuration management with hardware detection."""
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, replace
 from pathlib import Path
 from typing import Optional, Literal, Dict, Any
+import functools
 import yaml
 import logging
 import os
 
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader, SafeDumper
+
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +25,10 @@ class Config:
     whisper_model: str = "medium"
     diarization_model: str = "pyannote/speaker-diarization-3.1"
     vlm_model: str = "qwen2.5-vl"
+    ollama_host: str = "http://localhost:11434"
     ocr_engine: Literal["paddle", "tesseract"] = "paddle"
+    compute_type: Optional[str] = None  # CTranslate2 compute type; None = auto per device
+    batch_size: Optional[int] = None  # Whisper batch size; None = auto from free VRAM
     
     # Hardware settings
     force_cpu: bool = False
@@ -29,6 +38,18 @@ class Config:
     enable_slides: bool = True
     enable_descriptions: bool = True
     phash_threshold: int = 8
+    slide_dedup_window: int = 3  # Compare slides with the last N kept ones; 0 = all of them
+    slide_change_threshold: float = 12.0  # Mean luma difference (0-255) between 1 fps frames
+    slide_min_gap_sec: float = 5.0  # Ignore slide changes closer together than this
+    slide_detection_source: Literal["frames", "keyframes"] = "frames"  # "keyframes" decodes only I-frames
+    slide_workers: Optional[int] = None  # Processes for per-slide OCR/VLM; None = auto (up to 4)
+    vlm_concurrency: int = 2  # Slide description requests in flight at once (single-process path)
+    compile_alignment: bool = False  # torch.compile the alignment model (CUDA only)
+    cpu_quantize_alignment: bool = True  # Dynamic int8 alignment model on CPU
+    concurrent_diarization: bool = True  # Diarize while transcribing (disable on low-VRAM GPUs)
+    keep_raw_result: bool = False  # Keep raw WhisperX output in transcripts (debugging)
+    save_debug_artifacts: bool = False  # Write gzipped *_raw.json sidecars to the output dir
+    hash_algorithm: Literal["sha256", "blake3"] = "sha256"  # Manifest checksums; blake3 needs the blake3 package
     
     # Paths
     models_dir: Path = Path.home() / ".opensessionscribe" / "models"
@@ -36,13 +57,29 @@ class Config:
     
     # Privacy
     offline_only: bool = True
+    ytdlp_concurrent_fragments: int = 8  # Parallel HLS/DASH fragment downloads
+    external_downloader: Optional[str] = None  # None = aria2c if installed, "native" = yt-dlp built-in
+    info_cache_ttl_sec: int = 24 * 60 * 60  # yt-dlp metadata cache lifetime (ignored when offline_only)
     
     @classmethod
-    def auto_detect(cls) -> "Config":
-        """Create config with auto-detected optimal settings."""
+    def auto_detect(cls, refresh: bool = False) -> "Config":
+        """Create config with auto-detected optimal settings.
+        
+        Hardware is probed once per process; each call returns a fresh copy
+        so callers can adjust their config without affecting others. With
+        `refresh`, hardware is re-detected even if a cached summary exists.
+        """
+        if refresh:
+            cls._auto_detect_cached.cache_clear()
+        return replace(cls._auto_detect_cached(refresh))
+    
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def _auto_detect_cached(cls, refresh: bool = False) -> "Config":
+        """Probe hardware and build the auto-detected config (memoized)."""
         from .hardware import HardwareDetector
         
-        hardware = HardwareDetector.get_hardware_summary()
+        hardware = HardwareDetector.get_hardware_summary_cached(refresh=refresh)
         
         config = cls(
             whisper_model=hardware["recommendations"]["whisper_model"],
@@ -60,7 +97,7 @@ class Config:
             raise FileNotFoundError(f"Config file not found: {path}")
         
         with open(path, 'r') as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=SafeLoader)
         
         # Convert path strings to Path objects
         if 'models_dir' in data:
@@ -89,22 +126,34 @@ class Config:
         
         logger.debug(f"Config validation passed: models_dir={self.models_dir}, cache_dir={self.cache_dir}")
     
+    def apply_runtime(self) -> None:
+        """Size CPU math thread pools to the physical core count.
+        
+        torch, OpenMP and MKL default to logical cores, which oversubscribes
+        SMT machines during CPU inference. Only applies when running on CPU;
+        safe to call repeatedly.
+        """
+        if not self.force_cpu and self.device not in (None, "cpu"):
+            return
+        
+        from .hardware import HardwareDetector
+        
+        cores, _ = HardwareDetector.get_cpu_info()
+        _configure_cpu_threads(cores or os.cpu_count() or 1)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert config to dictionary for serialization."""
-        result = {}
-        for key, value in self.__dict__.items():
-            if isinstance(value, Path):
-                result[key] = str(value)
-            else:
-                result[key] = value
-        return result
+        return {
+            key: str(getattr(self, key)) if is_path else getattr(self, key)
+            for key, is_path in _field_kinds()
+        }
     
     def save_yaml(self, path: Path) -> None:
         """Save config to YAML file."""
         path.parent.mkdir(parents=True, exist_ok=True)
         
         with open(path, 'w') as f:
-            yaml.dump(self.to_dict(), f, default_flow_style=False, sort_keys=True)
+            yaml.dump(self.to_dict(), f, Dumper=SafeDumper, default_flow_style=False, sort_keys=True)
         
         logger.info(f"Config saved to {path}")
     
@@ -124,4 +173,31 @@ class Config:
             config.save_yaml(config_path)
         
         config.validate()
-        return config
\ No newline at end of file
+        return config
+
+
+@functools.lru_cache(maxsize=1)
+def _field_kinds() -> tuple:
+    """(name, is_path) pairs for Config fields, computed once."""
+    return tuple((f.name, f.type is Path) for f in fields(Config))
+
+
+@functools.lru_cache(maxsize=1)
+def _configure_cpu_threads(cores: int) -> None:
+    """Set OpenMP/MKL/torch thread counts once per process."""
+    os.environ.setdefault("OMP_NUM_THREADS", str(cores))
+    os.environ.setdefault("MKL_NUM_THREADS", str(cores))
+    
+    try:
+        import torch
+    except ImportError:
+        return
+    
+    torch.set_num_threads(cores)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set before the first inter-op parallel work
+        logger.debug("torch inter-op thread count already fixed")
+    
+    logger.debug(f"Using {cores} CPU threads for inference")
@@ -0,0 +1,283 @@
+"""Capability probe for system checks.
+
+Run as `python -m opensessionscribe.diagnostics [--json]`, or call `collect()`
+from a process that already has the application loaded: modules that are
+already imported report their version directly, and nothing heavy (torch,
+whisperx) is imported just to be checked.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import functools
+import importlib.metadata
+import importlib.util
+import logging
+import os
+import platform
+import shlex
+import shutil
+import subprocess
+import sys
+
+
+logger = logging.getLogger(__name__)
+
+# (name, required)
+COMMANDS: List[Tuple[str, bool]] = [
+    ("ffmpeg", True),
+    ("ffprobe", True),
+    ("yt-dlp", True),
+    ("tesseract", False),
+    ("ollama", False),
+    ("git", False),
+]
+
+PACKAGES: List[Tuple[str, bool]] = [
+    ("typer", True),
+    ("pydantic", True),
+    ("yaml", True),
+    ("torch", True),
+    ("whisperx", True),
+    ("pyannote.audio", True),
+    ("paddleocr", False),
+    ("cv2", False),  # opencv
+    ("scenedetect", False),
+    ("librosa", False),
+    ("imagehash", False),
+]
+
+# Where each command's version comes from: ("metadata", distribution) reads
+# installed package metadata without starting a process, ("exec", flag) runs it
+VERSION_SOURCES = {
+    "ffmpeg": ("exec", "-version"),
+    "ffprobe": ("exec", "-version"),
+    "yt-dlp": ("metadata", "yt-dlp"),
+    "tesseract": ("exec", "--version"),
+    "ollama": ("exec", "--version"),
+    "git": ("exec", "--version"),
+}
+
+VERSION_TIMEOUT_SEC = 2  # Per command; version output is printed immediately
+VERSION_MARKER = "--opensessionscribe-version-end--"
+
+# Distributions providing an import name, where the names differ
+DIST_NAMES = {
+    "yaml": ("PyYAML",),
+    "cv2": ("opencv-python", "opencv-python-headless", "opencv-contrib-python", "opencv-contrib-python-headless"),
+}
+
+
+def find_commands(commands: List[str]) -> Dict[str, bool]:
+    """Which of `commands` are executables on PATH.
+    
+    Each PATH directory is listed once for all commands, instead of one
+    stat per command per directory as with repeated `shutil.which`. Only
+    matches are checked for execute permission. Other platforms, where
+    PATHEXT decides what is executable, use `shutil.which`.
+    """
+    if os.name != "posix":
+        return {command: shutil.which(command) is not None for command in commands}
+    
+    found = dict.fromkeys(commands, False)
+    remaining = set(commands)
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        if not remaining:
+            break
+        try:
+            names = remaining.intersection(os.listdir(directory or "."))
+        except OSError:
+            continue  # Missing or unreadable PATH entry
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.access(path, os.X_OK) and not os.path.isdir(path):
+                found[name] = True
+                remaining.discard(name)
+    return found
+
+
+def _version_flag(command: str) -> str:
+    source, arg = VERSION_SOURCES.get(command, ("exec", "--version"))
+    return arg if source == "exec" else "--version"
+
+
+@functools.lru_cache(maxsize=None)
+def command_version(command: str) -> str:
+    """First line of a command's version output (cached per command)."""
+    source, dist = VERSION_SOURCES.get(command, ("exec", "--version"))
+    if source == "metadata":
+        try:
+            return importlib.metadata.version(dist)
+        except importlib.metadata.PackageNotFoundError:
+            pass  # Standalone binary rather than a pip install
+    
+    # C locale skips locale setup; version output is printed immediately
+    result = subprocess.run(
+        [command, _version_flag(command)], stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=VERSION_TIMEOUT_SEC,
+        env={"LC_ALL": "C", "PATH": os.environ.get("PATH", "")}
+    )
+    # Only the first line is shown, so only it is decoded
+    return result.stdout.partition(b"\n")[0].decode("utf-8", "replace") if result.stdout else "unknown version"
+
+
+def _try_command_version(command: str) -> Optional[str]:
+    try:
+        return command_version(command)
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"Version check for {command} failed: {e}")
+        return None
+
+
+def command_versions(commands: List[str]) -> Dict[str, Optional[str]]:
+    """Version lines for commands known to be on PATH, starting one process in total.
+    
+    Versions from package metadata are read in-process; the other commands
+    run back to back in a single `sh` script, their first output lines
+    separated by a marker line. Without a POSIX shell, or if the script's
+    output does not line up, each command is probed on its own (in threads).
+    A None version means the command's version check failed.
+    """
+    versions: Dict[str, Optional[str]] = {}
+    to_exec = []
+    for command in commands:
+        source, dist = VERSION_SOURCES.get(command, ("exec", "--version"))
+        if source == "metadata":
+            try:
+                versions[command] = importlib.metadata.version(dist)
+                continue
+            except importlib.metadata.PackageNotFoundError:
+                pass  # Standalone binary rather than a pip install
+        to_exec.append(command)
+    
+    if len(to_exec) > 1 and os.name == "posix":
+        script = "".join(
+            f"{shlex.quote(command)} {_version_flag(command)} </dev/null 2>/dev/null | head -n 1; "
+            f"echo {VERSION_MARKER}\n"
+            for command in to_exec
+        )
+        try:
+            result = subprocess.run(
+                ["sh", "-c", script],
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                timeout=VERSION_TIMEOUT_SEC * len(to_exec),
+                env={"LC_ALL": "C", "PATH": os.environ.get("PATH", "")}
+            )
+            outputs = result.stdout.decode("utf-8", "replace").split(f"{VERSION_MARKER}\n")
+            if len(outputs) == len(to_exec) + 1:
+                for command, output in zip(to_exec, outputs):
+                    versions[command] = output.partition("\n")[0] or "unknown version"
+                return versions
+            logger.debug(f"Batched version check returned {len(outputs) - 1} of {len(to_exec)} results")
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Batched version check failed: {e}")
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        versions.update(zip(to_exec, executor.map(_try_command_version, to_exec)))
+    return versions
+
+
+def package_version(package: str) -> Optional[str]:
+    """Version of an importable package ("unknown" if unreported), or None if missing.
+    
+    Already-imported modules answer from `__version__`; others are located
+    with find_spec and versioned from their distribution metadata, without
+    being imported.
+    """
+    module = sys.modules.get(package)
+    if module is not None:
+        return str(getattr(module, "__version__", "unknown"))
+    
+    try:
+        if importlib.util.find_spec(package) is None:
+            return None
+    except ImportError:  # Parent package of a dotted name is missing
+        return None
+    
+    for dist in DIST_NAMES.get(package, (package,)):
+        try:
+            return importlib.metadata.version(dist)
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    return "unknown"
+
+
+def check_package(package: str, required: bool = True) -> Dict[str, Any]:
+    """Availability and version of a Python package."""
+    version = package_version(package)
+    return {"name": package, "required": required, "found": version is not None, "version": version}
+
+
+def collect(fast: bool = False) -> Dict[str, Any]:
+    """Probe commands, packages and hardware into one JSON-serializable report.
+    
+    All command version checks share one shell process. Hardware comes from
+    the shared hardware cache and is None if its dependencies are missing.
+    With `fast`, a missing required command or package (found without
+    starting any process) skips the optional ones and hardware; skipped
+    entries carry `"skipped": True`.
+    """
+    on_path = find_commands([name for name, _ in COMMANDS])
+    packages = {package: check_package(package, required) for package, required in PACKAGES if required}
+    broken = fast and not (
+        all(on_path[name] for name, required in COMMANDS if required)
+        and all(entry["found"] for entry in packages.values())
+    )
+    
+    def skipped(name: str) -> Dict[str, Any]:
+        return {"name": name, "required": False, "found": False, "version": None, "skipped": True}
+    
+    probe = [name for name, required in COMMANDS if on_path[name] and (required or not broken)]
+    versions = command_versions(probe)
+    commands = [
+        skipped(name) if broken and not required else
+        {"name": name, "required": required, "found": name in versions, "version": versions.get(name)}
+        for name, required in COMMANDS
+    ]
+    
+    hardware = None
+    if not broken:
+        try:
+            from .hardware import HardwareDetector
+            
+            hardware = HardwareDetector.get_hardware_summary_cached()
+        except ImportError as e:
+            logger.debug(f"Hardware detection unavailable: {e}")
+    
+    return {
+        "python": platform.python_version(),
+        "commands": commands,
+        "packages": [
+            packages[package] if required else skipped(package) if broken else check_package(package, False)
+            for package, required in PACKAGES
+        ],
+        "hardware": hardware,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print the capability report; exit status 1 if a required item is missing."""
+    parser = argparse.ArgumentParser(description="Report OpenSessionScribe capabilities")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--fast", action="store_true", help="Skip optional checks once a required one fails")
+    args = parser.parse_args(argv)
+    
+    report = collect(fast=args.fast)
+    
+    if args.json:
+        from .utils.jsonio import dumps
+        
+        sys.stdout.write(dumps(report).decode("utf-8") + "\n")
+    else:
+        lines = [f"Python {report['python']}"]
+        for entry in report["commands"] + report["packages"]:
+            state = "skipped" if entry.get("skipped") else entry["version"] if entry["found"] else "missing"
+            lines.append(f"{entry['name']}: {state or 'found'}{'' if entry['required'] else ' (optional)'}")
+        print("\n".join(lines))
+    
+    missing = [entry for entry in report["commands"] + report["packages"] if entry["required"] and not entry["found"]]
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,31 @@
 """PyAnnote adapter for speaker diarization."""
 
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import bisect
+import functools
+import importlib.util
 import logging
-import torch
 
+from ..asr.columns import WordColumns
 from ..config import Config
+from ..utils.audio import SAMPLE_RATE
 
 
 logger = logging.getLogger(__name__)
 
-
 class PyAnnoteAdapter:
     """Adapter for pyannote.audio speaker diarization."""
     
     def __init__(self, config: Config):
         self.config = config
         self.pipeline = None
+        self._turn_index: Optional["_TurnIndex"] = None
     
     def load_model(self) -> None:
         """Load pyannote diarization pipeline."""
+        self.config.apply_runtime()
+        
         logger.info(f"Loading pyannote diarization pipeline: {self.config.diarization_model}")
         
         # For now, always use simple diarization as fallback since pyannote requires auth
@@ -45,8 +51,12 @@ class PyAnnoteAdapter:
             logger.error(f"Failed to load simple diarization: {e}")
             raise RuntimeError(f"Failed to load any diarization method: {e}")
     
-    def diarize(self, audio_path: Path) -> Dict[str, Any]:
-        """Perform speaker diarization on audio file."""
+    def diarize(self, audio_path: Path, audio: Optional[Any] = None) -> Dict[str, Any]:
+        """Perform speaker diarization on audio file.
+        
+        `audio` may hold the file already decoded to 16 kHz mono float32
+        (e.g. a shared memmap), in which case it is not decoded again.
+        """
         if self.pipeline is None:
             self.load_model()
         
@@ -55,10 +65,17 @@ class PyAnnoteAdapter:
         try:
             if self.pipeline == "simple_vad":
                 # Use simple fallback approach
-                return self._simple_diarization(audio_path)
+                return self._simple_diarization(audio_path, audio)
             else:
                 # Use full pyannote pipeline
-                diarization = self.pipeline(str(audio_path))
+                if audio is not None:
+                    import torch
+                    diarization = self.pipeline({
+                        "waveform": torch.from_numpy(audio).unsqueeze(0),
+                        "sample_rate": SAMPLE_RATE
+                    })
+                else:
+                    diarization = self.pipeline(str(audio_path))
                 
                 # Extract segments and speakers
                 segments = []
@@ -95,30 +112,39 @@ class PyAnnoteAdapter:
             logger.error(f"Diarization failed: {e}")
             raise RuntimeError(f"Diarization failed: {e}")
     
-    def _simple_diarization(self, audio_path: Path) -> Dict[str, Any]:
-        """Simple fallback diarization using basic voice activity detection."""
+    def _simple_diarization(self, audio_path: Path, audio: Optional[Any] = None) -> Dict[str, Any]:
+        """Simple fallback diarization using basic voice activity detection.
+        
+        Everything is attributed to a single speaker. With the silero-vad
+        package installed, turns follow detected speech; otherwise one turn
+        spans the whole file, whose duration comes from the header alone.
+        """
         try:
-            import librosa
-            
-            # Load audio
-            y, sr = librosa.load(str(audio_path), sr=16000)
-            duration = len(y) / sr
+            turns = self._silero_speech_turns(audio_path, audio)
+            model = "silero_vad_fallback"
+            if turns is None:
+                if audio is not None:
+                    duration = len(audio) / SAMPLE_RATE
+                else:
+                    duration = self._get_audio_duration(audio_path)
+                turns = [(0.0, duration)]
+                model = "simple_vad_fallback"
             
             # Simple approach: assume single speaker for now
             # In a real implementation, we'd use VAD + clustering
             segments = [{
-                "start": 0.0,
-                "end": duration,
+                "start": start,
+                "end": end,
                 "speaker": "SPEAKER_00",
-                "duration": duration
-            }]
+                "duration": end - start
+            } for start, end in turns]
             
             speakers = ["SPEAKER_00"]
             
             logger.info(f"Simple diarization complete: found {len(speakers)} speaker in {len(segments)} segments")
             
             return {
-                "model": "simple_vad_fallback",
+                "model": model,
                 "speakers": speakers,
                 "segments": segments,
                 "total_speakers": len(speakers),
@@ -126,7 +152,7 @@ class PyAnnoteAdapter:
             }
             
         except ImportError:
-            logger.error("librosa not available for simple diarization")
+            logger.error("Neither soundfile nor librosa available for simple diarization")
             # Even simpler fallback - just create a single segment
             segments = [{
                 "start": 0.0,
@@ -143,35 +169,107 @@ class PyAnnoteAdapter:
                 "total_segments": 1
             }
     
+    @staticmethod
+    def _get_audio_duration(audio_path: Path) -> float:
+        """Audio duration in seconds without decoding the samples."""
+        try:
+            import soundfile as sf
+            
+            info = sf.info(str(audio_path))
+            return info.frames / info.samplerate
+        except (ImportError, RuntimeError) as e:
+            # RuntimeError: format libsndfile cannot read (e.g. mp3 on old versions)
+            logger.debug(f"soundfile cannot read {audio_path} header, using librosa: {e}")
+        
+        import librosa
+        return librosa.get_duration(path=str(audio_path))
+    
+    @staticmethod
+    def _silero_speech_turns(audio_path: Path, audio: Optional[Any] = None) -> Optional[List[Tuple[float, float]]]:
+        """Speech regions from Silero VAD, or None if silero-vad is not installed."""
+        if importlib.util.find_spec("silero_vad") is None:
+            return None
+        
+        import torch
+        from silero_vad import read_audio, get_speech_timestamps
+        
+        model = _load_silero_vad()
+        if audio is not None:
+            wav = torch.from_numpy(audio)
+        else:
+            wav = read_audio(str(audio_path), sampling_rate=SAMPLE_RATE)
+        with torch.inference_mode():
+            timestamps = get_speech_timestamps(wav, model, sampling_rate=SAMPLE_RATE, return_seconds=True)
+        
+        return [(float(ts["start"]), float(ts["end"])) for ts in timestamps]
+    
     def merge_transcript_diarization(self, transcript_segments: List[Dict[str, Any]], diarization_segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Merge ASR transcript with diarization results."""
+        """Merge ASR transcript with diarization results.
+        
+        Each transcript segment takes the speaker of the diarization segment
+        it overlaps most (first one wins ties), or SPEAKER_00 if none overlap.
+        The turn index is reused across calls with the same diarization list,
+        so merging one segment at a time costs O(log M) per segment.
+        """
         logger.info("Merging transcript with diarization results")
         
-        merged_segments = []
+        index = self._turn_index
+        if index is None or index.segments is not diarization_segments or len(index) != len(diarization_segments):
+            index = self._turn_index = _TurnIndex(diarization_segments)
         
-        for transcript_seg in transcript_segments:
-            # Find overlapping diarization segments
-            best_overlap = 0
-            best_speaker = "SPEAKER_00"  # Default speaker
-            
-            for diar_seg in diarization_segments:
-                # Calculate overlap between transcript segment and diarization segment
-                overlap_start = max(transcript_seg["start"], diar_seg["start"])
-                overlap_end = min(transcript_seg["end"], diar_seg["end"])
-                overlap_duration = max(0, overlap_end - overlap_start)
-                
-                if overlap_duration > best_overlap:
-                    best_overlap = overlap_duration
-                    best_speaker = diar_seg["speaker"]
-            
+        speakers = [index.best_speaker(seg["start"], seg["end"]) for seg in transcript_segments]
+        
+        merged_segments = []
+        for transcript_seg, speaker in zip(transcript_segments, speakers):
             # Create merged segment
             merged_segment = transcript_seg.copy()
-            merged_segment["speaker"] = best_speaker
+            merged_segment["speaker"] = speaker
             merged_segments.append(merged_segment)
         
         logger.info(f"Merged {len(transcript_segments)} transcript segments with diarization")
         return merged_segments
     
+    def assign_word_speakers(self, words: WordColumns, diarization_segments: List[Dict[str, Any]]) -> WordColumns:
+        """Label each word with the diarization turn containing its start.
+        
+        One `searchsorted` over turn starts finds each word's latest-starting
+        turn. Words that turn does not contain, but that an earlier, longer
+        turn may still cover, scan back only as far as the running max of
+        turn ends allows. Where turns overlap, the latest-starting containing
+        turn wins; words outside every turn get SPEAKER_00. Speakers are
+        stored on `words`, which is returned.
+        """
+        import numpy as np
+        
+        if not diarization_segments or len(words) == 0:
+            words.speakers = ["SPEAKER_00"] * len(words)
+            return words
+        
+        order = sorted(range(len(diarization_segments)), key=lambda i: diarization_segments[i]["start"])
+        turn_starts = np.array([diarization_segments[i]["start"] for i in order], dtype=np.float64)
+        turn_ends = np.array([diarization_segments[i]["end"] for i in order], dtype=np.float64)
+        turn_speakers = np.array(["SPEAKER_00"] + [diarization_segments[i]["speaker"] for i in order], dtype=object)
+        max_ends = np.maximum.accumulate(turn_ends)
+        
+        idx = np.searchsorted(turn_starts, words.starts, side="right") - 1
+        clipped = np.maximum(idx, 0)
+        inside = (idx >= 0) & (words.starts < turn_ends[clipped])
+        # Shift by one so index 0 is the SPEAKER_00 fallback
+        chosen = np.where(inside, idx + 1, 0)
+        
+        # An earlier turn still covers the word only if some end reaches past it
+        covered = ~inside & (idx >= 0) & (words.starts < max_ends[clipped])
+        for w in np.flatnonzero(covered):
+            start = words.starts[w]
+            lo = int(np.searchsorted(max_ends, start, side="right"))
+            for j in range(int(idx[w]) - 1, lo - 1, -1):
+                if start < turn_ends[j]:
+                    chosen[w] = j + 1
+                    break
+        
+        words.speakers = turn_speakers[chosen].tolist()
+        return words
+    
     def enroll_speakers(self, audio_segments: List[Dict[str, Any]], speaker_names: Dict[str, str]) -> Dict[str, str]:
         """Enroll known speakers for improved identification."""
         # TODO: Use SpeechBrain ECAPA embeddings for Phase 3
@@ -181,11 +279,11 @@ class PyAnnoteAdapter:
     
     @staticmethod
     def check_pyannote() -> bool:
-        """Check if pyannote.audio is available."""
+        """Check if pyannote.audio is installed (without importing it)."""
         try:
-            from pyannote.audio import Pipeline
-            return True
-        except ImportError:
+            return importlib.util.find_spec("pyannote.audio") is not None
+        except ModuleNotFoundError:
+            # Parent `pyannote` namespace package is missing
             return False
     
     def cleanup(self) -> None:
@@ -195,7 +293,53 @@ class PyAnnoteAdapter:
             self.pipeline = None
             
         # Clear CUDA cache if using GPU
+        import torch
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
         
-        logger.info("Pyannote models cleaned up")
\ No newline at end of file
+        logger.info("Pyannote models cleaned up")
+
+
+@functools.lru_cache(maxsize=1)
+def _load_silero_vad() -> Any:
+    """Load the Silero VAD model once per process (bundled with the package, no download)."""
+    from silero_vad import load_silero_vad
+    return load_silero_vad()
+
+
+class _TurnIndex:
+    """Diarization turns sorted by start time for overlap lookups.
+    
+    Turns may overlap (simultaneous speakers), so the lower search bound uses
+    the running maximum of end times rather than the ends themselves.
+    """
+    
+    def __init__(self, segments: List[Dict[str, Any]]):
+        self.segments = segments
+        self.order = sorted(range(len(segments)), key=lambda i: segments[i]["start"])
+        self.starts = [segments[i]["start"] for i in self.order]
+        self.ends = [segments[i]["end"] for i in self.order]
+        self.speakers = [segments[i]["speaker"] for i in self.order]
+        
+        self.max_ends = []
+        running = float("-inf")
+        for end in self.ends:
+            running = max(running, end)
+            self.max_ends.append(running)
+    
+    def __len__(self) -> int:
+        return len(self.order)
+    
+    def best_speaker(self, start: float, end: float) -> str:
+        """Speaker overlapping [start, end] the most, SPEAKER_00 if none."""
+        # Turns before `lo` all end by `start`; turns from `hi` start at or after `end`
+        lo = bisect.bisect_right(self.max_ends, start)
+        hi = bisect.bisect_left(self.starts, end)
+        
+        best_overlap, best_order, best = 0, None, None
+        for i in range(lo, hi):
+            overlap = min(end, self.ends[i]) - max(start, self.starts[i])
+            if overlap > best_overlap or (overlap == best_overlap and best is not None and self.order[i] < best_order):
+                best_overlap, best_order, best = overlap, self.order[i], i
+        
+        return self.speakers[best] if best is not None else "SPEAKER_00"
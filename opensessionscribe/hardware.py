@@ -1,22 +1,39 @@
 """Hardware detection and optimal configuration selection."""
 
+import functools
 import platform
 import subprocess
+import sys
 import logging
+import time
+from pathlib import Path
 from typing import Tuple, Optional
+import json
 import psutil
 
 
 logger = logging.getLogger(__name__)
 
+HARDWARE_CACHE_FILE = Path.home() / ".opensessionscribe" / "cache" / "hardware.json"
+HARDWARE_CACHE_TTL_SEC = 7 * 24 * 60 * 60  # Hardware rarely changes; refresh explicitly after upgrades
+
 
 class HardwareDetector:
-    """Detect system capabilities and recommend optimal settings."""
+    """Detect system capabilities and recommend optimal settings.
+    
+    Probes are memoized per process: hardware does not change while we run,
+    and GPU detection may spawn nvidia-smi or import torch.
+    """
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def detect_gpu() -> Tuple[bool, Optional[str]]:
         """Detect GPU availability and type (CUDA/MPS)."""
-        # Check for NVIDIA CUDA
+        # Check for NVIDIA CUDA, cheapest probe first
+        cuda = HardwareDetector._probe_cuda_in_process()
+        if cuda is not None:
+            return (True, "cuda") if cuda else HardwareDetector._detect_mps()
+        
         try:
             result = subprocess.run(
                 ["nvidia-smi", "--query-gpu=name", "--format=csv,noheader"], 
@@ -27,6 +44,39 @@ class HardwareDetector:
         except (subprocess.TimeoutExpired, FileNotFoundError):
             pass
         
+        return HardwareDetector._detect_mps()
+    
+    @staticmethod
+    def _probe_cuda_in_process() -> Optional[bool]:
+        """Ask NVML (or an already-imported torch) for CUDA devices.
+        
+        Returns None when neither is usable so the caller can fall back to
+        forking nvidia-smi. torch is only consulted if something else has
+        already imported it; importing it here would cost more than the
+        subprocess it replaces.
+        """
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            try:
+                return pynvml.nvmlDeviceGetCount() > 0
+            finally:
+                pynvml.nvmlShutdown()
+        except ImportError:
+            pass
+        except Exception as e:
+            # NVMLError when no driver is present
+            logger.debug(f"NVML probe failed: {e}")
+        
+        torch = sys.modules.get("torch")
+        if torch is not None:
+            return torch.cuda.is_available()
+        
+        return None
+    
+    @staticmethod
+    def _detect_mps() -> Tuple[bool, Optional[str]]:
+        """Detect Apple Metal Performance Shaders."""
         # Check for Apple Metal Performance Shaders (M1/M2 Macs)
         if platform.system() == "Darwin" and platform.machine() == "arm64":
             try:
@@ -41,11 +91,57 @@ class HardwareDetector:
         return False, None
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def detect_cuda_library() -> bool:
+        """Check whether the CUDA driver library can be located on this system."""
+        import ctypes.util
+        return ctypes.util.find_library("cuda") is not None
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def gpu_supports_bf16() -> bool:
+        """Check whether the CUDA GPU has native bfloat16 (compute capability 8.0+)."""
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            try:
+                major, _ = pynvml.nvmlDeviceGetCudaComputeCapability(pynvml.nvmlDeviceGetHandleByIndex(0))
+                return major >= 8
+            finally:
+                pynvml.nvmlShutdown()
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.debug(f"NVML compute capability probe failed: {e}")
+        
+        try:
+            import torch
+            return torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+        except ImportError:
+            return False
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def cpu_has_vnni() -> bool:
+        """Check for AVX-512 VNNI / AVX-VNNI int8 dot-product instructions."""
+        try:
+            with open("/proc/cpuinfo", 'r') as f:
+                for line in f:
+                    if line.startswith("flags"):
+                        flags = line.split(":", 1)[1].split()
+                        return "avx512_vnni" in flags or "avx_vnni" in flags
+        except OSError:
+            pass  # Not Linux
+        return False
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
     def get_system_ram() -> int:
         """Get total system RAM in GB."""
         return psutil.virtual_memory().total // (1024**3)
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def get_cpu_info() -> Tuple[int, str]:
         """Get CPU core count and architecture."""
         cores = psutil.cpu_count(logical=False)
@@ -95,11 +191,13 @@ class HardwareDetector:
             "gpu": {
                 "available": has_gpu,
                 "type": gpu_type,
-                "device": cls.get_optimal_device()
+                "device": cls.get_optimal_device(),
+                "cuda_library": cls.detect_cuda_library()
             },
             "cpu": {
                 "cores": cores,
-                "architecture": arch
+                "architecture": arch,
+                "vnni": cls.cpu_has_vnni()
             },
             "memory": {
                 "total_gb": ram_gb
@@ -108,4 +206,32 @@ class HardwareDetector:
                 "whisper_model": cls.recommend_whisper_model(),
                 "device": cls.get_optimal_device()
             }
-        }
\ No newline at end of file
+        }
+    
+    @classmethod
+    def get_hardware_summary_cached(cls, ttl: float = HARDWARE_CACHE_TTL_SEC, refresh: bool = False) -> dict:
+        """Get the hardware summary, shared across processes via an on-disk cache.
+        
+        Worker processes and repeated CLI runs read the cached JSON instead of
+        re-probing while it is younger than `ttl` seconds. The cache is
+        written atomically so concurrent readers never see a partial file.
+        """
+        if not refresh:
+            try:
+                if time.time() - HARDWARE_CACHE_FILE.stat().st_mtime < ttl:
+                    with open(HARDWARE_CACHE_FILE, 'rb') as f:
+                        return json.load(f)
+            except (OSError, ValueError):
+                pass  # Missing or corrupt cache, re-detect
+        
+        summary = cls.get_hardware_summary()
+        
+        try:
+            from .utils.jsonio import write_json_atomic
+            
+            HARDWARE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(HARDWARE_CACHE_FILE, summary)
+        except OSError as e:
+            logger.debug(f"Could not write hardware cache: {e}")
+        
+        return summary
@@ -1,18 +1,47 @@
 """Media download using yt-dlp."""
 
+import hashlib
+import unicodedata
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import json
 import tempfile
 import logging
+import shutil
 
 from ..config import Config
 from ..utils.ffmpeg import FFmpegProcessor
+from ..utils.jsonio import write_json_atomic
 
 
 logger = logging.getLogger(__name__)
 
+# yt-dlp format URLs are signed and expire, so a cached info JSON is only
+# handed to the download step (--load-info-json) while this fresh
+INFO_REUSE_MAX_AGE = 10 * 60  # seconds
+
+# Deletes every ASCII character that is not alphanumeric or one of " -_."
+# and maps path separators to "_"
+_SAFE_TITLE_TRANS = str.maketrans(
+    {chr(i): None for i in range(128) if not (chr(i).isalnum() or chr(i) in ' -_.')}
+)
+_SAFE_TITLE_TRANS.update(str.maketrans({'/': '_', '\\': '_'}))
+
+
+def make_safe_title(title: str, max_length: int = 100) -> str:
+    """Turn a media title into a filesystem-safe file stem.
+    
+    NFKC folds full-width forms to ASCII while keeping accented and CJK
+    letters composed, so most titles are handled by one `str.translate` call.
+    """
+    title = unicodedata.normalize('NFKC', title).translate(_SAFE_TITLE_TRANS)
+    if not title.isascii():
+        title = ''.join(c for c in title if c.isascii() or c.isalnum())
+    return title[:max_length]
+
 
 class MediaDownloader:
     """Download media from URLs using yt-dlp."""
@@ -29,16 +58,44 @@ class MediaDownloader:
         
         return media_info
     
+    def download_batch(self, urls: List[str], output_dirs: List[Path]) -> Iterator[Optional[Dict[str, Any]]]:
+        """Download several URLs, overlapping network and CPU work.
+        
+        While ffmpeg extracts audio for one item, yt-dlp is already fetching
+        the next, and that download keeps running while the caller processes
+        the yielded item. Yields media info per URL in order, or None if that
+        URL failed (the error is logged).
+        """
+        def fetch(i: int) -> Dict[str, Any]:
+            output_dirs[i].mkdir(parents=True, exist_ok=True)
+            return self._fetch_media(urls[i], output_dirs[i])
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pending = executor.submit(fetch, 0) if urls else None
+            for i, url in enumerate(urls):
+                current = pending
+                if i + 1 < len(urls):
+                    pending = executor.submit(fetch, i + 1)
+                
+                try:
+                    yield self._prepare_media(current.result(), output_dirs[i])
+                except Exception as e:
+                    logger.error(f"Download failed for {url}: {e}")
+                    yield None
+    
     def _download_media(self, url: str, output_dir: Path) -> Dict[str, Any]:
-        """Use yt-dlp to download media."""
+        """Use yt-dlp to download media and prepare audio."""
+        return self._prepare_media(self._fetch_media(url, output_dir), output_dir)
+    
+    def _fetch_media(self, url: str, output_dir: Path) -> Dict[str, Any]:
+        """Use yt-dlp to download media (network-bound stage)."""
         logger.info(f"Downloading media from: {url}")
         
         # Get video info first
-        info = self.get_info(url)
+        info, info_age = self._get_info_with_age(url)
         
         # Determine output format and filename
-        title = info.get('title', 'video').replace('/', '_').replace('\\', '_')
-        safe_title = ''.join(c for c in title if c.isalnum() or c in ' -_.')[:100]
+        safe_title = make_safe_title(info.get('title', 'video'))
         
         # Download with yt-dlp
         output_template = str(output_dir / f"{safe_title}.%(ext)s")
@@ -49,37 +106,30 @@ class MediaDownloader:
             "--output", output_template,
             "--write-info-json",
             "--no-playlist",
-            url
+            "--print", "after_move:filepath",  # Report the final path on stdout
+            *self._download_options(),
         ]
         
         # Note: Removed --no-check-updates as it's not available in all yt-dlp versions
         
-        logger.debug(f"Running yt-dlp: {' '.join(cmd)}")
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            logger.debug(f"yt-dlp output: {result.stdout}")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"yt-dlp failed: {e.stderr}")
-            raise RuntimeError(f"Failed to download {url}: {e.stderr}")
-        
-        # Find downloaded file
-        media_files = list(output_dir.glob(f"{safe_title}.*"))
-        media_files = [f for f in media_files if f.suffix in ['.mp4', '.mkv', '.webm', '.mp3', '.m4a', '.wav']]
-        
-        if not media_files:
-            raise RuntimeError(f"No media file found after download")
+        # Reuse the metadata we just extracted instead of extracting it again
+        info_path = self._info_cache_path(url)
+        if info_age < INFO_REUSE_MAX_AGE and info_path.exists():
+            try:
+                stdout = self._run_ytdlp(cmd + ["--load-info-json", str(info_path)])
+            except subprocess.CalledProcessError as e:
+                logger.debug(f"yt-dlp could not reuse cached info, extracting again: {e.stderr}")
+                stdout = self._run_ytdlp_download(cmd + [url], url)
+        else:
+            stdout = self._run_ytdlp_download(cmd + [url], url)
         
-        media_path = media_files[0]
+        media_path = self._downloaded_path(stdout, output_dir / f"{safe_title}.info.json")
         logger.info(f"Downloaded: {media_path}")
         
         # Get media info using ffmpeg
-        media_info = FFmpegProcessor.get_media_info(media_path)
+        media_info = FFmpegProcessor.get_media_info(media_path, self.config.cache_dir)
         has_video = 'video' in media_info
         
-        # Prepare audio
-        audio_path = self._prepare_audio({"media_path": media_path, "has_video": has_video}, output_dir)
-        
         media_info.update({
             "url": url,
             "title": info.get('title', ''),
@@ -88,30 +138,131 @@ class MediaDownloader:
             "upload_date": info.get('upload_date', ''),
             "media_path": media_path,
             "video_path": media_path if has_video else None,
-            "audio_path": audio_path,
             "has_video": has_video
         })
         
         return media_info
     
-    def _prepare_audio(self, media_info: Dict[str, Any], output_dir: Path) -> Path:
-        """Extract and normalize audio for ASR processing."""
+    def _prepare_media(self, media_info: Dict[str, Any], output_dir: Path) -> Dict[str, Any]:
+        """Extract audio for downloaded media (CPU-bound stage)."""
+        media_info["audio_path"], media_info["audio"] = self._prepare_audio(media_info, output_dir)
+        return media_info
+    
+    def _prepare_audio(self, media_info: Dict[str, Any], output_dir: Path) -> Tuple[Path, Any]:
+        """Extract and normalize audio for ASR processing.
+        
+        Returns the path of the 16 kHz mono WAV written to `output_dir` and
+        the same samples as a float32 array, both from one ffmpeg decode, so
+        ASR does not have to read the WAV back.
+        """
         media_path = media_info["media_path"]
         audio_output = output_dir / "audio.wav"
         
         logger.info(f"Extracting audio: {media_path} -> {audio_output}")
         
         try:
-            FFmpegProcessor.extract_audio(media_path, audio_output, sample_rate=16000)
+            audio = FFmpegProcessor.extract_audio_np(media_path, sample_rate=16000, wav_path=audio_output)
         except Exception as e:
             logger.error(f"Audio extraction failed: {e}")
             raise RuntimeError(f"Failed to extract audio from {media_path}: {e}")
         
         logger.info(f"Audio prepared: {audio_output}")
-        return audio_output
+        return audio_output, audio
+    
+    def _download_options(self) -> List[str]:
+        """yt-dlp flags for parallel fragment / ranged downloading."""
+        options = ["--concurrent-fragments", str(self.config.ytdlp_concurrent_fragments or 1)]
+        
+        downloader = self.config.external_downloader
+        if downloader is None:
+            downloader = "aria2c" if shutil.which("aria2c") else "native"
+        
+        if downloader == "aria2c":
+            options += ["--downloader", "aria2c", "--downloader-args", "aria2c:-x 16 -s 16 -k 1M"]
+        elif downloader != "native":
+            options += ["--downloader", downloader]
+        else:
+            # Ranged GETs for progressive (non-fragmented) files
+            options += ["--http-chunk-size", "10M"]
+        
+        return options
+    
+    @staticmethod
+    def _run_ytdlp(cmd: List[str]) -> str:
+        """Run yt-dlp and return its stdout, raising CalledProcessError on failure."""
+        logger.debug(f"Running yt-dlp: {' '.join(cmd)}")
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        logger.debug(f"yt-dlp output: {result.stdout}")
+        return result.stdout
+    
+    def _run_ytdlp_download(self, cmd: List[str], url: str) -> str:
+        """Run a yt-dlp download, converting failures to RuntimeError."""
+        try:
+            return self._run_ytdlp(cmd)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"yt-dlp failed: {e.stderr}")
+            raise RuntimeError(f"Failed to download {url}: {e.stderr}")
+    
+    @staticmethod
+    def _downloaded_path(stdout: str, info_json_path: Path) -> Path:
+        """Locate the downloaded file from yt-dlp's printed final path.
+        
+        Falls back to the `_filename` recorded in the info-json sidecar
+        for yt-dlp builds that print nothing.
+        """
+        for line in reversed(stdout.splitlines()):
+            candidate = Path(line.strip())
+            if line.strip() and candidate.is_file():
+                return candidate.resolve()
+        
+        try:
+            with open(info_json_path, 'rb') as f:
+                candidate = Path(json.load(f)["_filename"])
+            if candidate.is_file():
+                return candidate.resolve()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Could not read filename from {info_json_path}: {e}")
+        
+        raise RuntimeError(f"No media file found after download")
+    
+    def _info_cache_path(self, url: str) -> Path:
+        """On-disk location of the cached yt-dlp metadata for `url`."""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        return self.config.cache_dir / f"ytdlp-{digest}.json"
     
     def get_info(self, url: str) -> Dict[str, Any]:
-        """Get media information without downloading."""
+        """Get media information without downloading.
+        
+        Results are cached in `cache_dir` for `info_cache_ttl_sec` (forever
+        when `offline_only`), so re-runs on the same URL skip the network.
+        """
+        return self._get_info_with_age(url)[0]
+    
+    def _get_info_with_age(self, url: str) -> Tuple[Dict[str, Any], float]:
+        """Get media information and the age in seconds of the cached copy."""
+        cache_path = self._info_cache_path(url)
+        try:
+            age = time.time() - cache_path.stat().st_mtime
+            if self.config.offline_only or age < self.config.info_cache_ttl_sec:
+                with open(cache_path, 'rb') as f:
+                    info = json.load(f)
+                logger.debug(f"Using cached info for: {url}")
+                return info, age
+        except (OSError, ValueError):
+            pass  # Missing or corrupt cache, fetch again
+        
+        info = self._fetch_info(url)
+        
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(cache_path, info)
+        except OSError as e:
+            logger.debug(f"Could not cache info for {url}: {e}")
+        
+        return info, 0.0
+    
+    def _fetch_info(self, url: str) -> Dict[str, Any]:
+        """Run yt-dlp to extract media information."""
         logger.debug(f"Getting info for: {url}")
         
         cmd = [
@@ -137,11 +288,5 @@ class MediaDownloader:
     
     @staticmethod
     def check_ytdlp() -> bool:
-        """Check if yt-dlp is available."""
-        try:
-            result = subprocess.run(["yt-dlp", "--version"], 
-                                  capture_output=True, text=True, check=True)
-            logger.debug(f"yt-dlp version: {result.stdout.strip()}")
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
\ No newline at end of file
+        """Check if yt-dlp is on PATH."""
+        return shutil.which("yt-dlp") is not None
\ No newline at end of file
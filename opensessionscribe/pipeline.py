@@ -1,34 +1,185 @@
 """Main processing pipeline orchestration."""
 
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from contextlib import contextmanager
+from functools import cached_property
+from typing import TYPE_CHECKING, Optional, Dict, Any, BinaryIO, Iterator, List, Tuple
 import logging
-import json
-import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from pydantic import BaseModel
+from pydantic_core import to_json
+
 from .config import Config
 from .schemas.package import Package, Source, Transcript, Segment, Word, Slide, Speaker, Manifest
 from .ingest.downloader import MediaDownloader
-from .asr.whisperx_adapter import WhisperXAdapter
-from .diarize.pyannote_adapter import PyAnnoteAdapter
-from .slides.processor import SlideProcessor
-from .utils.ffmpeg import FFmpegProcessor
+from .utils.audio import AudioBuffer
+from .utils import hashing
+from .utils.jsonio import write_json
+
+if TYPE_CHECKING:
+    from .asr.whisperx_adapter import WhisperXAdapter
+    from .diarize.pyannote_adapter import PyAnnoteAdapter
+    from .slides.processor import SlideProcessor
+    from .utils.ffmpeg import FFmpegProcessor
 
 
 logger = logging.getLogger(__name__)
 
+# Loaded ASR/diarization adapters shared by every pipeline in the process,
+# keyed by the settings that determine which models get loaded
+_adapter_registry: Dict[Tuple[Any, ...], Tuple["WhisperXAdapter", "PyAnnoteAdapter"]] = {}
+_registry_lock = threading.Lock()
+
+
+def _stream_write_package(model: BaseModel, fp: BinaryIO, _level: int = 0) -> None:
+    """Write `model` as indented JSON, serializing list items one at a time.
+    
+    Output matches `model.model_dump_json(indent=2)`, but a long transcript
+    never exists as one encoded string: each segment, slide, etc. is dumped
+    and written on its own.
+    """
+    pad = b"  " * _level
+    inner = pad + b"  "
+    
+    fp.write(b"{\n")
+    for i, name in enumerate(type(model).model_fields):
+        value = getattr(model, name)
+        if i:
+            fp.write(b",\n")
+        fp.write(inner + to_json(name) + b": ")
+        
+        if isinstance(value, BaseModel):
+            _stream_write_package(value, fp, _level + 1)
+        elif isinstance(value, list) and value and isinstance(value[0], BaseModel):
+            item_pad = inner + b"  "
+            for j, item in enumerate(value):
+                fp.write(b"[\n" if j == 0 else b",\n")
+                encoded = item.model_dump_json(indent=2).encode("utf-8")
+                fp.write(item_pad + encoded.replace(b"\n", b"\n" + item_pad))
+            fp.write(b"\n" + inner + b"]")
+        else:
+            fp.write(to_json(value, indent=2).replace(b"\n", b"\n" + inner))
+    fp.write(b"\n" + pad + b"}")
+
+
+def _adapter_key(config: Config) -> Tuple[Any, ...]:
+    """Settings that require reloading the models when they change.
+    
+    Includes everything the adapters apply while loading models, including
+    the batch size and how alignment models are prepared.
+    """
+    return (
+        config.whisper_model, config.device, config.force_cpu, config.compute_type, config.batch_size,
+        config.compile_alignment, config.cpu_quantize_alignment, config.diarization_model,
+    )
+
+
+def _get_shared_adapters(config: Config) -> Tuple["WhisperXAdapter", "PyAnnoteAdapter"]:
+    """Return the process-wide adapters for `config`, creating them if needed.
+    
+    Only one model set is kept resident: asking for a different model
+    configuration releases the previous one first. The adapters keep the
+    config they were created with, since other pipelines may be using them;
+    per-call settings are passed to each call instead.
+    """
+    key = _adapter_key(config)
+    with _registry_lock:
+        adapters = _adapter_registry.get(key)
+        if adapters is None:
+            from .asr.whisperx_adapter import WhisperXAdapter
+            from .diarize.pyannote_adapter import PyAnnoteAdapter
+            
+            _release_shared_adapters_locked()
+            adapters = _adapter_registry[key] = (WhisperXAdapter(config), PyAnnoteAdapter(config))
+    return adapters
+
+
+def _release_shared_adapters_locked() -> None:
+    """Unload all shared adapters (caller holds `_registry_lock`)."""
+    for asr, diarizer in _adapter_registry.values():
+        asr.cleanup()
+        diarizer.cleanup()
+    _adapter_registry.clear()
+
 
 class ProcessingPipeline:
-    """Main pipeline for processing podcasts and webinars."""
+    """Main pipeline for processing podcasts and webinars.
+    
+    ASR and diarization models are shared across pipelines and stay loaded
+    between `process_url` calls. Use the pipeline as a context manager (or
+    call `close()`) to release them. Adapters are imported and created on
+    first use, so code that only downloads or inspects media never pays for
+    the ML stack.
     
-    def __init__(self, config: Config):
+    Components can be passed in (e.g. test doubles) instead of being
+    created from the config.
+    """
+    
+    def __init__(
+        self,
+        config: Config,
+        downloader: Optional[MediaDownloader] = None,
+        asr: Optional["WhisperXAdapter"] = None,
+        diarizer: Optional["PyAnnoteAdapter"] = None,
+        slide_processor: Optional["SlideProcessor"] = None
+    ):
         self.config = config
-        self.downloader = MediaDownloader(config)
-        self.asr = WhisperXAdapter(config)
-        self.diarizer = PyAnnoteAdapter(config)
-        self.slide_processor = SlideProcessor(config)
-        self.ffmpeg = FFmpegProcessor()
+        self.downloader = downloader if downloader is not None else MediaDownloader(config)
+        self._injected_adapters = (asr, diarizer)
+        if slide_processor is not None:
+            self.slide_processor = slide_processor
+    
+    @cached_property
+    def _adapters(self) -> Tuple["WhisperXAdapter", "PyAnnoteAdapter"]:
+        asr, diarizer = self._injected_adapters
+        if asr is None or diarizer is None:
+            shared_asr, shared_diarizer = _get_shared_adapters(self.config)
+            asr = asr if asr is not None else shared_asr
+            diarizer = diarizer if diarizer is not None else shared_diarizer
+        return asr, diarizer
+    
+    @property
+    def asr(self) -> "WhisperXAdapter":
+        return self._adapters[0]
+    
+    @property
+    def diarizer(self) -> "PyAnnoteAdapter":
+        return self._adapters[1]
+    
+    @cached_property
+    def slide_processor(self) -> "SlideProcessor":
+        from .slides.processor import SlideProcessor
+        return SlideProcessor(self.config)
+    
+    @cached_property
+    def ffmpeg(self) -> "FFmpegProcessor":
+        from .utils.ffmpeg import FFmpegProcessor
+        return FFmpegProcessor()
+    
+    def __enter__(self) -> "ProcessingPipeline":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    @contextmanager
+    def session(self) -> Iterator["ProcessingPipeline"]:
+        """Keep models loaded for a batch of calls, releasing them afterwards."""
+        try:
+            yield self
+        finally:
+            self.close()
+    
+    def close(self) -> None:
+        """Release loaded models (including VRAM held by the shared adapters)."""
+        if "_adapters" in self.__dict__:
+            with _registry_lock:
+                if _adapter_registry.get(_adapter_key(self.config)) == self._adapters:
+                    del _adapter_registry[_adapter_key(self.config)]
+        self._cleanup()
     
     def process_url(self, url: str, output_dir: Path) -> Package:
         """Process a URL (YouTube, podcast, etc.) into a complete package."""
@@ -41,45 +192,98 @@ class ProcessingPipeline:
             logger.info("Phase 1: Downloading media...")
             media_info = self.downloader.download(url, output_dir)
             
-            # Phase 2: Process transcript with speaker diarization
-            logger.info("Phase 2: Processing transcript...")
-            transcript_data = self._process_transcript(media_info, output_dir)
-            
-            # Phase 3: Process slides (if video and enabled)
-            slides_data = []
-            if media_info.get("has_video") and self.config.enable_slides:
-                logger.info("Phase 3: Processing slides...")
-                slides_data = self._process_slides(media_info, output_dir)
-            
-            # Phase 4: Create final package
-            logger.info("Phase 4: Creating package...")
-            package = self._create_package(url, media_info, transcript_data, slides_data, output_dir)
-            
-            # Phase 5: Export and generate manifest
-            logger.info("Phase 5: Exporting package...")
-            self._export_package(package, output_dir)
-            
-            logger.info(f"Processing complete! Package saved to: {output_dir}")
-            return package
+            return self._process_media(url, media_info, output_dir)
             
         except Exception as e:
             logger.error(f"Pipeline failed: {e}")
             raise
-        finally:
-            # Cleanup loaded models
-            self._cleanup()
+    
+    def process_urls(self, urls: List[str], output_root: Path) -> List[Optional[Package]]:
+        """Process several URLs into `output_root/000`, `001`, ...
+        
+        The next URL downloads while the current one is transcribed. Returns one entry per URL, None
+        where processing failed.
+        """
+        output_root = Path(output_root)
+        output_dirs = [output_root / f"{i:03d}" for i in range(len(urls))]
+        packages: List[Optional[Package]] = []
+        
+        media_infos = self.downloader.download_batch(urls, output_dirs)
+        for url, output_dir, media_info in zip(urls, output_dirs, media_infos):
+            if media_info is None:
+                packages.append(None)
+                continue
+            
+            try:
+                packages.append(self._process_media(url, media_info, output_dir))
+            except Exception as e:
+                logger.error(f"Pipeline failed for {url}: {e}")
+                packages.append(None)
+        
+        return packages
+    
+    def _process_media(self, url: str, media_info: Dict[str, Any], output_dir: Path) -> Package:
+        """Run phases 2-5 on downloaded media."""
+        # Phase 2: Process transcript with speaker diarization
+        logger.info("Phase 2: Processing transcript...")
+        transcript_data = self._process_transcript(media_info, output_dir)
+        
+        # Phase 3: Process slides (if video and enabled)
+        slides_data = []
+        if media_info.get("has_video") and self.config.enable_slides:
+            logger.info("Phase 3: Processing slides...")
+            slides_data = self._process_slides(media_info, output_dir)
+        
+        # Phase 4: Create final package
+        logger.info("Phase 4: Creating package...")
+        package = self._create_package(url, media_info, transcript_data, slides_data, output_dir)
+        
+        # Phase 5: Export and generate manifest
+        logger.info("Phase 5: Exporting package...")
+        self._export_package(package, output_dir)
+        
+        logger.info(f"Processing complete! Package saved to: {output_dir}")
+        return package
     
     def _process_transcript(self, media_info: Dict[str, Any], output_dir: Path) -> Dict[str, Any]:
         """Process audio for transcript and speaker diarization."""
         audio_path = Path(media_info["audio_path"])
         
-        # Run ASR (transcription)
-        logger.info("Running speech recognition with WhisperX...")
-        transcript_result = self.asr.transcribe(audio_path)
+        # Samples decoded during download are shared by ASR and diarization;
+        # otherwise decode once into a memory-mapped scratch file
+        audio = media_info.pop("audio", None)
+        scratch_path = None
+        if audio is None:
+            scratch_path = AudioBuffer.decode_to_memmap(audio_path, self.config.cache_dir)
+            audio = AudioBuffer.open(scratch_path)
         
-        # Run speaker diarization
-        logger.info("Running speaker diarization...")
-        diarization_result = self.diarizer.diarize(audio_path)
+        try:
+            if self.config.concurrent_diarization:
+                # ASR and diarization only meet at the merge, so overlap them
+                # (torch releases the GIL inside its kernels)
+                logger.info("Running speech recognition with WhisperX and speaker diarization concurrently...")
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    transcript_future = executor.submit(
+                        self.asr.transcribe, audio_path, audio, keep_raw_result=self.config.keep_raw_result
+                    )
+                    diarization_future = executor.submit(self.diarizer.diarize, audio_path, audio)
+                    transcript_result = transcript_future.result()
+                    diarization_result = diarization_future.result()
+            else:
+                # Run ASR (transcription)
+                logger.info("Running speech recognition with WhisperX...")
+                transcript_result = self.asr.transcribe(audio_path, audio, keep_raw_result=self.config.keep_raw_result)
+                
+                # Run speaker diarization
+                logger.info("Running speaker diarization...")
+                diarization_result = self.diarizer.diarize(audio_path, audio)
+        finally:
+            del audio
+            if scratch_path is not None:
+                try:
+                    scratch_path.unlink()
+                except OSError as e:
+                    logger.debug(f"Could not remove audio scratch file {scratch_path}: {e}")
         
         # Merge transcript and diarization
         logger.info("Merging transcript with speaker labels...")
@@ -88,14 +292,12 @@ class ProcessingPipeline:
             diarization_result['segments']
         )
         
-        # Save individual results for debugging/reference
-        transcript_file = output_dir / "transcript_raw.json"
-        with open(transcript_file, 'w') as f:
-            json.dump(transcript_result, f, indent=2, ensure_ascii=False)
-            
-        diarization_file = output_dir / "diarization_raw.json"
-        with open(diarization_file, 'w') as f:
-            json.dump(diarization_result, f, indent=2)
+        # Save individual results for debugging/reference; per-word speakers
+        # are only kept in the raw transcript, as package words carry none
+        if self.config.save_debug_artifacts:
+            self.diarizer.assign_word_speakers(transcript_result['word_segments'], diarization_result['segments'])
+            write_json(output_dir / "transcript_raw.json.gz", transcript_result)
+            write_json(output_dir / "diarization_raw.json.gz", diarization_result)
         
         return {
             "language": transcript_result["language"],
@@ -114,10 +316,9 @@ class ProcessingPipeline:
         slides_data = self.slide_processor.process_video(video_path, output_dir)
         
         # Save raw slides data for debugging
-        slides_file = output_dir / "slides_raw.json"
-        with open(slides_file, 'w') as f:
-            slides_dict = [slide.model_dump() for slide in slides_data]
-            json.dump(slides_dict, f, indent=2, ensure_ascii=False)
+        if self.config.save_debug_artifacts:
+            slides_file = output_dir / "slides_raw.json.gz"
+            write_json(slides_file, (slide.model_dump() for slide in slides_data))
         
         return slides_data
     
@@ -127,16 +328,10 @@ class ProcessingPipeline:
         
         for seg_data in merged_segments:
             # Convert words if present
-            words = []
-            if 'words' in seg_data:
-                for word_data in seg_data['words']:
-                    word = Word(
-                        start=word_data['start'],
-                        end=word_data['end'],
-                        text=word_data['text'],
-                        conf=word_data.get('conf')
-                    )
-                    words.append(word)
+            words = [
+                Word.from_values(word_data['start'], word_data['end'], word_data['text'], word_data.get('conf'))
+                for word_data in seg_data.get('words', ())
+            ]
             
             # Create segment
             segment = Segment(
@@ -209,31 +404,25 @@ class ProcessingPipeline:
     def _export_package(self, package: Package, output_dir: Path) -> None:
         """Export package to JSON and generate manifest."""
         
-        # Generate file checksums for manifest
-        file_hashes = []
+        algorithm = self.config.hash_algorithm
+        if algorithm == "blake3" and hashing.blake3 is None:
+            logger.warning("blake3 not installed, using SHA-256 for the manifest")
+            algorithm = "sha256"
         
-        for file_path in output_dir.rglob("*"):
-            if file_path.is_file() and file_path.name != "package.json":
-                # Calculate SHA256 hash
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                    hash_value = hashlib.sha256(content).hexdigest()
-                
-                relative_path = file_path.relative_to(output_dir)
-                file_hashes.append({
-                    "path": str(relative_path),
-                    "sha256": hash_value,
-                    "size": len(content)
-                })
+        # Generate file checksums for manifest. Entries are keyed by algorithm
+        # name, so existing sha256 readers are unaffected, and carry size and
+        # mtime_ns so verify_manifest can skip unchanged files
+        manifest = hashing.generate_manifest(output_dir, algorithm, with_stat=True, exclude=("package.json",))
+        file_hashes = [{"path": rel_path, **entry} for rel_path, entry in manifest.items()]
         
         # Update manifest
         package.manifest.hashes = file_hashes
         
         # Write package.json
         package_file = output_dir / "package.json"
-        with open(package_file, 'w') as f:
-            package_dict = package.model_dump()
-            json.dump(package_dict, f, indent=2, ensure_ascii=False, default=str)
+        with open(package_file, "wb") as f:
+            _stream_write_package(package, f)
+            f.write(b"\n")
         
         logger.info(f"Package exported to {package_file}")
         logger.info(f"Manifest includes {len(file_hashes)} files")
@@ -241,9 +430,12 @@ class ProcessingPipeline:
     def _cleanup(self) -> None:
         """Clean up loaded models to free memory."""
         try:
-            self.asr.cleanup()
-            self.diarizer.cleanup()
-            self.slide_processor.cleanup()
+            # Only adapters that were actually created hold anything to free
+            if "_adapters" in self.__dict__:
+                self.asr.cleanup()
+                self.diarizer.cleanup()
+            if "slide_processor" in self.__dict__:
+                self.slide_processor.cleanup()
             logger.info("Pipeline cleanup complete")
         except Exception as e:
             logger.warning(f"Cleanup failed: {e}")
\ No newline at end of file
@@ -1,28 +1,153 @@
 """Slide change detection and frame extraction."""
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, BinaryIO, Iterator, List, Dict, Optional, Tuple
+import importlib.util
+import io
 import logging
+import os
+import re
+import shutil
 import subprocess
+import tempfile
+import threading
 import json
 
 from ..config import Config
 from ..utils.ffmpeg import FFmpegProcessor
+from ..utils.hashing import perceptual_hash_value
 
 
 logger = logging.getLogger(__name__)
 
+# Sampling used by frame-difference slide detection
+DIFF_FPS = 1
+DIFF_WIDTH = 160
+DIFF_HEIGHT = 90
+DIFF_BATCH_FRAMES = 256
+KEYFRAME_MAX_GAP_SEC = 10.0  # Sparser keyframes miss slide changes; decode every frame instead
+
+MAX_HASH_WORKERS = 8  # Threads hashing slide images for deduplication
+BKTREE_MIN_SLIDES = 32  # Below this, a vectorized linear scan is faster
+
+# showinfo / metadata=print timestamps in ffmpeg's log output
+_PTS_TIME_RE = re.compile(rb"pts_time:\s*(-?[0-9.]+)")
+
+FRAME_SEEK_OFFSET = 0.5  # Seconds past a slide change, to avoid transition blur
+MAX_INLINE_FILTER_CHARS = 30000  # Longer select filters go through a script file (Windows caps command lines at 32K)
+
+AUTO_CROP_SAMPLES = 10  # Leading unique slides analysed for the auto-crop region
+DECODED_CACHE_SLIDES = 2 * AUTO_CROP_SAMPLES  # Leading slides whose dedup decode auto-crop reuses
+
+
+def _popcount64(values):
+    """Number of set bits in each element of a uint64 array."""
+    import numpy as np
+    
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    
+    # SWAR popcount, avoids unpacking every hash into 64 bytes
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (values * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def _hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hash ints."""
+    return bin(a ^ b).count("1")  # int.bit_count needs Python 3.10
+
+
+def _drop_short_gaps(timestamps: List[float], min_gap: float) -> List[float]:
+    """Drop timestamps within `min_gap` seconds of the one before them."""
+    import numpy as np
+    
+    if not timestamps:
+        return []
+    ts = np.asarray(timestamps, dtype=np.float64)
+    keep = np.concatenate(([True], np.diff(ts) > min_gap))
+    return ts[keep].tolist()
+
+
+def _iter_jpeg_frames(stream: BinaryIO) -> Iterator[bytes]:
+    """Split a stream of concatenated JPEGs (ffmpeg image2pipe) into images.
+    
+    Inside entropy-coded data every 0xFF byte is followed by 0x00, so the
+    end-of-image marker FF D9 only appears at the end of each image.
+    """
+    buffer = b""
+    while True:
+        chunk = stream.read(1 << 16)
+        if not chunk:
+            return
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\xff\xd9", start)
+            if end < 0:
+                break
+            yield buffer[start:end + 2]
+            start = end + 2
+        buffer = buffer[start:]
+
+
+class _BKTree:
+    """BK-tree over 64-bit hashes for "anything within distance d?" queries.
+    
+    Children are keyed by their Hamming distance to the parent, so the
+    triangle inequality limits a query to edges in [dist - d, dist + d].
+    """
+    
+    def __init__(self):
+        self.root: Optional[Tuple[int, Dict[int, Any]]] = None
+    
+    def add(self, value: int) -> None:
+        if self.root is None:
+            self.root = (value, {})
+            return
+        node = self.root
+        while True:
+            distance = _hamming(value, node[0])
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (value, {})
+                return
+            node = child
+    
+    def has_within(self, value: int, max_distance: int) -> bool:
+        """True if some stored hash is at most `max_distance` bits from `value`."""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_value, children = stack.pop()
+            distance = _hamming(value, node_value)
+            if distance <= max_distance:
+                return True
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return False
+
 
 class SlideDetector:
     """Detect slide changes in video and extract keyframes."""
     
     def __init__(self, config: Config):
         self.config = config
+        # Grayscale pixels decoded while deduplicating, kept for auto-crop
+        self._decoded: Dict[Path, Any] = {}
     
     def detect_slides(self, video_path: Path) -> List[float]:
         """Detect slide change timestamps in video."""
         logger.info(f"Detecting slide changes in {video_path}")
         
+        try:
+            return self._detect_with_frame_diff(video_path)
+        except Exception as e:
+            logger.warning(f"Frame-difference detection failed, trying scene detection: {e}")
+        
         try:
             if self.check_scenedetect():
                 return self._detect_with_scenedetect(video_path)
@@ -39,24 +164,28 @@ class SlideDetector:
         logger.debug(f"Extracting frame at {timestamp}s from {video_path}")
         
         try:
-            ffmpeg = FFmpegProcessor()
-            
             # Add small offset to avoid transition blur
-            seek_time = max(0, timestamp + 0.5)
+            seek_time = max(0, timestamp + FRAME_SEEK_OFFSET)
             
-            # Use ffmpeg to extract high-quality frame
+            # -ss before -i seeks in the demuxer to the nearest keyframe and
+            # decodes only from there (accurate_seek trims to the exact time),
+            # so late timestamps cost the same as early ones
             cmd = [
                 "ffmpeg",
+                "-nostdin",
                 "-ss", str(seek_time),
                 "-i", str(video_path),
+                "-an",  # No audio
                 "-frames:v", "1",
                 "-q:v", "2",  # High quality
                 "-y",  # Overwrite output
                 str(output_path)
             ]
             
+            Path(output_path).unlink(missing_ok=True)
             result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
+            # Seeking past the end exits 0 without writing a frame
+            if result.returncode == 0 and Path(output_path).exists():
                 logger.debug(f"Frame extracted successfully to {output_path}")
                 return True
             else:
@@ -67,40 +196,201 @@ class SlideDetector:
             logger.error(f"Frame extraction failed: {e}")
             return False
     
-    def deduplicate_slides(self, slide_paths: List[Path]) -> List[Path]:
-        """Remove duplicate slides using perceptual hashing."""
+    def extract_frames(self, video_path: Path, timestamps: List[float], output_dir: Path) -> List[Tuple[Path, float]]:
+        """Extract slide frames as `slide_NNN.jpg` in timestamp order.
+        
+        Returns (path, timestamp) for each frame that was extracted.
+        """
+        timestamps = sorted(timestamps)
+        output_paths = [output_dir / f"slide_{i:03d}.jpg" for i in range(len(timestamps))]
+        extracted = self.extract_frames_batch(video_path, timestamps, output_paths)
+        return [(path, timestamp) for path, timestamp, ok in zip(output_paths, timestamps, extracted) if ok]
+    
+    def extract_frames_batch(self, video_path: Path, timestamps: List[float], output_paths: List[Path]) -> List[bool]:
+        """Extract frames at several timestamps in one ffmpeg decode pass.
+        
+        A `select` filter picks the first frame at or after each timestamp
+        (plus the same 0.5s blur offset as `extract_frame`), so the video is
+        opened and decoded once instead of once per slide. Frames land in a
+        scratch directory and are then moved to `output_paths`, in any order.
+        Falls back to per-frame extraction if the batch does not yield one
+        frame per timestamp. Returns a success flag per timestamp.
+        """
+        if not timestamps:
+            return []
+        
+        seek_times = sorted({self._seek_time(timestamp) for timestamp in timestamps})
+        
+        output_paths[0].parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=output_paths[0].parent) as scratch_dir:
+            cmd = [
+                "ffmpeg",
+                "-nostdin",
+                "-i", str(video_path),
+                "-an",  # No audio
+                *self._select_filter_args(seek_times, Path(scratch_dir)),
+                "-vsync", "vfr",  # One output image per selected frame
+                "-q:v", "2",  # High quality
+                "-start_number", "0",
+                "-y",  # Overwrite output
+                str(Path(scratch_dir) / "frame_%04d.jpg")
+            ]
+            
+            logger.debug(f"Extracting {len(seek_times)} frames from {video_path} in one pass")
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            
+            frames = {seek: Path(scratch_dir) / f"frame_{i:04d}.jpg" for i, seek in enumerate(seek_times)}
+            if result.returncode == 0 and all(frame.exists() for frame in frames.values()):
+                placed = {}
+                for timestamp, output_path in zip(timestamps, output_paths):
+                    seek = self._seek_time(timestamp)
+                    if seek in placed:
+                        shutil.copyfile(placed[seek], output_path)  # Repeated timestamp
+                    else:
+                        os.replace(frames[seek], output_path)
+                        placed[seek] = output_path
+                return [True] * len(timestamps)
+        
+        logger.warning(f"Batch frame extraction incomplete, extracting frames one at a time: {result.stderr[-500:]}")
+        extracted = []
+        for timestamp, output_path in zip(timestamps, output_paths):
+            extracted.append(self.extract_frame(video_path, timestamp, output_path))
+            if not extracted[-1]:
+                logger.warning(f"Failed to extract frame at {timestamp}s")
+        return extracted
+    
+    def extract_frames_in_memory(self, video_path: Path, timestamps: List[float]) -> Optional[List[Tuple[float, bytes]]]:
+        """Extract frames as JPEG bytes in one ffmpeg pass, without touching disk.
+        
+        Frames are piped as MJPEG and split on JPEG end-of-image markers, so
+        callers can deduplicate them and write only the slides they keep.
+        Returns (timestamp, jpeg) in timestamp order, or None if ffmpeg did
+        not produce one frame per timestamp.
+        """
+        timestamps = sorted(timestamps)
+        if not timestamps:
+            return []
+        
+        seek_times = sorted({self._seek_time(timestamp) for timestamp in timestamps})
+        
+        with tempfile.TemporaryDirectory() as scratch_dir:
+            cmd = [
+                "ffmpeg",
+                "-nostdin",
+                "-loglevel", "error",
+                "-i", str(video_path),
+                "-an",  # No audio
+                *self._select_filter_args(seek_times, Path(scratch_dir)),
+                "-vsync", "vfr",  # One output image per selected frame
+                "-q:v", "2",  # High quality
+                "-f", "image2pipe",
+                "-c:v", "mjpeg",
+                "pipe:1"
+            ]
+            
+            logger.debug(f"Extracting {len(seek_times)} frames from {video_path} in memory")
+            try:
+                with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+                    stderr: List[bytes] = []
+                    reader = threading.Thread(target=lambda: stderr.extend(proc.stderr), daemon=True)
+                    reader.start()
+                    frames = list(_iter_jpeg_frames(proc.stdout))
+                    proc.wait()
+                    reader.join()
+            except OSError as e:
+                logger.warning(f"In-memory frame extraction failed: {e}")
+                return None
+        
+        if proc.returncode != 0 or len(frames) != len(seek_times):
+            message = b"".join(stderr[-5:]).decode("utf-8", errors="replace")
+            logger.warning(f"In-memory frame extraction got {len(frames)}/{len(seek_times)} frames: {message}")
+            return None
+        
+        by_seek = dict(zip(seek_times, frames))
+        return [(timestamp, by_seek[self._seek_time(timestamp)]) for timestamp in timestamps]
+    
+    @staticmethod
+    def _seek_time(timestamp: float) -> float:
+        """Frame time used for a slide change, past the transition blur."""
+        return round(max(0.0, timestamp + FRAME_SEEK_OFFSET), 3)
+    
+    @staticmethod
+    def _select_filter_args(seek_times: List[float], scratch_dir: Path) -> List[str]:
+        """ffmpeg arguments selecting the first frame at or after each seek time."""
+        # prev_pts is NaN on the first frame, so not(gte(...)) selects it too
+        select_expr = "+".join(f"gte(t,{seek:.3f})*not(gte(prev_pts*TB,{seek:.3f}))" for seek in seek_times)
+        video_filter = f"select='{select_expr}'"
+        if len(video_filter) <= MAX_INLINE_FILTER_CHARS:
+            return ["-vf", video_filter]
+        
+        # Hundreds of slides would overflow the command line
+        filter_script = scratch_dir / "select.txt"
+        filter_script.write_text(video_filter, encoding="utf-8")
+        return ["-filter_script:v", str(filter_script)]
+    
+    def deduplicate_slides(self, slide_paths: List[Path], frame_data: Optional[Dict[Path, bytes]] = None) -> List[Path]:
+        """Remove duplicate slides using perceptual hashing.
+        
+        A slide is dropped when its dHash is within `phash_threshold` bits of
+        one of the last `slide_dedup_window` kept slides. Slides arrive in
+        time order and repeats are almost always neighbours, so this is
+        O(N). With the window disabled (0), every kept slide is compared:
+        short lists pack hashes into a uint64 array and compare each kept
+        slide against all later ones in one NumPy pass; long ones query a
+        BK-tree of the kept hashes instead.
+        
+        The grayscale decodes of the leading unique slides are kept so that
+        `auto_crop_slides` does not read them from disk again. `frame_data`
+        supplies encoded images for paths not yet written to disk.
+        """
         logger.info(f"Deduplicating {len(slide_paths)} slides")
         
         try:
-            import imagehash
-            from PIL import Image
+            import numpy as np
+            import imagehash  # noqa: F401 - required by perceptual_hash_value
+            
+            threshold = self.config.phash_threshold  # Hamming distance threshold
+            
+            self._decoded.clear()
+            cached_paths = set(slide_paths[:DECODED_CACHE_SLIDES])
+            
+            def hash_slide(slide_path: Path) -> Optional[int]:
+                keep_pixels = slide_path in cached_paths
+                data = frame_data.get(slide_path) if frame_data else None
+                value, gray = self._slide_hash(slide_path, keep_pixels, data)
+                if gray is not None:
+                    self._decoded[slide_path] = gray
+                return value
+            
+            # JPEG decoding and resizing release the GIL, so hash slides in threads
+            workers = max(1, min(MAX_HASH_WORKERS, os.cpu_count() or 1, len(slide_paths)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                hash_results = list(executor.map(hash_slide, slide_paths))
+            
+            hashed_paths = [path for path, value in zip(slide_paths, hash_results) if value is not None]
+            hash_values = [value for value in hash_results if value is not None]
+            
+            window = self.config.slide_dedup_window
+            if window:
+                keep = self._dedup_recent(hashed_paths, hash_values, threshold, window)
+            elif len(hash_values) >= BKTREE_MIN_SLIDES:
+                # Long recordings: only near neighbours are visited per query
+                tree = _BKTree()
+                keep = []
+                for value in hash_values:
+                    keep.append(not tree.has_within(value, threshold - 1))
+                    if keep[-1]:
+                        tree.add(value)
+            else:
+                keep = self._dedup_by_hashes(np.array(hash_values, dtype=np.uint64), threshold)
+            
+            duplicates = {path for path, kept in zip(hashed_paths, keep) if not kept}
+            for slide_path in duplicates:
+                logger.debug(f"Duplicate slide detected: {slide_path}")
+                self._decoded.pop(slide_path, None)
             
-            unique_slides = []
-            hashes = []
-            threshold = 8  # Hamming distance threshold
-            
-            for slide_path in slide_paths:
-                try:
-                    # Load image and compute perceptual hash
-                    image = Image.open(slide_path)
-                    phash = imagehash.phash(image)
-                    
-                    # Check if similar hash exists
-                    is_duplicate = False
-                    for existing_hash in hashes:
-                        if phash - existing_hash < threshold:
-                            is_duplicate = True
-                            logger.debug(f"Duplicate slide detected: {slide_path}")
-                            break
-                    
-                    if not is_duplicate:
-                        unique_slides.append(slide_path)
-                        hashes.append(phash)
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to process slide {slide_path}: {e}")
-                    # Keep the slide if we can't process it
-                    unique_slides.append(slide_path)
+            # Slides that could not be hashed are kept
+            unique_slides = [path for path in slide_paths if path not in duplicates]
             
             logger.info(f"Kept {len(unique_slides)} unique slides from {len(slide_paths)} total")
             return unique_slides
@@ -109,6 +399,72 @@ class SlideDetector:
             logger.warning("imagehash not available, skipping deduplication")
             return slide_paths
     
+    @staticmethod
+    def _dedup_by_hashes(hashes, threshold: int) -> List[bool]:
+        """Keep flags for a uint64 hash array, comparing against every kept slide.
+        
+        Each kept slide is XOR-popcounted against all later hashes in one
+        vectorized step, so no N x N distance matrix is materialized.
+        """
+        import numpy as np
+        
+        keep = np.ones(len(hashes), dtype=bool)
+        for i in range(len(hashes)):
+            if keep[i]:
+                later = keep[i + 1:]
+                later &= _popcount64(hashes[i + 1:] ^ hashes[i]) >= threshold
+        return keep.tolist()
+    
+    @staticmethod
+    def _dedup_recent(slide_paths: List[Path], hash_values: List[int], threshold: int, window: int) -> List[bool]:
+        """Keep flags from comparing each slide with the last `window` kept slides."""
+        recent = deque(maxlen=window)
+        # With debug logging, also report repeats the window lets through
+        seen = _BKTree() if logger.isEnabledFor(logging.DEBUG) else None
+        
+        keep = []
+        for slide_path, value in zip(slide_paths, hash_values):
+            keep.append(all(_hamming(value, kept) >= threshold for kept in recent))
+            if keep[-1]:
+                if seen is not None:
+                    if seen.has_within(value, threshold - 1):
+                        logger.debug(f"Slide {slide_path} repeats one outside the {window}-slide window, keeping it")
+                    seen.add(value)
+                recent.append(value)
+        return keep
+    
+    @staticmethod
+    def _slide_hash(
+        slide_path: Path, keep_pixels: bool = False, data: Optional[bytes] = None
+    ) -> Tuple[Optional[int], Optional[Any]]:
+        """64-bit dHash of a slide as an int, plus its grayscale pixels if `keep_pixels`.
+        
+        The slide is read from `data` when given, otherwise from `slide_path`.
+        Returns (None, None) if the image cannot be read. Slides whose pixels
+        are not kept, or all slides without OpenCV, are hashed straight from
+        the encoded image, where JPEGs are decoded at reduced size.
+        """
+        try:
+            import cv2
+            import numpy as np
+        except ImportError:
+            cv2 = None
+        
+        try:
+            if cv2 is None or not keep_pixels:
+                return perceptual_hash_value(io.BytesIO(data) if data is not None else slide_path), None
+            
+            if data is not None:
+                gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+            else:
+                gray = cv2.imread(str(slide_path), cv2.IMREAD_GRAYSCALE)
+            if gray is None:  # imread signals unreadable files with None, not an exception
+                raise ValueError("unreadable image")
+            return perceptual_hash_value(gray), gray
+        except Exception as e:
+            logger.warning(f"Failed to process slide {slide_path}: {e}")
+            return None, None
+    
     def auto_crop_slides(self, slide_paths: List[Path]) -> Optional[Dict[str, int]]:
         """Detect stable slide region and return crop coordinates."""
         logger.info(f"Analyzing {len(slide_paths)} slides for auto-crop region")
@@ -122,42 +478,62 @@ class SlideDetector:
                 logger.warning("Need at least 3 slides for auto-crop analysis")
                 return None
             
-            # Sample up to 10 slides for analysis
-            sample_paths = slide_paths[:min(10, len(slide_paths))]
-            edges_list = []
-            
-            for slide_path in sample_paths:
-                try:
-                    # Load image and convert to grayscale
-                    image = cv2.imread(str(slide_path))
-                    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-                    
-                    # Detect edges
-                    edges = cv2.Canny(gray, 50, 150)
-                    edges_list.append(edges)
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to process slide {slide_path}: {e}")
-            
-            if not edges_list:
+            # Sample the first few slides for analysis
+            sample_paths = slide_paths[:AUTO_CROP_SAMPLES]
+            
+            # Per-pixel count of sampled slides with an edge there, accumulated
+            # in place rather than stacking every edge map
+            edge_counts = None
+            sampled = 0
+            counts_lock = threading.Lock()
+            buffers = threading.local()  # Per-thread Canny output, reused across slides
+            
+            def accumulate(slide_path: Path) -> None:
+                nonlocal edge_counts, sampled
+                edges = self._slide_edges(
+                    slide_path, getattr(buffers, "edges", None), self._decoded.pop(slide_path, None)
+                )
+                if edges is None:
+                    return
+                buffers.edges = edges
+                np.right_shift(edges, 7, out=edges)  # Canny marks edges 255 -> 1
+                with counts_lock:
+                    if edge_counts is None:
+                        edge_counts = np.zeros(edges.shape, dtype=np.uint16)
+                    elif edges.shape != edge_counts.shape:
+                        logger.warning(f"Skipping slide with different size: {slide_path}")
+                        return
+                    np.add(edge_counts, edges, out=edge_counts)
+                    sampled += 1
+            
+            # imread and Canny release the GIL, so decode and detect edges on
+            # all samples at once; OpenCV's own threading is paused meanwhile
+            # to avoid oversubscribing the cores
+            cv2_threads = cv2.getNumThreads()
+            cv2.setNumThreads(1)
+            try:
+                with ThreadPoolExecutor(max_workers=min(len(sample_paths), os.cpu_count() or 1)) as executor:
+                    list(executor.map(accumulate, sample_paths))
+            finally:
+                cv2.setNumThreads(cv2_threads)
+            
+            if edge_counts is None:
                 return None
             
-            # Find common edge regions across slides
-            # Sum all edge maps and find stable regions
-            combined_edges = np.sum(edges_list, axis=0)
-            
-            # Find bounding box of consistent content
-            rows = np.any(combined_edges > len(edges_list) * 0.3, axis=1)
-            cols = np.any(combined_edges > len(edges_list) * 0.3, axis=0)
+            # Find bounding box of content with edges in at least 30% of slides;
+            # reducing to per-row/column maxima first avoids an (H, W) mask
+            min_count = sampled * 0.3
+            rows = edge_counts.max(axis=1) > min_count
+            cols = edge_counts.max(axis=0) > min_count
             
-            if not np.any(rows) or not np.any(cols):
+            if not rows.any() or not cols.any():
                 return None
             
             rmin, rmax = np.where(rows)[0][[0, -1]]
             cmin, cmax = np.where(cols)[0][[0, -1]]
             
             # Add some padding
-            height, width = combined_edges.shape
+            height, width = edge_counts.shape
             padding = 20
             rmin = max(0, rmin - padding)
             rmax = min(height, rmax + padding)
@@ -180,6 +556,156 @@ class SlideDetector:
         except Exception as e:
             logger.error(f"Auto-crop analysis failed: {e}")
             return None
+        finally:
+            self._decoded.clear()
+    
+    @staticmethod
+    def _slide_edges(slide_path: Path, out: Optional[Any] = None, gray: Optional[Any] = None) -> Optional[Any]:
+        """Canny edge map of a slide in grayscale, or None if it cannot be read.
+        
+        `gray` is the already decoded slide, if available. Edges are written
+        into `out` when it matches the slide's size.
+        """
+        import cv2
+        import numpy as np
+        
+        try:
+            if gray is None:
+                # libjpeg decodes straight to one channel; no BGR buffer or cvtColor pass
+                gray = cv2.imread(str(slide_path), cv2.IMREAD_GRAYSCALE)
+            if gray is None:  # imread signals unreadable files with None, not an exception
+                logger.warning(f"Could not read slide image: {slide_path}")
+                return None
+            if out is None or out.shape != gray.shape:
+                out = np.empty_like(gray)
+            return cv2.Canny(gray, 50, 150, edges=out)
+        except Exception as e:
+            logger.warning(f"Failed to process slide {slide_path}: {e}")
+            return None
+    
+    def _detect_with_frame_diff(self, video_path: Path) -> List[float]:
+        """Detect slide changes from 1 fps grayscale thumbnails decoded by ffmpeg.
+        
+        Slides change slowly, so comparing the mean absolute difference of
+        downscaled luma planes once per second is enough; frames are read
+        in batches so memory stays flat on long videos. With
+        `slide_detection_source="keyframes"`, only keyframes are decoded
+        first, falling back to 1 fps sampling when they are too sparse.
+        """
+        import numpy as np
+        
+        if self.config.slide_detection_source == "keyframes":
+            try:
+                timestamps = self._detect_with_keyframe_diff(video_path)
+                if timestamps is not None:
+                    return timestamps
+            except Exception as e:
+                logger.warning(f"Keyframe slide detection failed, decoding all frames: {e}")
+        
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel", "error",
+            "-i", str(video_path),
+            "-an",  # No audio
+            "-vf", f"fps={DIFF_FPS},scale={DIFF_WIDTH}:{DIFF_HEIGHT},format=gray",
+            "-f", "rawvideo",
+            "-pix_fmt", "gray",
+            "pipe:1"
+        ]
+        diffs, _ = self._decode_frame_diffs(cmd)
+        
+        # diffs[i] compares frame i + 1 with frame i
+        change_times = (np.flatnonzero(diffs > self.config.slide_change_threshold) + 1) / DIFF_FPS
+        return self._slide_starts(change_times.tolist(), len(diffs) + 1)
+    
+    def _detect_with_keyframe_diff(self, video_path: Path) -> Optional[List[float]]:
+        """Frame-difference detection over keyframes only, or None if they are too sparse.
+        
+        `-skip_frame nokey` makes the decoder drop every non-key frame, which
+        is far cheaper than a full decode; screen recordings usually place a
+        keyframe at each slide change. Frame times come from showinfo.
+        """
+        import numpy as np
+        
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-hide_banner",
+            "-skip_frame", "nokey",  # Decode keyframes only
+            "-i", str(video_path),
+            "-an",  # No audio
+            "-vf", f"scale={DIFF_WIDTH}:{DIFF_HEIGHT},format=gray,showinfo",
+            "-vsync", "vfr",  # One output frame per keyframe, no duplicates
+            "-f", "rawvideo",
+            "-pix_fmt", "gray",
+            "pipe:1"
+        ]
+        diffs, stderr_lines = self._decode_frame_diffs(cmd)
+        
+        times = []
+        for line in stderr_lines:
+            match = _PTS_TIME_RE.search(line)
+            if match is not None and b"showinfo" in line:
+                times.append(float(match.group(1)))
+        if len(times) != len(diffs) + 1:
+            raise RuntimeError(f"Got {len(times)} keyframe times for {len(diffs) + 1} frames")
+        
+        if len(times) < 2 or float(np.median(np.diff(times))) > KEYFRAME_MAX_GAP_SEC:
+            logger.info("Keyframes too sparse for slide detection, decoding all frames")
+            return None
+        
+        change_times = np.asarray(times)[np.flatnonzero(diffs > self.config.slide_change_threshold) + 1]
+        return self._slide_starts(change_times.tolist(), len(times))
+    
+    def _slide_starts(self, change_times: List[float], sampled: int) -> List[float]:
+        """Slide start times from frame-change times, honouring `slide_min_gap_sec`."""
+        timestamps = [0.0]
+        for timestamp in change_times:
+            if timestamp - timestamps[-1] >= self.config.slide_min_gap_sec:
+                timestamps.append(timestamp)
+        
+        logger.info(f"Detected {len(timestamps)} slides from {sampled} sampled frames")
+        return timestamps
+    
+    @staticmethod
+    def _decode_frame_diffs(cmd: List[str]) -> Tuple[Any, List[bytes]]:
+        """Run an ffmpeg command emitting DIFF_WIDTH x DIFF_HEIGHT gray frames.
+        
+        Returns the mean absolute difference between each pair of
+        consecutive frames and ffmpeg's stderr lines. Stderr is drained on
+        a thread so verbose filters cannot fill the pipe and stall ffmpeg.
+        """
+        import numpy as np
+        
+        frame_size = DIFF_WIDTH * DIFF_HEIGHT
+        
+        diffs = []
+        previous = None
+        stderr_lines: List[bytes] = []
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+            reader = threading.Thread(target=lambda: stderr_lines.extend(proc.stderr), daemon=True)
+            reader.start()
+            while True:
+                data = proc.stdout.read(frame_size * DIFF_BATCH_FRAMES)
+                if len(data) < frame_size:
+                    break
+                frames = np.frombuffer(data[:len(data) - len(data) % frame_size], dtype=np.uint8)
+                frames = frames.reshape(-1, frame_size).astype(np.int16)
+                if previous is not None:
+                    frames = np.concatenate([previous, frames])
+                diffs.append(np.abs(np.diff(frames, axis=0)).mean(axis=1))
+                previous = frames[-1:]
+            proc.wait()
+            reader.join()
+        
+        if proc.returncode != 0:
+            stderr = b"".join(stderr_lines[-20:]).decode("utf-8", errors="replace")
+            raise RuntimeError(f"FFmpeg frame decoding failed: {stderr}")
+        if previous is None:
+            raise RuntimeError("No video frames decoded")
+        
+        return (np.concatenate(diffs) if diffs else np.zeros(0)), stderr_lines
     
     def _detect_with_scenedetect(self, video_path: Path) -> List[float]:
         """Use PySceneDetect for accurate slide detection."""
@@ -209,10 +735,7 @@ class SlideDetector:
                 timestamps.append(start_time)
             
             # Filter out very short segments (< 5 seconds)
-            filtered_timestamps = [timestamps[0]] if timestamps else []
-            for i in range(1, len(timestamps)):
-                if timestamps[i] - timestamps[i-1] > 5.0:
-                    filtered_timestamps.append(timestamps[i])
+            filtered_timestamps = _drop_short_gaps(timestamps, 5.0)
             
             logger.info(f"Detected {len(filtered_timestamps)} slide changes using PySceneDetect")
             
@@ -228,40 +751,43 @@ class SlideDetector:
             raise
     
     def _detect_with_ffmpeg(self, video_path: Path) -> List[float]:
-        """Use FFmpeg scene detection as fallback."""
+        """Use FFmpeg scene detection as fallback.
+        
+        Only the video stream is read (audio and subtitles are not demuxed),
+        so this never finds slides in audio-only files.
+        """
         try:
-            # Use ffmpeg scene detection filter
+            # Use ffmpeg scene detection filter; metadata=print writes just
+            # frame/pts lines to stdout, far less than showinfo logs
             cmd = [
                 "ffmpeg",
+                "-nostdin",
                 "-i", str(video_path),
-                "-filter:v", "select='gt(scene,0.3)',showinfo",
+                "-an",  # No audio
+                "-sn",  # No subtitles
+                "-filter:v", "select='gt(scene,0.3)',metadata=print:file=-",
                 "-f", "null",
                 "-"
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            # Parse scene change timestamps from output
+            # Parse scene change timestamps line by line as ffmpeg writes them,
+            # so memory holds the timestamps rather than the whole log
             timestamps = []
-            for line in result.stderr.split('\n'):
-                if 'pts_time:' in line:
+            with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+                for line in proc.stdout:
+                    match = _PTS_TIME_RE.search(line)
+                    if match is None:
+                        continue
                     try:
-                        # Extract timestamp from showinfo output
-                        pts_start = line.find('pts_time:') + 9
-                        pts_end = line.find(' ', pts_start)
-                        timestamp = float(line[pts_start:pts_end])
-                        timestamps.append(timestamp)
-                    except (ValueError, IndexError):
+                        timestamps.append(float(match.group(1)))
+                    except ValueError:
                         continue
             
             # Filter and sort timestamps
             timestamps = sorted(set(timestamps))
             
             # Filter out very short segments
-            filtered_timestamps = [timestamps[0]] if timestamps else []
-            for i in range(1, len(timestamps)):
-                if timestamps[i] - timestamps[i-1] > 3.0:
-                    filtered_timestamps.append(timestamps[i])
+            filtered_timestamps = _drop_short_gaps(timestamps, 3.0)
             
             logger.info(f"Detected {len(filtered_timestamps)} slide changes using FFmpeg")
             return filtered_timestamps
@@ -273,8 +799,8 @@ class SlideDetector:
     def _fallback_intervals(self, video_path: Path) -> List[float]:
         """Fallback: extract frames at regular intervals."""
         try:
-            ffmpeg = FFmpegProcessor()
-            info = ffmpeg.get_media_info(video_path)
+            # Memoized per file version, so this reuses the download's probe
+            info = FFmpegProcessor.get_media_info(video_path, self.config.cache_dir)
             
             duration = info.get('duration', 0)
             if duration <= 0:
@@ -298,9 +824,5 @@ class SlideDetector:
     
     @staticmethod
     def check_scenedetect() -> bool:
-        """Check if PySceneDetect is available."""
-        try:
-            import scenedetect
-            return True
-        except ImportError:
-            return False
\ No newline at end of file
+        """Check if PySceneDetect is installed (without importing it)."""
+        return importlib.util.find_spec("scenedetect") is not None
\ No newline at end of file
@@ -1,9 +1,16 @@
 """OCR processing for slides using PaddleOCR and Tesseract."""
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Union
+import functools
+import importlib.util
+import io
 import logging
+import os
 import subprocess
+import tempfile
+import threading
 
 from ..config import Config
 from ..schemas.package import OCRResult
@@ -11,15 +18,57 @@ from ..schemas.package import OCRResult
 
 logger = logging.getLogger(__name__)
 
+OCR_PREFETCH_WORKERS = 2  # Threads decoding images ahead of PaddleOCR inference
+
+TESSERACT_OPTIONS = [
+    "-c", "tessedit_create_tsv=1",  # TSV output for position data
+    "--psm", "3",  # Fully automatic page segmentation
+    "-l", "eng"
+]
+
+
+@functools.lru_cache(maxsize=1)
+def _paddleocr_installed() -> bool:
+    return importlib.util.find_spec("paddleocr") is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _tesseract_installed() -> bool:
+    try:
+        result = subprocess.run(
+            ["tesseract", "--version"], 
+            capture_output=True, 
+            text=True
+        )
+        return result.returncode == 0
+    except (FileNotFoundError, subprocess.SubprocessError):
+        return False
+
 
 class OCRProcessor:
-    """Process slide images with OCR."""
+    """Process slide images with OCR.
+    
+    PaddleOCR instances are shared by all processors in the process (keyed
+    by device), so back-to-back videos do not reload the models.
+    """
+    
+    _shared_paddle: Dict[bool, Any] = {}  # use_gpu -> PaddleOCR
+    _shared_paddle_lock = threading.Lock()
     
     def __init__(self, config: Config):
         self.config = config
         self.paddle_ocr = None
         self.tesseract_available = None
     
+    def _ensure_engines(self) -> None:
+        """Load engines on first use, or again after PaddleOCR was released.
+        
+        Tesseract-only setups never set `paddle_ocr`, so they are only
+        checked once instead of on every image.
+        """
+        if self.paddle_ocr is None and (self.tesseract_available is None or self.config.ocr_engine == "paddle"):
+            self.load_engines()
+    
     def load_engines(self) -> None:
         """Initialize OCR engines."""
         logger.info(f"Loading OCR engines (primary: {self.config.ocr_engine})")
@@ -27,15 +76,18 @@ class OCRProcessor:
         # Initialize PaddleOCR if requested and available
         if self.config.ocr_engine == "paddle" and self.check_paddleocr():
             try:
-                from paddleocr import PaddleOCR
                 # Use CPU or GPU based on config
                 use_gpu = self.config.device == "cuda" and not self.config.force_cpu
-                self.paddle_ocr = PaddleOCR(
-                    use_angle_cls=True,
-                    lang='en',
-                    use_gpu=use_gpu
-                )
-                logger.info("PaddleOCR initialized successfully")
+                with self._shared_paddle_lock:
+                    if use_gpu not in self._shared_paddle:
+                        from paddleocr import PaddleOCR
+                        self._shared_paddle[use_gpu] = PaddleOCR(
+                            use_angle_cls=True,
+                            lang='en',
+                            use_gpu=use_gpu
+                        )
+                        logger.info("PaddleOCR initialized successfully")
+                    self.paddle_ocr = self._shared_paddle[use_gpu]
             except Exception as e:
                 logger.error(f"Failed to initialize PaddleOCR: {e}")
                 logger.info("Falling back to Tesseract")
@@ -47,26 +99,74 @@ class OCRProcessor:
             logger.error("Tesseract not available but configured as OCR engine")
             raise RuntimeError("No OCR engine available")
     
-    def process_image(self, image_path: Path) -> OCRResult:
-        """Extract text from slide image using OCR."""
-        if self.paddle_ocr is None:
-            self.load_engines()
+    def process_image(self, image_path: Path, image: Optional[Any] = None) -> OCRResult:
+        """Extract text from slide image using OCR.
+        
+        `image`, a BGR array already decoded from `image_path`, is used
+        instead of reading the file again (Tesseract gets it as PPM).
+        """
+        self._ensure_engines()
         
         logger.info(f"Running OCR on {image_path}")
         
         if self.config.ocr_engine == "paddle":
-            return self._paddle_ocr(image_path)
-        else:
-            return self._tesseract_ocr(image_path)
+            return self._paddle_ocr(image if image is not None else image_path)
+        if image is not None:
+            import cv2
+            
+            ok, encoded = cv2.imencode(".ppm", image)  # No compression work, unlike PNG
+            if ok:
+                return self._tesseract_ocr(None, image_bytes=encoded.tobytes())
+        return self._tesseract_ocr(image_path)
+    
+    def process_images_batch(self, image_paths: List[Path]) -> List[OCRResult]:
+        """Extract text from several slide images, loading engines once."""
+        return list(self.iter_images_batch(image_paths))
     
-    def _paddle_ocr(self, image_path: Path) -> OCRResult:
-        """Process image with PaddleOCR."""
+    def iter_images_batch(self, image_paths: List[Path]) -> Iterator[OCRResult]:
+        """Like `process_images_batch`, but yield each result as soon as it is ready.
+        
+        For PaddleOCR, images are decoded on a thread pool ahead of
+        inference, so reading the next slide overlaps recognizing this one.
+        Tesseract reads the whole batch in one run, so its results arrive
+        together.
+        """
+        self._ensure_engines()
+        
+        logger.info(f"Running OCR on {len(image_paths)} images")
+        
+        if self.config.ocr_engine != "paddle":
+            try:
+                results = self._tesseract_ocr_batch(image_paths)
+            except Exception as e:
+                logger.error(f"Batch Tesseract processing failed: {e}")
+                results = (self._tesseract_ocr(image_path) for image_path in image_paths)
+            yield from results
+            return
+        
+        with ThreadPoolExecutor(max_workers=OCR_PREFETCH_WORKERS) as executor:
+            images = executor.map(self._read_image, image_paths)
+            for image_path, image in zip(image_paths, images):
+                yield self._paddle_ocr(image if image is not None else image_path)
+    
+    @staticmethod
+    def _read_image(image_path: Path) -> Optional[Any]:
+        """Decode an image to the BGR array PaddleOCR expects, or None to let it read the file."""
+        try:
+            import cv2
+            
+            return cv2.imread(str(image_path))
+        except ImportError:
+            return None
+    
+    def _paddle_ocr(self, image: Union[Path, Any]) -> OCRResult:
+        """Process an image path or BGR array with PaddleOCR."""
         if self.paddle_ocr is None:
             raise RuntimeError("PaddleOCR not initialized")
         
         try:
             # Run PaddleOCR detection and recognition
-            result = self.paddle_ocr.ocr(str(image_path), cls=True)
+            result = self.paddle_ocr.ocr(str(image) if isinstance(image, Path) else image, cls=True)
             
             # Extract text blocks with positions and confidence
             blocks = []
@@ -122,82 +222,30 @@ class OCRProcessor:
                 blocks=[]
             )
     
-    def _tesseract_ocr(self, image_path: Path) -> OCRResult:
-        """Process image with Tesseract (fallback)."""
+    def _tesseract_ocr(self, image_path: Optional[Path], image_bytes: Optional[bytes] = None) -> OCRResult:
+        """Process image with Tesseract (fallback).
+        
+        With `image_bytes` (an encoded image), Tesseract reads it from stdin
+        and `image_path` is ignored.
+        """
         if not self.tesseract_available:
             raise RuntimeError("Tesseract not available")
         
         try:
             # Use tesseract with TSV output for position data
-            cmd = [
-                "tesseract",
-                str(image_path),
-                "stdout",
-                "-c", "tessedit_create_tsv=1",
-                "--psm", "3",  # Fully automatic page segmentation
-                "-l", "eng"
-            ]
+            source = "stdin" if image_bytes is not None else str(image_path)
+            cmd = ["tesseract", source, "stdout", *TESSERACT_OPTIONS]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, input=image_bytes, capture_output=True)
+            stdout = result.stdout.decode("utf-8", errors="replace")
             
             if result.returncode != 0:
-                logger.error(f"Tesseract failed: {result.stderr}")
-                raise RuntimeError(f"Tesseract OCR failed: {result.stderr}")
-            
-            # Parse TSV output
-            lines = result.stdout.strip().split('\n')
-            if len(lines) < 2:  # No data
-                return OCRResult(
-                    engine="tesseract",
-                    text="",
-                    confidence=0.0,
-                    blocks=[]
-                )
-            
-            # Skip header line
-            blocks = []
-            all_text = []
-            confidences = []
-            
-            for line in lines[1:]:
-                fields = line.split('\t')
-                if len(fields) >= 12:
-                    level, page_num, block_num, par_num, line_num, word_num = map(int, fields[:6])
-                    left, top, width, height = map(int, fields[6:10])
-                    conf = int(fields[10]) if fields[10].isdigit() else 0
-                    text = fields[11] if len(fields) > 11 else ""
-                    
-                    # Only process word-level text (level 5) with reasonable confidence
-                    if level == 5 and text.strip() and conf > 30:
-                        block = {
-                            "text": text,
-                            "confidence": conf / 100.0,  # Convert to 0-1 scale
-                            "bbox": {
-                                "x": left,
-                                "y": top,
-                                "width": width,
-                                "height": height
-                            }
-                        }
-                        
-                        blocks.append(block)
-                        all_text.append(text)
-                        confidences.append(conf / 100.0)
-            
-            # Calculate average confidence
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-            
-            # Join text with spaces
-            combined_text = " ".join(all_text)
-            
-            logger.debug(f"Tesseract extracted {len(blocks)} text blocks")
+                stderr = result.stderr.decode("utf-8", errors="replace")
+                logger.error(f"Tesseract failed: {stderr}")
+                raise RuntimeError(f"Tesseract OCR failed: {stderr}")
             
-            return OCRResult(
-                engine="tesseract",
-                text=combined_text,
-                confidence=avg_confidence,
-                blocks=blocks
-            )
+            # Parse TSV output, skipping the header line
+            return self._parse_tesseract_tsv(stdout.strip().split('\n')[1:])
             
         except Exception as e:
             logger.error(f"Tesseract processing failed: {e}")
@@ -208,33 +256,126 @@ class OCRProcessor:
                 blocks=[]
             )
     
+    def _tesseract_ocr_batch(self, image_paths: List[Path]) -> List[OCRResult]:
+        """Process several images in one Tesseract run.
+        
+        Tesseract reads a text file listing image paths as a multi-page
+        input, so the LSTM model loads once instead of per image. The
+        concatenated TSV is split back into images on its page_num column.
+        Falls back to one run per image if the pages do not line up.
+        """
+        if not self.tesseract_available:
+            raise RuntimeError("Tesseract not available")
+        
+        if len(image_paths) <= 1:
+            return [self._tesseract_ocr(image_path) for image_path in image_paths]
+        
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+            f.write("\n".join(str(Path(image_path).resolve()) for image_path in image_paths) + "\n")
+            list_path = f.name
+        try:
+            cmd = ["tesseract", list_path, "stdout", *TESSERACT_OPTIONS]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        finally:
+            os.unlink(list_path)
+        
+        pages: Dict[int, List[str]] = {}
+        if result.returncode == 0:
+            for line in result.stdout.split('\n'):
+                fields = line.split('\t')
+                if len(fields) >= 12 and fields[1].isdigit():  # Skips the header
+                    pages.setdefault(int(fields[1]), []).append(line)
+        
+        if len(pages) != len(image_paths):
+            logger.warning(
+                f"Batch Tesseract returned {len(pages)} pages for {len(image_paths)} images, "
+                f"running images one at a time: {result.stderr}"
+            )
+            return [self._tesseract_ocr(image_path) for image_path in image_paths]
+        
+        return [self._parse_tesseract_tsv(pages[page_num]) for page_num in sorted(pages)]
+    
+    @staticmethod
+    def _parse_tesseract_tsv(lines: List[str]) -> OCRResult:
+        """Build an OCRResult from Tesseract TSV rows (header excluded)."""
+        blocks = []
+        all_text = []
+        confidences = []
+        
+        for line in lines:
+            fields = line.split('\t')
+            if len(fields) >= 12:
+                level, page_num, block_num, par_num, line_num, word_num = map(int, fields[:6])
+                left, top, width, height = map(int, fields[6:10])
+                try:
+                    conf = float(fields[10])  # Tesseract 4+ reports fractional confidences
+                except ValueError:
+                    conf = 0
+                text = fields[11] if len(fields) > 11 else ""
+                
+                # Only process word-level text (level 5) with reasonable confidence
+                if level == 5 and text.strip() and conf > 30:
+                    block = {
+                        "text": text,
+                        "confidence": conf / 100.0,  # Convert to 0-1 scale
+                        "bbox": {
+                            "x": left,
+                            "y": top,
+                            "width": width,
+                            "height": height
+                        }
+                    }
+                    
+                    blocks.append(block)
+                    all_text.append(text)
+                    confidences.append(conf / 100.0)
+        
+        # Calculate average confidence
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        
+        # Join text with spaces
+        combined_text = " ".join(all_text)
+        
+        logger.debug(f"Tesseract extracted {len(blocks)} text blocks")
+        
+        return OCRResult(
+            engine="tesseract",
+            text=combined_text,
+            confidence=avg_confidence,
+            blocks=blocks
+        )
+    
     def process_region(self, image_path: Path, bbox: Dict[str, int]) -> OCRResult:
-        """Process specific region of image (for editor re-OCR)."""
+        """Process specific region of image (for editor re-OCR).
+        
+        The crop is handed to the engine in memory (an array for PaddleOCR,
+        uncompressed PPM on stdin for Tesseract) rather than written to disk.
+        """
         try:
+            import numpy as np
             from PIL import Image
             
+            self._ensure_engines()
+            
             # Load and crop image to bounding box
-            image = Image.open(image_path)
             crop_box = (
                 bbox['x'],
                 bbox['y'],
                 bbox['x'] + bbox['width'],
                 bbox['y'] + bbox['height']
             )
-            cropped = image.crop(crop_box)
+            with Image.open(image_path) as image:
+                cropped = image.crop(crop_box).convert("RGB")
             
-            # Save cropped image temporarily
-            temp_path = image_path.parent / f"temp_crop_{image_path.stem}.png"
-            cropped.save(temp_path)
+            logger.info(f"Running OCR on region {bbox} of {image_path}")
             
-            try:
-                # Process cropped region
-                result = self.process_image(temp_path)
-                return result
-            finally:
-                # Clean up temporary file
-                if temp_path.exists():
-                    temp_path.unlink()
+            if self.config.ocr_engine == "paddle":
+                # PaddleOCR expects BGR channel order, like cv2.imread
+                return self._paddle_ocr(np.ascontiguousarray(np.asarray(cropped)[:, :, ::-1]))
+            
+            buffer = io.BytesIO()
+            cropped.save(buffer, format="PPM")  # No zlib work, unlike PNG
+            return self._tesseract_ocr(None, image_bytes=buffer.getvalue())
             
         except Exception as e:
             logger.error(f"Region OCR processing failed: {e}")
@@ -245,24 +386,18 @@ class OCRProcessor:
                 blocks=[]
             )
     
+    @classmethod
+    def release_shared_engines(cls) -> None:
+        """Drop the shared PaddleOCR instances so their memory can be freed."""
+        with cls._shared_paddle_lock:
+            cls._shared_paddle.clear()
+    
     @staticmethod
     def check_paddleocr() -> bool:
-        """Check if PaddleOCR is available."""
-        try:
-            import paddleocr
-            return True
-        except ImportError:
-            return False
+        """Check if PaddleOCR is installed (without importing it; cached)."""
+        return _paddleocr_installed()
     
     @staticmethod
     def check_tesseract() -> bool:
-        """Check if Tesseract is available."""
-        try:
-            result = subprocess.run(
-                ["tesseract", "--version"], 
-                capture_output=True, 
-                text=True
-            )
-            return result.returncode == 0
-        except (FileNotFoundError, subprocess.SubprocessError):
-            return False
\ No newline at end of file
+        """Check if Tesseract is available (probed once per process)."""
+        return _tesseract_installed()
\ No newline at end of file
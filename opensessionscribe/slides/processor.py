@@ -1,11 +1,14 @@
 """Integrated slide processing pipeline."""
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
+import multiprocessing
 
 from ..config import Config
-from ..schemas.package import Slide
+from ..schemas.package import OCRResult, Slide
 from .detector import SlideDetector
 from .ocr_processor import OCRProcessor
 from .vlm_describer import VLMDescriber
@@ -13,15 +16,57 @@ from .vlm_describer import VLMDescriber
 
 logger = logging.getLogger(__name__)
 
+MAX_AUTO_SLIDE_WORKERS = 4  # Each worker holds its own OCR model
+
+# Per-process processor for pool workers, so OCR/VLM load once per worker
+_worker_processor: Optional["SlideProcessor"] = None
+
+
+def _init_slide_worker(config: Config) -> None:
+    """Pool initializer: build this worker's SlideProcessor and load its models."""
+    global _worker_processor
+    _worker_processor = SlideProcessor(config)
+    _worker_processor.warm()
+
+
+def _process_slide_in_worker(args: Tuple[Path, float, Optional[Dict[str, int]]]) -> Slide:
+    """Run OCR/VLM for one slide inside a pool worker."""
+    slide_path, timestamp, crop_coords = args
+    return _worker_processor._process_single_slide(slide_path, timestamp, crop_coords)
+
 
 class SlideProcessor:
-    """Complete slide processing pipeline."""
+    """Complete slide processing pipeline.
+    
+    OCR engines and the VLM client load on first use (or `warm()`) and stay
+    loaded until `cleanup()`, so repeated `reprocess_slide` calls from the
+    editor do not reload models.
+    """
     
     def __init__(self, config: Config):
         self.config = config
         self.detector = SlideDetector(config)
-        self.ocr = OCRProcessor(config) if config.enable_slides else None
-        self.vlm = VLMDescriber(config) if config.enable_descriptions else None
+    
+    @cached_property
+    def ocr(self) -> Optional[OCRProcessor]:
+        return OCRProcessor(self.config) if self.config.enable_slides else None
+    
+    @cached_property
+    def vlm(self) -> Optional[VLMDescriber]:
+        return VLMDescriber(self.config) if self.config.enable_descriptions else None
+    
+    def warm(self) -> None:
+        """Load OCR engines and the VLM client now instead of on the first slide.
+        
+        Failures are only logged; processing a slide reports them again.
+        """
+        try:
+            if self.ocr:
+                self.ocr._ensure_engines()
+            if self.vlm and self.vlm.client is None:
+                self.vlm.load_model()
+        except Exception as e:
+            logger.warning(f"Could not preload slide models: {e}")
     
     def process_video(self, video_path: Path, output_dir: Path) -> List[Slide]:
         """Process video to extract slides with OCR and descriptions."""
@@ -45,15 +90,19 @@ class SlideProcessor:
                 logger.warning("No slides detected")
                 return []
             
-            # Step 2: Extract frames
+            # Step 2: Extract frames (one ffmpeg pass for all timestamps), in
+            # memory so that only slides surviving dedup are written
             logger.info("Extracting slide frames...")
-            slide_paths = []
-            for i, timestamp in enumerate(timestamps):
-                slide_path = slides_dir / f"slide_{i:03d}.jpg"
-                if self.detector.extract_frame(video_path, timestamp, slide_path):
-                    slide_paths.append(slide_path)
-                else:
-                    logger.warning(f"Failed to extract frame at {timestamp}s")
+            frames = self.detector.extract_frames_in_memory(video_path, timestamps)
+            frame_data = None
+            if frames is not None:
+                slide_paths = [slides_dir / f"slide_{i:03d}.jpg" for i in range(len(frames))]
+                slide_timestamps = {path: timestamp for path, (timestamp, _) in zip(slide_paths, frames)}
+                frame_data = {path: data for path, (_, data) in zip(slide_paths, frames)}
+            else:
+                extracted = self.detector.extract_frames(video_path, timestamps, slides_dir)
+                slide_paths = [slide_path for slide_path, _ in extracted]
+                slide_timestamps = dict(extracted)
             
             if not slide_paths:
                 logger.error("Failed to extract any slide frames")
@@ -61,27 +110,28 @@ class SlideProcessor:
             
             # Step 3: Deduplicate slides
             logger.info("Removing duplicate slides...")
-            unique_slides = self.detector.deduplicate_slides(slide_paths)
+            unique_slides = self.detector.deduplicate_slides(slide_paths, frame_data)
             logger.info(f"Kept {len(unique_slides)} unique slides")
+            if frame_data is not None:
+                for slide_path in unique_slides:
+                    slide_path.write_bytes(frame_data[slide_path])
+                frame_data = None
             
-            # Step 4: Auto-crop detection (optional)
-            crop_coords = None
-            if len(unique_slides) >= 3:
-                logger.info("Analyzing slides for auto-crop region...")
-                crop_coords = self.detector.auto_crop_slides(unique_slides)
-            
-            # Step 5: Process each slide
-            slides_data = []
-            for i, slide_path in enumerate(unique_slides):
-                logger.info(f"Processing slide {i+1}/{len(unique_slides)}: {slide_path.name}")
+            # Steps 4 and 5 overlap: the crop region is only recorded on each
+            # slide, so it is detected in the background while OCR/VLM run
+            with ThreadPoolExecutor(max_workers=1) as crop_executor:
+                crop_future = None
+                if len(unique_slides) >= 3:
+                    logger.info("Analyzing slides for auto-crop region...")
+                    crop_future = crop_executor.submit(self.detector.auto_crop_slides, unique_slides)
                 
-                slide_data = self._process_single_slide(
-                    slide_path, 
-                    timestamps[i] if i < len(timestamps) else 0,
-                    crop_coords
-                )
+                jobs = [(slide_path, slide_timestamps[slide_path], None) for slide_path in unique_slides]
+                slides_data = self._process_slides(jobs)
+                crop_coords = crop_future.result() if crop_future is not None else None
+            
+            for i, slide_data in enumerate(slides_data):
                 slide_data.index = i
-                slides_data.append(slide_data)
+                slide_data.crop = crop_coords
             
             logger.info(f"Slide processing complete: {len(slides_data)} slides processed")
             return slides_data
@@ -90,13 +140,79 @@ class SlideProcessor:
             logger.error(f"Slide processing failed: {e}")
             return []
     
+    def _get_slide_workers(self, num_slides: int) -> int:
+        """Number of worker processes for OCR/VLM (config override wins)."""
+        if self.config.slide_workers:
+            return min(self.config.slide_workers, num_slides)
+        
+        from ..hardware import HardwareDetector
+        
+        cores, _ = HardwareDetector.get_cpu_info()
+        return max(1, min(MAX_AUTO_SLIDE_WORKERS, cores or 1, num_slides))
+    
+    def _process_slides(self, jobs: List[Tuple[Path, float, Optional[Dict[str, int]]]]) -> List[Slide]:
+        """Run OCR/VLM over slides, fanning out across processes when worthwhile.
+        
+        Slides are independent and OCR is CPU-bound, so worker processes
+        sidestep the GIL. Each worker loads its models once in the pool
+        initializer. Workers are spawned rather than forked so they never
+        inherit CUDA or torch thread state from the parent.
+        """
+        workers = self._get_slide_workers(len(jobs))
+        if workers <= 1 or not (self.ocr or self.vlm):
+            return self._process_slides_streamed(jobs)
+        
+        logger.info(f"Processing {len(jobs)} slides with {workers} worker processes")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_slide_worker,
+            initargs=(self.config,)
+        ) as executor:
+            return list(executor.map(_process_slide_in_worker, jobs))
+    
+    def _process_slides_streamed(self, jobs: List[Tuple[Path, float, Optional[Dict[str, int]]]]) -> List[Slide]:
+        """Batch-OCR slides in this process, describing each as its OCR finishes.
+        
+        OCR and VLM run as overlapping stages: slides with OCR text are
+        handed to a small thread pool (`vlm_concurrency` requests in flight)
+        while the OCR engine moves on to the next slide. If batch OCR fails,
+        the remaining slides are OCR'd one at a time on this thread, so the
+        OCR engine is never used from two threads.
+        """
+        def process(i: int, ocr_result: Optional[OCRResult]) -> Slide:
+            slide_path, timestamp, crop_coords = jobs[i]
+            logger.info(f"Processing slide {i+1}/{len(jobs)}: {slide_path.name}")
+            return self._process_single_slide(slide_path, timestamp, crop_coords, ocr_result)
+        
+        if self.ocr:
+            ocr_results = self.ocr.iter_images_batch([slide_path for slide_path, _, _ in jobs])
+        else:
+            ocr_results = iter([None] * len(jobs))
+        
+        concurrency = max(1, self.config.vlm_concurrency) if self.vlm else 1
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = []
+            try:
+                for i, ocr_result in enumerate(ocr_results):
+                    futures.append(executor.submit(process, i, ocr_result))
+            except Exception as e:
+                logger.error(f"Batch OCR failed, falling back to per-slide OCR: {e}")
+            
+            remaining = [process(i, None) for i in range(len(futures), len(jobs))]
+            return [future.result() for future in futures] + remaining
+    
     def _process_single_slide(
         self, 
         slide_path: Path, 
         timestamp: float, 
-        crop_coords: Optional[Dict[str, int]] = None
+        crop_coords: Optional[Dict[str, int]] = None,
+        ocr_result: Optional[OCRResult] = None
     ) -> Slide:
-        """Process a single slide with OCR and description."""
+        """Process a single slide with OCR and description.
+        
+        `ocr_result` skips OCR when the caller already ran it (e.g. batched).
+        """
         slide_data = Slide(
             index=0,  # Will be set by caller
             timestamp=timestamp,
@@ -107,17 +223,23 @@ class SlideProcessor:
         )
         
         try:
+            # Decode once for both OCR and the VLM upload
+            image = None
+            if self.vlm or (ocr_result is None and self.ocr):
+                image = OCRProcessor._read_image(slide_path)
+            
             # OCR processing
-            if self.ocr:
-                logger.debug(f"Running OCR on {slide_path.name}")
-                ocr_result = self.ocr.process_image(slide_path)
+            if ocr_result is not None:
                 slide_data.ocr = ocr_result
+            elif self.ocr:
+                logger.debug(f"Running OCR on {slide_path.name}")
+                slide_data.ocr = self.ocr.process_image(slide_path, image)
             
             # VLM description
             if self.vlm:
                 logger.debug(f"Generating description for {slide_path.name}")
                 ocr_text = slide_data.ocr.text if slide_data.ocr else ""
-                description_result = self.vlm.describe_slide(slide_path, ocr_text)
+                description_result = self.vlm.describe_slide(slide_path, ocr_text, image)
                 if description_result:
                     slide_data.description = description_result.get('description')
                     slide_data.bullets = description_result.get('bullets')
@@ -184,9 +306,10 @@ class SlideProcessor:
     
     def cleanup(self) -> None:
         """Clean up loaded models to free memory."""
-        if hasattr(self.ocr, 'paddle_ocr') and self.ocr.paddle_ocr:
-            del self.ocr.paddle_ocr
-            self.ocr.paddle_ocr = None
+        ocr = self.__dict__.get("ocr")  # Never created means nothing to free
+        if ocr is not None and ocr.paddle_ocr:
+            ocr.paddle_ocr = None
+            OCRProcessor.release_shared_engines()
         
         # VLM is stateless (HTTP requests)
         logger.info("Slide processing models cleaned up")
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""On-disk cache of VLM slide descriptions."""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+
+from ..utils.jsonio import write_json_atomic
+
+
+logger = logging.getLogger(__name__)
+
+
+class VLMCache:
+    """Slide descriptions keyed by model, perceptual image hash and prompt.
+    
+    Entries are small JSON files under `cache_dir/vlm`, written atomically
+    so slide worker processes can share them. Keying on the perceptual hash
+    rather than file bytes lets re-runs and re-extracted frames of the same
+    slide hit the cache.
+    """
+    
+    def __init__(self, cache_dir: Path):
+        self.directory = Path(cache_dir) / "vlm"
+    
+    def _entry_path(self, model: str, image_hash: str, prompt: str) -> Path:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        key = hashlib.sha1(f"{model}\0{image_hash}\0{prompt_hash}".encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json"
+    
+    def get(self, model: str, image_hash: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """Cached description, or None on a miss."""
+        try:
+            with open(self._entry_path(model, image_hash, prompt), 'rb') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None  # Missing or corrupt entry
+    
+    def put(self, model: str, image_hash: str, prompt: str, description: Dict[str, Any]) -> None:
+        """Store a description; failures only cost a future cache miss."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(self._entry_path(model, image_hash, prompt), description)
+        except OSError as e:
+            logger.debug(f"Could not cache VLM description: {e}")
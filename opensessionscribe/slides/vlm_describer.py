@@ -1,14 +1,59 @@
 """VLM-based slide description using Ollama."""
 
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import base64
 import logging
+import time
+
+from pydantic import BaseModel, Field, ValidationError
 
 from ..config import Config
+from ..utils.hashing import perceptual_hash
+from .vlm_cache import VLMCache
 
 
 logger = logging.getLogger(__name__)
 
+VLM_MAX_RETRIES = 3  # Retries after a rate-limited or failed request
+VLM_RETRY_BASE_SEC = 1.0  # Backoff doubles from here on each retry
+VLM_RETRY_MAX_SEC = 30.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+VLM_TEMPERATURE = 0.1
+VLM_NUM_PREDICT = 300  # Token cap per description
+VLM_TIMEOUT_SEC = 120.0
+VLM_MAX_IMAGE_WIDTH = 1024  # Slides are downscaled to this before upload
+VLM_JPEG_QUALITY = 85
+
+
+class SlideResponse(BaseModel):
+    """Structured VLM answer requested via Ollama's JSON mode."""
+    description: str = ""
+    bullets: List[str] = Field(default_factory=list)
+    chart_type: Optional[str] = None
+    chart_trend: Optional[str] = None
+    ascii_art: Optional[str] = None
+    
+    def to_result(self) -> Dict[str, Any]:
+        """Convert to the description dict consumed by the slide processor."""
+        chart_info = None
+        if self.chart_type:
+            chart_info = {"type": self.chart_type, "trend": self.chart_trend}
+        return {
+            "description": self.description,
+            "bullets": self.bullets,
+            "chart_info": chart_info,
+            "ascii_art": self.ascii_art
+        }
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limiting and server errors are worth retrying; bad requests are not."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) in RETRYABLE_STATUS:
+        return True
+    return "rate limit" in str(error).lower()
+
 
 class VLMDescriber:
     """Generate slide descriptions using local VLM via Ollama."""
@@ -16,39 +61,124 @@ class VLMDescriber:
     def __init__(self, config: Config):
         self.config = config
         self.client = None
+        self.cache = VLMCache(config.cache_dir)
     
     def load_model(self) -> None:
-        """Initialize Ollama client and check model availability."""
-        # TODO: Initialize Ollama client
+        """Initialize the HTTP client for the Ollama API."""
+        import httpx
+        
+        self.client = httpx.Client(base_url=self.config.ollama_host, timeout=VLM_TIMEOUT_SEC)
         # TODO: Check if VLM model is available locally
         # TODO: Provide helpful error if model not found
-        pass
     
-    def describe_slide(self, image_path: Path, ocr_text: str = "") -> Optional[Dict[str, Any]]:
-        """Generate description of slide using VLM."""
+    def describe_slide(self, image_path: Path, ocr_text: str = "", image: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+        """Generate description of slide using VLM.
+        
+        Descriptions are cached by perceptual image hash and prompt, so a
+        slide seen in an earlier run is not sent to the model again.
+        `image`, a BGR array already decoded from `image_path`, saves
+        decoding the slide again before upload.
+        """
         if not self.config.enable_descriptions:
             return None
         
+        prompt = self._build_prompt(ocr_text)
+        try:
+            image_hash = perceptual_hash(image_path)
+        except Exception as e:
+            logger.debug(f"Could not hash {image_path}, skipping description cache: {e}")
+            image_hash = None
+        
+        if image_hash is not None:
+            cached = self.cache.get(self.config.vlm_model, image_hash, prompt)
+            if cached is not None:
+                logger.info(f"Using cached description for {image_path}")
+                return cached
+        
+        result = self._generate_with_retry(image_path, prompt, image)
+        
+        # Empty results are not cached, so a failed call is retried next run
+        if image_hash is not None and result and result.get("description"):
+            self.cache.put(self.config.vlm_model, image_hash, prompt, result)
+        return result
+    
+    def _generate_with_retry(self, image_path: Path, prompt: str, image: Optional[Any] = None) -> Dict[str, Any]:
+        """Call `_generate`, backing off exponentially on rate limits and server errors."""
+        for attempt in range(VLM_MAX_RETRIES + 1):
+            try:
+                return self._generate(image_path, prompt, image)
+            except Exception as e:
+                if attempt == VLM_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = min(VLM_RETRY_MAX_SEC, VLM_RETRY_BASE_SEC * 2 ** attempt)
+                logger.warning(f"VLM request for {image_path} failed ({e}), retrying in {delay:.0f}s")
+                time.sleep(delay)
+    
+    def _generate(self, image_path: Path, prompt: str, image: Optional[Any] = None) -> Dict[str, Any]:
+        """Query the VLM for one slide.
+        
+        JSON mode constrains decoding to valid JSON, so the model spends no
+        tokens on prose or code fences. If the answer still does not match
+        `SlideResponse`, the slide is asked once more without JSON mode.
+        """
         if self.client is None:
             self.load_model()
         
         logger.info(f"Generating description for {image_path}")
         
-        # TODO: Send image + OCR text to VLM
-        # 1. Prepare prompt with instructions
-        # 2. Include OCR text for context
-        # 3. Request structured output:
-        #    - One-line caption
-        #    - 3-5 bullet points
-        #    - Chart analysis if present
-        #    - Optional ASCII art
+        image_b64 = base64.b64encode(self._encode_image(image_path, image)).decode("ascii")
         
-        return {
-            "description": "",
-            "bullets": [],
-            "chart_info": None,
-            "ascii_art": None
-        }
+        text = self._request(prompt, image_b64, json_mode=True)
+        try:
+            return SlideResponse.model_validate_json(text).to_result()
+        except ValidationError as e:
+            logger.warning(f"VLM returned invalid JSON for {image_path}, retrying without JSON mode: {e}")
+        
+        text = self._request(prompt, image_b64, json_mode=False)
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            return SlideResponse.model_validate_json(text[start:end + 1]).to_result()
+        except ValidationError:
+            # Keep the free-text answer rather than losing the slide's description
+            return SlideResponse(description=text.strip()).to_result()
+    
+    @staticmethod
+    def _encode_image(image_path: Path, image: Optional[Any] = None) -> bytes:
+        """JPEG bytes of the slide, at most `VLM_MAX_IMAGE_WIDTH` pixels wide.
+        
+        The model resizes inputs itself, so full-resolution uploads only
+        cost transfer and preprocessing time. Without OpenCV, or for files
+        it cannot decode, the file is sent as is.
+        """
+        try:
+            import cv2
+        except ImportError:
+            return Path(image_path).read_bytes()
+        
+        if image is None:
+            image = cv2.imread(str(image_path))
+            if image is None:
+                return Path(image_path).read_bytes()
+        
+        height, width = image.shape[:2]
+        if width > VLM_MAX_IMAGE_WIDTH:
+            size = (VLM_MAX_IMAGE_WIDTH, max(1, round(height * VLM_MAX_IMAGE_WIDTH / width)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, VLM_JPEG_QUALITY])
+        return encoded.tobytes() if ok else Path(image_path).read_bytes()
+    
+    def _request(self, prompt: str, image_b64: str, json_mode: bool) -> str:
+        """Send one non-streaming generate request and return the response text."""
+        response = self.client.post("/api/generate", json={
+            "model": self.config.vlm_model,
+            "prompt": prompt,
+            "images": [image_b64],
+            "format": "json" if json_mode else "",
+            "stream": False,
+            "options": {"temperature": VLM_TEMPERATURE, "num_predict": VLM_NUM_PREDICT}
+        })
+        response.raise_for_status()
+        return response.json().get("response", "")
     
     def _build_prompt(self, ocr_text: str) -> str:
         """Build VLM prompt for slide description."""
@@ -0,0 +1,75 @@
+"""Shared decoded-audio buffers."""
+
+import hashlib
+import logging
+import os
+import subprocess
+from pathlib import Path
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000  # Rate expected by WhisperX and pyannote
+
+
+class AudioBuffer:
+    """Decode audio once into a float32 scratch file that readers memory-map.
+
+    ASR and diarization otherwise each decode the same file into their own
+    array; mapping one scratch file lets them share a single copy through
+    the page cache.
+    """
+
+    @staticmethod
+    def decode_to_memmap(audio_path: Path, cache_dir: Path, sample_rate: int = SAMPLE_RATE) -> Path:
+        """Decode `audio_path` to raw mono float32 in `cache_dir`, reusing an existing decode."""
+        audio_path = Path(audio_path)
+        stat = audio_path.stat()
+        key = hashlib.sha1(
+            f"{audio_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}:{sample_rate}".encode("utf-8")
+        ).hexdigest()[:16]
+        scratch = Path(cache_dir) / "audio" / f"{key}.f32"
+
+        if scratch.exists():
+            return scratch
+
+        scratch.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = scratch.with_suffix(".tmp")
+
+        logger.debug(f"Decoding audio: {audio_path} -> {scratch}")
+
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-i", str(audio_path),
+            "-f", "f32le",  # Raw 32-bit float little-endian
+            "-ac", "1",  # Mono
+            "-ar", str(sample_rate),  # Sample rate
+            "-y",  # Overwrite output
+            str(tmp_path)
+        ]
+
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.error(f"FFmpeg failed: {e.stderr}")
+            raise RuntimeError(f"Audio decoding failed: {e.stderr}")
+
+        os.replace(tmp_path, scratch)
+        return scratch
+
+    @staticmethod
+    def open(scratch_path: Path) -> Any:
+        """Map a scratch file read-only as a float32 array."""
+        import numpy as np
+
+        if Path(scratch_path).stat().st_size == 0:
+            return np.zeros(0, dtype=np.float32)  # np.memmap rejects empty files
+        return np.memmap(scratch_path, dtype=np.float32, mode="r")
+
+    @classmethod
+    def load(cls, audio_path: Path, cache_dir: Path) -> Any:
+        """Decode (if needed) and map `audio_path`."""
+        return cls.open(cls.decode_to_memmap(audio_path, cache_dir))
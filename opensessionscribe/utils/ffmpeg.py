@@ -1,26 +1,71 @@
 """FFmpeg utilities for audio/video processing."""
 
+import copy
+import functools
+import hashlib
 import subprocess
+import threading
+from fractions import Fraction
 from pathlib import Path
 from typing import Dict, Any, Optional
 import json
 import logging
+import shutil
+
+from .jsonio import write_json_atomic
 
 
 logger = logging.getLogger(__name__)
 
+PCM_CHUNK_BYTES = 1 << 20  # Read size for PCM piped from ffmpeg
+
+
+def _parse_fraction(value: str) -> float:
+    """Parse an ffprobe rate such as "30000/1001" without eval; 0.0 if undefined or malformed."""
+    try:
+        return float(Fraction(value))
+    except (ValueError, ZeroDivisionError, TypeError):
+        return 0.0
+
+
+@functools.lru_cache(maxsize=128)
+def _media_info_cached(path: str, size: int, mtime_ns: int, cache_dir: Optional[str]) -> Dict[str, Any]:
+    """ffprobe results for one version of a file, also persisted under `cache_dir`.
+    
+    Size and mtime are part of the key so a rewritten file is probed again.
+    """
+    cache_path = None
+    if cache_dir is not None:
+        digest = hashlib.sha1(path.encode("utf-8")).hexdigest()
+        cache_path = Path(cache_dir) / "ffprobe" / f"{digest}.json"
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = json.load(f)
+            if cached.get("size") == size and cached.get("mtime_ns") == mtime_ns:
+                logger.debug(f"Using cached media info: {path}")
+                return cached["info"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass  # Missing, stale format or corrupt cache, probe again
+    
+    info = FFmpegProcessor._probe_media_info(Path(path))
+    
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(cache_path, {"size": size, "mtime_ns": mtime_ns, "info": info})
+        except OSError as e:
+            logger.debug(f"Could not cache media info for {path}: {e}")
+    
+    return info
+
 
 class FFmpegProcessor:
     """Wrapper for FFmpeg operations."""
     
     @staticmethod
     def check_ffmpeg() -> bool:
-        """Check if FFmpeg is available."""
-        try:
-            subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        """Check if FFmpeg is on PATH."""
+        return shutil.which("ffmpeg") is not None
     
     @staticmethod
     def extract_audio(video_path: Path, output_path: Path, sample_rate: int = 16000) -> None:
@@ -46,8 +91,67 @@ class FFmpegProcessor:
             raise RuntimeError(f"Audio extraction failed: {e.stderr}")
     
     @staticmethod
-    def get_media_info(file_path: Path) -> Dict[str, Any]:
-        """Get media file information using ffprobe."""
+    def extract_audio_np(media_path: Path, sample_rate: int = 16000, wav_path: Optional[Path] = None) -> Any:
+        """Decode audio straight into a mono float32 numpy array.
+        
+        ffmpeg pipes 16-bit PCM to stdout, which is read in 1 MiB chunks so
+        no intermediate file is needed. Stderr is drained on a thread so a
+        chatty ffmpeg cannot block on a full pipe. With `wav_path`, the same
+        decode pass also writes a 16-bit WAV copy for consumers that need a file.
+        """
+        import numpy as np
+        
+        logger.info(f"Decoding audio: {media_path}" + (f" (and writing {wav_path})" if wav_path else ""))
+        
+        pcm_options = ["-vn", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate)]
+        cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", str(media_path)]
+        if wav_path is not None:
+            cmd += pcm_options + ["-y", str(wav_path)]
+        cmd += pcm_options + ["-f", "s16le", "pipe:1"]
+        
+        chunks = []
+        carry = b""
+        stderr_lines = []
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+            reader = threading.Thread(target=lambda: stderr_lines.extend(proc.stderr), daemon=True)
+            reader.start()
+            while True:
+                data = proc.stdout.read(PCM_CHUNK_BYTES)
+                if not data:
+                    break
+                data = carry + data
+                usable = len(data) - len(data) % 2  # Keep whole int16 samples
+                carry = data[usable:]
+                chunk = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32)
+                chunk *= 1.0 / 32768.0
+                chunks.append(chunk)
+            proc.wait()
+            reader.join()
+        
+        if proc.returncode != 0:
+            stderr = b"".join(stderr_lines[-20:]).decode("utf-8", errors="replace")
+            logger.error(f"FFmpeg failed: {stderr}")
+            raise RuntimeError(f"Audio extraction failed: {stderr}")
+        
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    
+    @staticmethod
+    def get_media_info(file_path: Path, cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+        """Get media file information using ffprobe.
+        
+        Results are cached per (path, size, mtime) in memory and, when
+        `cache_dir` is given, on disk so re-runs skip the ffprobe scan.
+        """
+        file_path = Path(file_path).resolve()
+        stat = file_path.stat()
+        info = _media_info_cached(
+            str(file_path), stat.st_size, stat.st_mtime_ns, str(cache_dir) if cache_dir is not None else None
+        )
+        return copy.deepcopy(info)  # Callers may update the dict in place
+    
+    @staticmethod
+    def _probe_media_info(file_path: Path) -> Dict[str, Any]:
+        """Run ffprobe and summarize the format and first audio/video streams."""
         logger.debug(f"Getting media info: {file_path}")
         
         cmd = [
@@ -84,7 +188,7 @@ class FFmpegProcessor:
                         "codec": video_stream.get('codec_name', ''),
                         "width": int(video_stream.get('width', 0)),
                         "height": int(video_stream.get('height', 0)),
-                        "fps": eval(video_stream.get('r_frame_rate', '0/1'))  # Convert fraction to float
+                        "fps": _parse_fraction(video_stream.get('r_frame_rate', '0/1'))
                     }
                 })
             
@@ -146,14 +250,16 @@ class FFmpegProcessor:
         if duration == 0:
             raise RuntimeError("Cannot create thumbnails: video duration is 0")
         
-        # Create filter for extracting evenly spaced frames
-        interval = duration / count
-        filter_select = f"select='not(mod(n,{int(interval * 30)}))'"
+        # Select evenly spaced frames by number, from the probed frame rate
+        fps = info.get('video', {}).get('fps') or 30
+        frame_numbers = sorted({int(i * duration / count * fps) for i in range(count)})
+        filter_select = "select='" + "+".join(f"eq(n,{n})" for n in frame_numbers) + "'"
         
         cmd = [
             "ffmpeg",
             "-i", str(video_path),
             "-vf", f"{filter_select},scale=160:90,tile={count}x1",
+            "-vsync", "vfr",
             "-frames:v", "1",
             "-y",
             str(output_path)
@@ -168,9 +274,5 @@ class FFmpegProcessor:
     
     @staticmethod
     def check_ffprobe() -> bool:
-        """Check if ffprobe is available."""
-        try:
-            subprocess.run(["ffprobe", "-version"], capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
\ No newline at end of file
+        """Check if ffprobe is on PATH."""
+        return shutil.which("ffprobe") is not None
\ No newline at end of file
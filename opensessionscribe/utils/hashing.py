@@ -1,48 +1,185 @@
 """File hashing and manifest generation utilities."""
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
+import mmap
+import os
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Collection, Dict, Iterator, List, Union
+
+try:
+    import blake3
+except ImportError:  # blake3 is optional; manifests use SHA-256 without it
+    blake3 = None
+
+
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB reads keep memory flat on multi-GB media
+MMAP_MIN_SIZE = 16 << 20  # Larger files are hashed through mmap when file_digest is unavailable
+HASH_DRAFT_SIZE = (256, 256)  # JPEGs are decoded at the smallest DCT scale still this large
 
 
 def sha256_file(file_path: Path) -> str:
-    """Calculate SHA-256 hash of file."""
-    hasher = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hasher.update(chunk)
+    """Calculate SHA-256 hash of file without reading it into memory."""
+    with open(file_path, 'rb', buffering=0) as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+, OpenSSL-side read loop
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        
+        hasher = hashlib.sha256()
+        if os.fstat(f.fileno()).st_size > MMAP_MIN_SIZE:
+            # Hash straight from the page cache instead of copying into read buffers
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):  # Not on Windows
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                hasher.update(mm)
+            return hasher.hexdigest()
+        
+        # Reuse one buffer, as file_digest does, instead of a new bytes per read
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            hasher.update(view[:size])
+    return hasher.hexdigest()
+
+
+def blake3_file(file_path: Path) -> str:
+    """Calculate BLAKE3 hash of file, memory-mapped and hashed on all cores."""
+    if blake3 is None:
+        raise ImportError("blake3 is not installed; install it with: pip install blake3")
+    
+    hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+    hasher.update_mmap(str(file_path))
     return hasher.hexdigest()
 
 
-def generate_manifest(output_dir: Path) -> Dict[str, str]:
-    """Generate manifest with hashes of all output files."""
-    manifest = {}
+def file_hash(file_path: Path, algorithm: str = "sha256") -> str:
+    """Hash a file with `algorithm` ("sha256" or "blake3")."""
+    if algorithm == "blake3":
+        return blake3_file(file_path)
+    if algorithm == "sha256":
+        return sha256_file(file_path)
+    raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+
+def generate_manifest(
+    output_dir: Path,
+    algorithm: str = "sha256",
+    with_stat: bool = False,
+    exclude: Collection[str] = ("manifest.json",),
+) -> Dict[str, Any]:
+    """Generate manifest with hashes of all output files.
+    
+    Each entry is a dict holding the hash under the algorithm's name, the
+    same form `package.json` ships. With `with_stat`, entries also record
+    the file's size and mtime_ns, which lets `verify_manifest` skip hashing
+    files that have not changed. Files named in `exclude` (the manifest
+    itself, by default) are left out. Entries are sorted by path so
+    manifests diff cleanly.
+    """
+    files = sorted(iter_files(output_dir, exclude), key=lambda dir_entry: dir_entry.path)
     
-    # Hash all files in output directory
-    for file_path in output_dir.rglob("*"):
-        if file_path.is_file() and file_path.name != "manifest.json":
-            relative_path = file_path.relative_to(output_dir)
-            manifest[str(relative_path)] = sha256_file(file_path)
+    def entry(dir_entry: os.DirEntry) -> Dict[str, Any]:
+        if not with_stat:
+            return {algorithm: file_hash(Path(dir_entry.path), algorithm)}
+        stat = dir_entry.stat(follow_symlinks=False)  # Taken first, so a change while hashing shows up later
+        hash_value = file_hash(Path(dir_entry.path), algorithm)
+        return {algorithm: hash_value, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
     
-    return manifest
+    # Hashers release the GIL, so files hash in parallel threads
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+        return {
+            os.path.relpath(dir_entry.path, output_dir): value
+            for dir_entry, value in zip(files, executor.map(entry, files))
+        }
 
 
-def verify_manifest(output_dir: Path, manifest: Dict[str, str]) -> bool:
-    """Verify all files match their manifest hashes."""
-    for rel_path, expected_hash in manifest.items():
-        file_path = output_dir / rel_path
-        if not file_path.exists():
+def iter_files(root: Path, exclude: Collection[str] = ()) -> Iterator[os.DirEntry]:
+    """Yield regular files under `root` with one scandir per directory.
+    
+    Files whose name is in `exclude` are skipped, at any depth. Symlinks are
+    neither followed into directories nor reported as files. Unlike `rglob`,
+    no Path objects are built for directories, and file types come from the
+    directory entries rather than extra stat calls.
+    """
+    pending = [os.fspath(root)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for dir_entry in entries:
+                if dir_entry.is_dir(follow_symlinks=False):
+                    pending.append(dir_entry.path)
+                elif dir_entry.is_file(follow_symlinks=False) and dir_entry.name not in exclude:
+                    yield dir_entry
+
+
+def verify_manifest(
+    output_dir: Path, manifest: Union[Dict[str, Dict[str, Any]], List[Dict[str, Any]]], trust_stat: bool = True
+) -> bool:
+    """Verify all files match their manifest hashes, stopping at the first mismatch.
+    
+    `manifest` is either a `generate_manifest` result or the list of entries
+    with a "path" key stored in `package.json`. Entries with a size and
+    mtime_ns that still match the file are accepted without hashing, like
+    rsync's quick check. That catches accidental changes but not deliberate
+    tampering that restores the mtime; pass `trust_stat=False` to hash
+    every file.
+    """
+    entries = manifest.items() if isinstance(manifest, dict) else ((entry["path"], entry) for entry in manifest)
+    to_hash = []
+    for rel_path, expected in entries:
+        try:
+            stat = os.stat(output_dir / rel_path)
+        except OSError:
             return False
         
-        actual_hash = sha256_file(file_path)
-        if actual_hash != expected_hash:
-            return False
+        if trust_stat and expected.get("size") == stat.st_size and expected.get("mtime_ns") == stat.st_mtime_ns:
+            continue
+        algorithm = "blake3" if "blake3" in expected else "sha256"
+        to_hash.append((rel_path, algorithm, expected[algorithm]))
+    
+    def matches(rel_path: str, algorithm: str, digest: str) -> bool:
+        return file_hash(output_dir / rel_path, algorithm) == digest
+    
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+        futures = [executor.submit(matches, *item) for item in to_hash]
+        for future in as_completed(futures):
+            if not future.result():
+                for pending in futures:
+                    pending.cancel()  # Skip files not yet started
+                return False
     
     return True
 
 
-def perceptual_hash(image_path: Path) -> str:
-    """Calculate perceptual hash for image deduplication."""
-    # TODO: Use imagehash library
-    # Return pHash or dHash for slide deduplication
-    pass
\ No newline at end of file
+def perceptual_hash_value(image: Union[Path, Any], method: str = "dhash") -> int:
+    """Calculate a 64-bit perceptual hash of an image as an int.
+    
+    `image` is a file path or binary file object, or an already decoded
+    pixel array. dHash
+    (adjacent-pixel gradients) is the default: on slides, with their flat
+    regions and sharp edges, it matches pHash closely while skipping the
+    32x32 DCT. Pass `method="phash"` for the DCT-based hash.
+    
+    JPEG files are decoded in grayscale at reduced size, since the hash
+    only looks at a few dozen pixels; on 1080p slides this moves hashes
+    by at most a bit or so.
+    """
+    import imagehash
+    import numpy as np
+    from PIL import Image
+    
+    hash_func = {"dhash": imagehash.dhash, "phash": imagehash.phash}[method]
+    if not isinstance(image, (str, Path)) and not hasattr(image, "read"):
+        bits = hash_func(Image.fromarray(image)).hash
+    else:
+        with Image.open(image) as pil_image:
+            pil_image.draft("L", HASH_DRAFT_SIZE)  # No-op for formats other than JPEG
+            bits = hash_func(pil_image).hash
+    # Row-major bits, most significant first, as in imagehash's hex form
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def perceptual_hash(image: Union[Path, Any], method: str = "dhash") -> str:
+    """Calculate a 64-bit perceptual hash of an image as 16 hex digits."""
+    return f"{perceptual_hash_value(image, method):016x}"
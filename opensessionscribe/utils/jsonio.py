@@ -0,0 +1,95 @@
+"""JSON output helpers with optional orjson acceleration."""
+
+from collections.abc import Sequence
+from pathlib import Path
+from types import GeneratorType
+from typing import Any, BinaryIO, Callable, Optional
+import gzip
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def _numpy_default(default: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """Stdlib `default` that encodes numpy arrays and scalars as orjson does."""
+    def encode(obj: Any) -> Any:
+        if type(obj).__module__ == "numpy" and hasattr(obj, "tolist"):
+            return obj.tolist()
+        if default is not None:
+            return default(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return encode
+
+
+def dumps(obj: Any, indent: bool = True, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize a single object to UTF-8 JSON bytes.
+
+    Without orjson, numpy arrays and scalars are still encoded, so output
+    does not depend on which encoder is installed.
+    """
+    if orjson is not None:
+        # Non-str keys are stringified, matching the stdlib encoder
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+
+    return json.dumps(
+        obj, indent=2 if indent else None, ensure_ascii=False, default=_numpy_default(default)
+    ).encode("utf-8")
+
+
+def dump_stream(obj: Any, fp: BinaryIO, default: Optional[Callable[[Any], Any]] = None, _level: int = 0) -> None:
+    """Write indented JSON to a binary file, one list item at a time.
+
+    Dicts are walked recursively and each list element is serialized on its
+    own, so a long transcript never exists as one large encoded buffer.
+    Generators and other sequences (e.g. columnar word stores) are written
+    as JSON arrays, letting callers avoid building an intermediate list.
+    """
+    pad = b"  " * _level
+    inner = pad + b"  "
+
+    if isinstance(obj, dict) and obj:
+        fp.write(b"{\n")
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                fp.write(b",\n")
+            fp.write(inner + dumps(str(key), indent=False) + b": ")
+            dump_stream(value, fp, default, _level + 1)
+        fp.write(b"\n" + pad + b"}")
+    elif isinstance(obj, (Sequence, GeneratorType)) and not isinstance(obj, (str, bytes)):
+        empty = True
+        for item in obj:
+            fp.write(b"[\n" if empty else b",\n")
+            fp.write(inner + dumps(item, default=default).replace(b"\n", b"\n" + inner))
+            empty = False
+        fp.write(b"[]" if empty else b"\n" + pad + b"]")
+    else:
+        fp.write(dumps(obj, default=default).replace(b"\n", b"\n" + pad))
+
+
+def write_json(path: Path, obj: Any, default: Optional[Callable[[Any], Any]] = None) -> None:
+    """Stream `obj` to `path` as indented UTF-8 JSON (gzipped for `.gz` paths)."""
+    opener = gzip.open if Path(path).suffix == ".gz" else open
+    with opener(path, 'wb') as f:
+        dump_stream(obj, f, default)
+        f.write(b"\n")
+
+
+def write_json_atomic(path: Path, obj: Any, default: Optional[Callable[[Any], Any]] = None) -> None:
+    """Like `write_json`, but readers never observe a partially written file."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        write_json(Path(tmp_path), obj, default)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
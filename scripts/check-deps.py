@@ -4,28 +4,34 @@
 import subprocess
 import sys
 import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import Tuple
 
 
-def check_command(cmd: str, name: str) -> bool:
-    """Check if a command is available."""
-    if shutil.which(cmd):
-        try:
-            result = subprocess.run([cmd, "--version"], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                version = result.stdout.split('\n')[0]
-                print(f"✅ {name}: {version}")
-                return True
-        except subprocess.TimeoutExpired:
-            pass
+def check_command(cmd: str, name: str) -> Tuple[bool, str]:
+    """Check if a command is available, returning its status line."""
+    if shutil.which(cmd) is None:
+        return False, f"❌ {name}: Not found"
     
-    print(f"❌ {name}: Not found")
-    return False
+    try:
+        result = subprocess.run([cmd, "--version"], 
+                              capture_output=True, text=True, timeout=10)
+        if result.returncode == 0:
+            version = result.stdout.split('\n')[0]
+            return True, f"✅ {name}: {version}"
+    except (subprocess.TimeoutExpired, OSError):
+        pass
+    
+    return False, f"❌ {name}: Not found"
 
 
 def check_ollama_models():
     """Check if Ollama models are available."""
+    if shutil.which("ollama") is None:
+        print("❌ Ollama models: Not available")
+        return False
+    
     try:
         result = subprocess.run(["ollama", "list"], 
                               capture_output=True, text=True, timeout=10)
@@ -49,6 +55,15 @@ def check_ollama_models():
     return False
 
 
+def _try_import(package: str) -> bool:
+    """Import a package in a worker process."""
+    try:
+        __import__(package)
+        return True
+    except ImportError:
+        return False
+
+
 def check_python_packages():
     """Check if required Python packages can be imported."""
     packages = [
@@ -60,16 +75,14 @@ def check_python_packages():
         ("scenedetect", "PySceneDetect"),
     ]
     
-    all_good = True
-    for package, name in packages:
-        try:
-            __import__(package)
-            print(f"✅ {name}: Available")
-        except ImportError:
-            print(f"❌ {name}: Not installed")
-            all_good = False
+    # Slow imports (PyTorch takes seconds) overlap in separate processes
+    with ProcessPoolExecutor(max_workers=len(packages)) as pool:
+        available = list(pool.map(_try_import, [package for package, _ in packages]))
+    
+    for (_, name), ok in zip(packages, available):
+        print(f"✅ {name}: Available" if ok else f"❌ {name}: Not installed")
     
-    return all_good
+    return all(available)
 
 
 def main():
@@ -79,10 +92,17 @@ def main():
     all_good = True
     
     print("📦 System Dependencies:")
-    all_good &= check_command("ffmpeg", "FFmpeg")
-    all_good &= check_command("tesseract", "Tesseract OCR")
-    all_good &= check_command("ollama", "Ollama")
-    all_good &= check_command("redis-server", "Redis (optional)")
+    commands = [
+        ("ffmpeg", "FFmpeg"),
+        ("tesseract", "Tesseract OCR"),
+        ("ollama", "Ollama"),
+        ("redis-server", "Redis (optional)"),
+    ]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda c: check_command(*c), commands))
+    for ok, line in results:  # Printed in declaration order
+        print(line)
+        all_good &= ok
     
     print("\n🤖 AI Models:")
     all_good &= check_ollama_models()
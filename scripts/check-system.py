@@ -4,12 +4,28 @@ OpenSessionScribe System Check Script
 Comprehensive verification of all dependencies and capabilities
 """
 
-import sys
+import argparse
+import contextlib
+import ctypes
+import functools
+import io
+import os
+import json
+import platform
+import socket
 import subprocess
+import sys
 import importlib
 import shutil
+import urllib.error
+import urllib.request
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Optional
+
+# Allow running from a source checkout before `pip install -e .`
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from opensessionscribe.diagnostics import collect
 
 # ANSI color codes
 GREEN = '\033[92m'
@@ -18,17 +34,31 @@ YELLOW = '\033[93m'
 BLUE = '\033[94m'
 RESET = '\033[0m'
 
+# Colored status prefixes for print_status
+_STATUS = {
+    "ok": f"{GREEN}✅{RESET}",
+    "warning": f"{YELLOW}⚠️ {RESET}",
+    "error": f"{RED}❌{RESET}",
+}
+_INFO = f"{BLUE}ℹ️ {RESET}"
+
+OLLAMA_DEFAULT_HOST = 'http://localhost:11434'  # Config.ollama_host default
+
+_TORCH: Any = None  # torch once imported, False if it is not installed
+
+def _get_torch() -> Optional[Any]:
+    """Import torch once for the hardware checks; None if missing."""
+    global _TORCH
+    if _TORCH is None:
+        try:
+            _TORCH = importlib.import_module('torch')
+        except ImportError:
+            _TORCH = False
+    return _TORCH or None
+
 def print_status(message: str, status: str, details: Optional[str] = None):
     """Print formatted status message."""
-    if status == "ok":
-        status_char = f"{GREEN}✅{RESET}"
-    elif status == "warning":
-        status_char = f"{YELLOW}⚠️ {RESET}"
-    elif status == "error":
-        status_char = f"{RED}❌{RESET}"
-    else:
-        status_char = f"{BLUE}ℹ️ {RESET}"
-    
+    status_char = _STATUS.get(status, _INFO)
     print(f"{status_char} {message}")
     if details:
         print(f"   {details}")
@@ -44,62 +74,126 @@ def check_python_version() -> bool:
                     "Python 3.9+ required")
         return False
 
-def check_system_command(command: str, required: bool = True) -> bool:
-    """Check if system command is available."""
-    if shutil.which(command):
-        try:
-            result = subprocess.run([command, '--version'], 
-                                  capture_output=True, text=True, timeout=5)
-            version_line = result.stdout.split('\n')[0] if result.stdout else "unknown version"
-            print_status(f"{command}", "ok", version_line)
-            return True
-        except:
-            print_status(f"{command}", "ok" if not required else "warning", "Available but version check failed")
-            return not required
-    else:
+def check_system_command(entry: Dict[str, Any]) -> bool:
+    """Report a command from the diagnostics probe."""
+    command, required = entry['name'], entry['required']
+    if entry.get('skipped'):
+        print_status(f"{command}", "info", "Skipped (fast mode)")
+        return False
+    if not entry['found']:
         status = "error" if required else "warning"
         print_status(f"{command}", status, f"Not found {'(required)' if required else '(optional)'}")
         return False
+    if entry['version'] is None:
+        print_status(f"{command}", "ok" if not required else "warning", "Available but version check failed")
+        return not required
+    print_status(f"{command}", "ok", entry['version'])
+    return True
 
-def check_python_package(package: str, required: bool = True) -> bool:
-    """Check if Python package is available."""
-    try:
-        module = importlib.import_module(package)
-        version = getattr(module, '__version__', 'unknown')
-        print_status(f"Python: {package}", "ok", f"version {version}")
-        return True
-    except ImportError:
+def check_python_package(entry: Dict[str, Any]) -> bool:
+    """Report a Python package from the diagnostics probe."""
+    package, required = entry['name'], entry['required']
+    if entry.get('skipped'):
+        print_status(f"Python: {package}", "info", "Skipped (fast mode)")
+        return False
+    if not entry['found']:
         status = "error" if required else "warning"
         print_status(f"Python: {package}", status, f"Not installed {'(required)' if required else '(optional)'}")
         return False
+    print_status(f"Python: {package}", "ok", f"version {entry['version']}")
+    return True
+
+@functools.lru_cache(maxsize=1)
+def _config() -> Any:
+    """Auto-detected config, built once for all checks."""
+    from opensessionscribe.config import Config
+    
+    return Config.auto_detect()
+
+def _ollama_host() -> str:
+    """Ollama server the app is configured to use (Config.ollama_host)."""
+    try:
+        return _config().ollama_host.rstrip('/')
+    except Exception:  # Config unavailable; the basic test reports why
+        return OLLAMA_DEFAULT_HOST
+
+@functools.lru_cache(maxsize=1)
+def _hw_summary() -> dict:
+    """Hardware summary, reusing the probe `Config.auto_detect` already made."""
+    from opensessionscribe.hardware import HardwareDetector
+    
+    return HardwareDetector.get_hardware_summary_cached()
+
+_GPU: Optional[str] = None
+
+def _detect_gpu() -> str:
+    """Return 'cuda', 'mps', 'cpu', or 'unknown' (torch needed but missing).
+    
+    Cheap probes run first: an empty CUDA_VISIBLE_DEVICES or a missing
+    CUDA driver library rules out CUDA without initializing the runtime,
+    which can stall for seconds on hosts with mismatched drivers. MPS is
+    only queried on Apple Silicon Macs.
+    """
+    global _GPU
+    if _GPU is not None:
+        return _GPU
+    
+    _GPU = 'cpu'
+    if os.environ.get('CUDA_VISIBLE_DEVICES') != '' and sys.platform != 'darwin':
+        try:
+            ctypes.CDLL('nvcuda.dll' if sys.platform == 'win32' else 'libcuda.so.1')
+            has_driver = True
+        except OSError:
+            has_driver = False
+        if has_driver:
+            torch = _get_torch()
+            try:
+                if torch is None:
+                    _GPU = 'unknown'
+                elif torch.cuda.device_count() > 0:
+                    _GPU = 'cuda'
+            except Exception:  # Driver/runtime mismatches surface as assorted errors
+                pass
+    elif sys.platform == 'darwin' and platform.machine() == 'arm64':
+        torch = _get_torch()
+        if torch is None:
+            _GPU = 'unknown'
+        elif torch.backends.mps.is_available():
+            _GPU = 'mps'
+    return _GPU
+
+def _total_ram_bytes() -> int:
+    """Total physical memory, without importing psutil where the OS makes it cheap."""
+    if sys.platform.startswith('linux'):
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) * 1024  # Reported in kB
+    elif sys.platform == 'darwin':
+        return int(subprocess.check_output(['sysctl', '-n', 'hw.memsize']))
+    import psutil
+    return psutil.virtual_memory().total
 
 def check_hardware() -> Dict[str, any]:
     """Check hardware capabilities."""
     hardware_info = {}
     
     # Check GPU availability
-    try:
-        import torch
-        if torch.cuda.is_available():
-            gpu_count = torch.cuda.device_count()
-            gpu_name = torch.cuda.get_device_name(0) if gpu_count > 0 else "Unknown"
-            hardware_info['gpu'] = 'cuda'
-            print_status(f"GPU (CUDA)", "ok", f"{gpu_count} device(s): {gpu_name}")
-        elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
-            hardware_info['gpu'] = 'mps'
-            print_status(f"GPU (MPS)", "ok", "Apple Silicon GPU acceleration available")
-        else:
-            hardware_info['gpu'] = 'cpu'
-            print_status(f"GPU", "warning", "No GPU acceleration available, using CPU")
-    except ImportError:
-        hardware_info['gpu'] = 'unknown'
+    hardware_info['gpu'] = _detect_gpu()
+    if hardware_info['gpu'] == 'cuda':
+        torch = _get_torch()
+        gpu_count = torch.cuda.device_count()
+        print_status(f"GPU (CUDA)", "ok", f"{gpu_count} device(s): {torch.cuda.get_device_name(0)}")
+    elif hardware_info['gpu'] == 'mps':
+        print_status(f"GPU (MPS)", "ok", "Apple Silicon GPU acceleration available")
+    elif hardware_info['gpu'] == 'cpu':
+        print_status(f"GPU", "warning", "No GPU acceleration available, using CPU")
+    else:
         print_status(f"GPU", "warning", "PyTorch not available for GPU detection")
     
     # Check memory
     try:
-        import psutil
-        memory = psutil.virtual_memory()
-        memory_gb = memory.total / (1024**3)
+        memory_gb = _total_ram_bytes() / (1024**3)
         hardware_info['memory_gb'] = memory_gb
         
         if memory_gb >= 16:
@@ -111,32 +205,26 @@ def check_hardware() -> Dict[str, any]:
     except ImportError:
         hardware_info['memory_gb'] = 0
         print_status(f"RAM", "warning", "psutil not available for memory detection")
+    except (OSError, ValueError, subprocess.SubprocessError) as e:
+        hardware_info['memory_gb'] = 0
+        print_status(f"RAM", "warning", f"Memory detection failed: {e}")
     
     return hardware_info
 
 def check_model_directories() -> bool:
     """Check if model directories exist and are writable."""
-    from opensessionscribe.config import Config
-    
     try:
-        config = Config.auto_detect()
-        models_dir = Path(config.models_dir)
-        cache_dir = Path(config.cache_dir)
+        config = _config()
+        for label, directory in [("Models", Path(config.models_dir)), ("Cache", Path(config.cache_dir))]:
+            # mkdir alone tells us whether the directory already existed
+            try:
+                directory.mkdir(parents=True)
+                print_status(f"{label} directory", "ok", f"Created: {directory}")
+            except FileExistsError:
+                if not directory.is_dir():
+                    raise
+                print_status(f"{label} directory", "ok", str(directory))
         
-        # Check models directory
-        if models_dir.exists() and models_dir.is_dir():
-            print_status(f"Models directory", "ok", str(models_dir))
-        else:
-            models_dir.mkdir(parents=True, exist_ok=True)
-            print_status(f"Models directory", "ok", f"Created: {models_dir}")
-        
-        # Check cache directory
-        if cache_dir.exists() and cache_dir.is_dir():
-            print_status(f"Cache directory", "ok", str(cache_dir))
-        else:
-            cache_dir.mkdir(parents=True, exist_ok=True)
-            print_status(f"Cache directory", "ok", f"Created: {cache_dir}")
-            
         return True
     except Exception as e:
         print_status(f"Model directories", "error", str(e))
@@ -149,42 +237,37 @@ def check_ollama() -> bool:
         print_status("Ollama", "warning", "Not installed (required for VLM descriptions)")
         return False
     
-    # Check if service is running
+    # Ask the API directly; the CLI costs a process and can block for seconds
+    host = _ollama_host()
     try:
-        result = subprocess.run(['ollama', 'list'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            models = [line.split()[0] for line in result.stdout.strip().split('\n')[1:] 
-                     if line.strip() and not line.startswith('NAME')]
-            
-            if models:
-                print_status("Ollama service", "ok", "Running")
-                print_status("Ollama models", "ok", f"Available: {', '.join(models)}")
-            else:
-                print_status("Ollama service", "ok", "Running")
-                print_status("Ollama models", "warning", "No models installed")
-            return True
+        with urllib.request.urlopen(f"{host}/api/tags", timeout=0.5) as response:
+            models = [model['name'] for model in json.loads(response.read()).get('models', [])]
+    except urllib.error.URLError as e:
+        if isinstance(e.reason, ConnectionRefusedError):
+            print_status("Ollama service", "warning", f"Not running at {host} (start it with: ollama serve)")
         else:
-            print_status("Ollama service", "warning", "Not running or error occurred")
-            return False
-    except subprocess.TimeoutExpired:
-        print_status("Ollama service", "warning", "Service check timed out")
+            print_status("Ollama service", "warning", f"Check failed: {e.reason}")
         return False
-    except Exception as e:
+    except (socket.timeout, OSError, ValueError) as e:
         print_status("Ollama service", "warning", f"Check failed: {e}")
         return False
+    
+    print_status("Ollama service", "ok", "Running")
+    if models:
+        print_status("Ollama models", "ok", f"Available: {', '.join(models)}")
+    else:
+        print_status("Ollama models", "warning", "No models installed")
+    return True
 
 def run_basic_test() -> bool:
     """Run basic functionality test."""
     try:
         # Test configuration loading
-        from opensessionscribe.config import Config
-        config = Config.auto_detect()
+        _config()
         print_status("Configuration", "ok", "Loaded successfully")
         
         # Test hardware detection
-        from opensessionscribe.hardware import HardwareDetector
-        hw_summary = HardwareDetector.get_hardware_summary()
+        hw_summary = _hw_summary()
         recommended_model = hw_summary['recommendations']['whisper_model']
         print_status("Hardware detection", "ok", f"Recommends Whisper model: {recommended_model}")
         
@@ -193,89 +276,97 @@ def run_basic_test() -> bool:
         print_status("Basic functionality", "error", str(e))
         return False
 
-def main():
+@contextlib.contextmanager
+def section(title: str):
+    """Collect a section's heading and status lines, then write them at once."""
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            print(f"\n{BLUE}{title}{RESET}")
+            yield
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+
+def main(argv: Optional[List[str]] = None):
     """Main system check routine."""
-    print(f"{BLUE}🔍 OpenSessionScribe System Check{RESET}")
-    print("=" * 50)
+    parser = argparse.ArgumentParser(description="Check OpenSessionScribe dependencies and capabilities")
+    parser.add_argument('--fast', action='store_true',
+                        help="Skip optional and slow checks once a required check fails")
+    args = parser.parse_args(argv)
+    
+    sys.stdout.write(f"{BLUE}🔍 OpenSessionScribe System Check{RESET}\n" + "=" * 50 + "\n")
     
     all_good = True
     
     # Python version
-    print(f"\n{BLUE}📋 Python Environment{RESET}")
-    all_good &= check_python_version()
-    
-    # System commands
-    print(f"\n{BLUE}🛠️  System Dependencies{RESET}")
-    required_commands = [
-        ('ffmpeg', True),
-        ('ffprobe', True),
-        ('yt-dlp', True),
-    ]
+    with section("📋 Python Environment"):
+        all_good = check_python_version() and all_good
     
-    optional_commands = [
-        ('tesseract', False),
-        ('ollama', False),
-        ('git', False),
-    ]
+    # Commands and packages are probed by opensessionscribe.diagnostics
+    report = collect(fast=args.fast)
     
-    for cmd, required in required_commands + optional_commands:
-        all_good &= check_system_command(cmd, required) or not required
+    # System commands
+    with section("🛠️  System Dependencies"):
+        for entry in report['commands']:
+            ok = check_system_command(entry)
+            all_good = all_good and (ok or not entry['required'])
     
     # Python packages
-    print(f"\n{BLUE}🐍 Python Dependencies{RESET}")
-    required_packages = [
-        ('typer', True),
-        ('pydantic', True),
-        ('yaml', True),
-        ('torch', True),
-        ('whisperx', True),
-        ('pyannote.audio', True),
-    ]
-    
-    optional_packages = [
-        ('paddleocr', False),
-        ('cv2', False),  # opencv
-        ('scenedetect', False),
-        ('librosa', False),
-        ('imagehash', False),
-    ]
+    with section("🐍 Python Dependencies"):
+        packages_ok = True
+        for entry in report['packages']:
+            ok = check_python_package(entry)
+            packages_ok = packages_ok and (ok or not entry['required'])
+        all_good = all_good and packages_ok
     
-    for pkg, required in required_packages + optional_packages:
-        all_good &= check_python_package(pkg, required) or not required
+    # In fast mode the verdict is already known; skip the slow probes below
+    skip = args.fast and not all_good
     
     # Hardware check
-    print(f"\n{BLUE}🖥️  Hardware Configuration{RESET}")
-    hardware_info = check_hardware()
+    with section("🖥️  Hardware Configuration"):
+        if skip:
+            hardware_info = {'gpu': 'unknown', 'memory_gb': 0}
+            print_status("Hardware", "info", "Skipped (fast mode)")
+        else:
+            hardware_info = check_hardware()
     
     # Model directories
-    print(f"\n{BLUE}📁 Model Storage{RESET}")
-    all_good &= check_model_directories()
+    with section("📁 Model Storage"):
+        all_good = check_model_directories() and all_good
     
     # Ollama check
-    print(f"\n{BLUE}🤖 VLM Service (Ollama){RESET}")
-    check_ollama()  # Not required for basic functionality
+    with section("🤖 VLM Service (Ollama)"):
+        if skip:
+            print_status("Ollama", "info", "Skipped (fast mode)")
+        else:
+            check_ollama()  # Not required for basic functionality
     
     # Basic functionality test
-    print(f"\n{BLUE}⚙️  Functionality Test{RESET}")
-    all_good &= run_basic_test()
+    with section("⚙️  Functionality Test"):
+        if packages_ok and hardware_info['gpu'] != 'unknown':
+            all_good = run_basic_test() and all_good
+        else:
+            # Importing the pipeline stack on a broken install only repeats the errors above
+            print_status("Basic functionality", "warning", "Skipped until required Python packages are installed")
     
     # Summary
-    print(f"\n{BLUE}📊 Summary{RESET}")
-    print("=" * 50)
-    
-    if all_good:
-        print(f"{GREEN}🎉 System check passed! OpenSessionScribe is ready to use.{RESET}")
-        print("\n🚀 Try these commands:")
-        print("   python -m cli.main hardware")
-        print("   python -m cli.main process 'https://youtube.com/watch?v=jNQXAC9IVRw' --output ./test")
-    else:
-        print(f"{RED}⚠️  Some issues detected. Please address the errors above.{RESET}")
-        print("\n🔧 Common solutions:")
-        print("   - Run setup script: ./scripts/setup.sh")
-        print("   - Install missing packages: pip install -r requirements.txt")
-        print("   - Install system dependencies with your package manager")
-    
-    print(f"\n📖 For help, see: https://github.com/kurtseifried/OpenSessionScribe#troubleshooting")
+    with section("📊 Summary"):
+        print("=" * 50)
+        
+        if all_good:
+            print(f"{GREEN}🎉 System check passed! OpenSessionScribe is ready to use.{RESET}")
+            print("\n🚀 Try these commands:")
+            print("   python -m cli.main hardware")
+            print("   python -m cli.main process 'https://youtube.com/watch?v=jNQXAC9IVRw' --output ./test")
+        else:
+            print(f"{RED}⚠️  Some issues detected. Please address the errors above.{RESET}")
+            print("\n🔧 Common solutions:")
+            print("   - Run setup script: ./scripts/setup.sh")
+            print("   - Install missing packages: pip install -r requirements.txt")
+            print("   - Install system dependencies with your package manager")
+        
+        print(f"\n📖 For help, see: https://github.com/kurtseifried/OpenSessionScribe#troubleshooting")
     
     return 0 if all_good else 1
 
@@ -0,0 +1,48 @@
+"""Tests for the command-line interface."""
+
+import subprocess
+import sys
+
+
+class TestCLI:
+    """Test CLI module structure and startup cost."""
+
+    def test_commands_registered_once(self):
+        """Test each CLI command is registered exactly once."""
+        from cli.main import app
+
+        names = [command.name or command.callback.__name__ for command in app.registered_commands]
+        assert len(names) == len(set(names))
+
+    def test_import_is_lightweight(self):
+        """Test importing the CLI does not pull in the heavy ML stack."""
+        code = (
+            "import sys, cli.main; "
+            "heavy = [m for m in ('torch', 'whisperx', 'opensessionscribe.pipeline') if m in sys.modules]; "
+            "print(','.join(heavy))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ""
+
+    def test_adapter_imports_are_lightweight(self):
+        """Test adapter modules defer torch/numpy until models are used."""
+        code = (
+            "import sys, opensessionscribe.asr.whisperx_adapter, opensessionscribe.diarize.pyannote_adapter; "
+            "heavy = [m for m in ('torch', 'numpy', 'whisperx', 'pyannote.audio') if m in sys.modules]; "
+            "print(','.join(heavy))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ""
+
+    def test_pipeline_defers_adapters(self):
+        """Test creating a pipeline does not import the ASR, diarization or slide modules."""
+        code = (
+            "import sys; from opensessionscribe.config import Config; "
+            "from opensessionscribe.pipeline import ProcessingPipeline; "
+            "ProcessingPipeline(Config(force_cpu=True)).close(); "
+            "mods = ('opensessionscribe.asr.whisperx_adapter', 'opensessionscribe.diarize.pyannote_adapter', "
+            "'opensessionscribe.slides.processor'); "
+            "print(','.join(m for m in mods if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ""
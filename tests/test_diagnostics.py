@@ -0,0 +1,105 @@
+"""Tests for the capability probe."""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from opensessionscribe import diagnostics
+
+
+def _write_stub(directory, name, output="", executable=True):
+    """Create a shell script in `directory` that prints `output`."""
+    path = directory / name
+    path.write_text(f"#!/bin/sh\nprintf '{output}'\n")
+    path.chmod(0o755 if executable else 0o644)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def clear_version_cache():
+    """Forget versions probed by other tests."""
+    diagnostics.command_version.cache_clear()
+    yield
+    diagnostics.command_version.cache_clear()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stub executables are shell scripts")
+class TestDiagnostics:
+    """Test command discovery, version probing and the report."""
+
+    @pytest.fixture
+    def bin_dir(self, tmp_path):
+        """Empty directory to hold stub executables."""
+        directory = tmp_path / "bin"
+        directory.mkdir()
+        return directory
+
+    @pytest.fixture
+    def system_dir(self):
+        """Directory of the sh and head used by the batched version script."""
+        return os.path.dirname(shutil.which("head"))
+
+    def test_find_commands(self, bin_dir, tmp_path, monkeypatch):
+        """Test only executable files on PATH are found."""
+        _write_stub(bin_dir, "ffmpeg")
+        _write_stub(bin_dir, "ffprobe", executable=False)
+        (bin_dir / "git").mkdir()
+        monkeypatch.setenv("PATH", os.pathsep.join([str(tmp_path / "missing"), str(bin_dir)]))
+
+        found = diagnostics.find_commands(["ffmpeg", "ffprobe", "git", "tesseract"])
+
+        assert found == {"ffmpeg": True, "ffprobe": False, "git": False, "tesseract": False}
+
+    def test_command_versions_splits_batched_output(self, bin_dir, system_dir, monkeypatch):
+        """Test one shell process reports each command's first output line."""
+        _write_stub(bin_dir, "ffmpeg", "ffmpeg version 6.1\\nbuilt with gcc\\n")
+        _write_stub(bin_dir, "tesseract")
+        _write_stub(bin_dir, "git", "git version 2.43.0\\n")
+        monkeypatch.setenv("PATH", os.pathsep.join([str(bin_dir), system_dir]))
+
+        calls = []
+        run = diagnostics.subprocess.run
+        monkeypatch.setattr(diagnostics.subprocess, "run", lambda *a, **kw: calls.append(a) or run(*a, **kw))
+
+        versions = diagnostics.command_versions(["ffmpeg", "tesseract", "git"])
+
+        assert versions == {
+            "ffmpeg": "ffmpeg version 6.1",
+            "tesseract": "unknown version",
+            "git": "git version 2.43.0",
+        }
+        assert len(calls) == 1
+
+    def test_fast_collect_skips_optional_checks(self, bin_dir, monkeypatch):
+        """Test a missing required command skips optional commands, packages and hardware."""
+        _write_stub(bin_dir, "git", "git version 2.43.0\\n")
+        monkeypatch.setenv("PATH", str(bin_dir))
+
+        report = diagnostics.collect(fast=True)
+
+        commands = {entry["name"]: entry for entry in report["commands"]}
+        assert not commands["ffmpeg"]["found"] and "skipped" not in commands["ffmpeg"]
+        assert commands["git"]["skipped"] and not commands["git"]["found"]
+        optional = [entry for entry in report["packages"] if not entry["required"]]
+        assert optional and all(entry.get("skipped") for entry in optional)
+        assert all("skipped" not in entry for entry in report["packages"] if entry["required"])
+        assert report["hardware"] is None
+
+    def test_main_exit_code(self, bin_dir, system_dir, monkeypatch, capsys):
+        """Test main exits 1 while a required item is missing and 0 once all are found."""
+        monkeypatch.setattr(diagnostics, "package_version", lambda package: "1.0")
+        monkeypatch.setenv("PATH", str(bin_dir))
+
+        assert diagnostics.main(["--json", "--fast"]) == 1
+        report = json.loads(capsys.readouterr().out)
+        assert {entry["name"] for entry in report["commands"] if not entry["found"]} >= {"ffmpeg", "ffprobe", "yt-dlp"}
+
+        for name, required in diagnostics.COMMANDS:
+            if required:
+                _write_stub(bin_dir, name, f"{name} 1.0\\n")
+        monkeypatch.setenv("PATH", os.pathsep.join([str(bin_dir), system_dir]))
+
+        assert diagnostics.main(["--fast"]) == 0
+        assert "ffmpeg: ffmpeg 1.0" in capsys.readouterr().out
@@ -0,0 +1,113 @@
+"""Tests for transcript/diarization merging."""
+
+import random
+
+import pytest
+
+from opensessionscribe.config import Config
+from opensessionscribe.diarize.pyannote_adapter import PyAnnoteAdapter
+
+
+def _reference_merge(transcript_segments, diarization_segments):
+    """Original nested-loop merge used as the behavioural reference."""
+    speakers = []
+    for t in transcript_segments:
+        best_overlap, best_speaker = 0, "SPEAKER_00"
+        for d in diarization_segments:
+            overlap = max(0, min(t["end"], d["end"]) - max(t["start"], d["start"]))
+            if overlap > best_overlap:
+                best_overlap, best_speaker = overlap, d["speaker"]
+        speakers.append(best_speaker)
+    return speakers
+
+
+class TestMergeTranscriptDiarization:
+    """Test assigning diarization speakers to transcript segments."""
+
+    @pytest.fixture
+    def adapter(self):
+        """Create adapter without loading any models."""
+        return PyAnnoteAdapter(Config(force_cpu=True))
+
+    def test_assigns_speaker_with_largest_overlap(self, adapter):
+        """Test the speaker overlapping a segment the most wins."""
+        transcript = [
+            {"id": "seg_000000", "start": 0.0, "end": 4.0, "text": "hello"},
+            {"id": "seg_000001", "start": 4.0, "end": 9.0, "text": "there"},
+            {"id": "seg_000002", "start": 20.0, "end": 21.0, "text": "silence"},
+        ]
+        diarization = [
+            {"start": 0.0, "end": 5.0, "speaker": "SPEAKER_01"},
+            {"start": 5.0, "end": 10.0, "speaker": "SPEAKER_02"},
+        ]
+
+        merged = adapter.merge_transcript_diarization(transcript, diarization)
+
+        assert [seg["speaker"] for seg in merged] == ["SPEAKER_01", "SPEAKER_02", "SPEAKER_00"]
+        assert merged[0]["text"] == "hello"
+        assert "speaker" not in transcript[0]
+
+    def test_matches_reference_on_random_input(self, adapter):
+        """Test results match the original nested-loop implementation."""
+        rng = random.Random(0)
+        transcript, diarization = [], []
+        for i in range(300):
+            start = rng.uniform(0, 600)
+            transcript.append({"start": start, "end": start + rng.uniform(0.1, 10), "text": str(i)})
+        for i in range(120):
+            start = rng.uniform(0, 600)
+            diarization.append({"start": start, "end": start + rng.uniform(0.1, 20), "speaker": f"SPEAKER_{i % 4:02d}"})
+
+        merged = adapter.merge_transcript_diarization(transcript, diarization)
+
+        assert [seg["speaker"] for seg in merged] == _reference_merge(transcript, diarization)
+
+    def test_incremental_merge_matches_reference_with_ties(self, adapter):
+        """Test one-segment-at-a-time merging, including tied overlaps."""
+        rng = random.Random(1)
+        transcript = [{"start": float(s), "end": float(s + rng.randint(1, 5))} for s in range(0, 200, 2)]
+        diarization = []
+        for i in range(80):
+            start = float(rng.randint(0, 200))
+            diarization.append({"start": start, "end": start + rng.randint(1, 8), "speaker": f"SPEAKER_{i % 5:02d}"})
+
+        speakers = [
+            adapter.merge_transcript_diarization([seg], diarization)[0]["speaker"] for seg in transcript
+        ]
+
+        assert speakers == _reference_merge(transcript, diarization)
+
+    def test_assign_word_speakers(self, adapter):
+        """Test words take the speaker of the turn containing their start."""
+        import numpy as np
+
+        from opensessionscribe.asr.columns import WordColumns
+
+        starts = np.array([0.5, 4.9, 5.0, 7.5, 12.0])
+        words = WordColumns(starts, starts + 0.2, np.ones(5), ["a", "b", "c", "d", "e"])
+        diarization = [
+            {"start": 5.0, "end": 7.0, "speaker": "SPEAKER_02"},
+            {"start": 0.0, "end": 5.0, "speaker": "SPEAKER_01"},
+        ]
+
+        adapter.assign_word_speakers(words, diarization)
+
+        assert words.speakers == ["SPEAKER_01", "SPEAKER_01", "SPEAKER_02", "SPEAKER_00", "SPEAKER_00"]
+        assert words[2]["speaker"] == "SPEAKER_02"
+
+    def test_assign_word_speakers_overlapping_turns(self, adapter):
+        """Test a long turn still labels words past a shorter turn nested in it."""
+        import numpy as np
+
+        from opensessionscribe.asr.columns import WordColumns
+
+        starts = np.array([1.0, 2.5, 5.0, 10.5])
+        words = WordColumns(starts, starts + 0.2, np.ones(4), ["a", "b", "c", "d"])
+        diarization = [
+            {"start": 0.0, "end": 10.0, "speaker": "A"},
+            {"start": 2.0, "end": 3.0, "speaker": "B"},
+        ]
+
+        adapter.assign_word_speakers(words, diarization)
+
+        assert words.speakers == ["A", "B", "A", "SPEAKER_00"]
@@ -2,16 +2,20 @@
 
 import pytest
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import create_autospec, patch
 
-from opensessionscribe.pipeline import ProcessingPipeline
+from opensessionscribe.asr.whisperx_adapter import WhisperXAdapter
+from opensessionscribe.diarize.pyannote_adapter import PyAnnoteAdapter
+from opensessionscribe.ingest.downloader import MediaDownloader
+from opensessionscribe.pipeline import ProcessingPipeline, _stream_write_package
 from opensessionscribe.config import Config
+from opensessionscribe.slides.processor import SlideProcessor
 
 
 class TestProcessingPipeline:
     """Test the main processing pipeline."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def config(self):
         """Create test configuration."""
         return Config(
@@ -22,19 +26,23 @@ class TestProcessingPipeline:
             offline_only=True
         )
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def pipeline(self, config):
-        """Create pipeline with mocked adapters."""
-        with patch.multiple(
-            'opensessionscribe.pipeline',
-            MediaDownloader=Mock(),
-            WhisperXAdapter=Mock(),
-            PyAnnoteAdapter=Mock(),
-            SlideDetector=Mock(),
-            OCRProcessor=Mock(),
-            VLMDescriber=Mock()
-        ):
-            return ProcessingPipeline(config)
+        """Create one pipeline per module with signature-checked mock adapters."""
+        return ProcessingPipeline(
+            config,
+            downloader=create_autospec(MediaDownloader, instance=True),
+            asr=create_autospec(WhisperXAdapter, instance=True),
+            diarizer=create_autospec(PyAnnoteAdapter, instance=True),
+            slide_processor=create_autospec(SlideProcessor, instance=True)
+        )
+    
+    @pytest.fixture(autouse=True)
+    def reset_mocks(self, pipeline):
+        """Clear calls and canned results left by the previous test."""
+        yield
+        for adapter in (pipeline.downloader, pipeline.asr, pipeline.diarizer, pipeline.slide_processor):
+            adapter.reset_mock(return_value=True, side_effect=True)
     
     def test_pipeline_initialization(self, pipeline, config):
         """Test pipeline initializes with correct config."""
@@ -59,10 +67,43 @@ class TestProcessingPipeline:
         pipeline.diarizer.diarize.return_value = {"segments": []}
         
         # Mock slide processing  
-        pipeline.slide_detector.detect_slides.return_value = [30.0, 60.0, 90.0]
-        pipeline.slide_detector.extract_frame = Mock()
-        pipeline.ocr.process_image.return_value = {"text": "Sample slide"}
+        pipeline.slide_processor.process_video.return_value = []
         
         # TODO: Complete test when methods are implemented
         # result = pipeline.process_url("https://example.com/video", tmp_path)
-        # assert result is not None
\ No newline at end of file
+        # assert result is not None
+
+class TestStreamWritePackage:
+    """Test incremental package.json serialization."""
+    
+    def test_matches_model_dump_json(self):
+        """Test streamed output is byte-identical to pydantic's own dump."""
+        import io
+        from datetime import datetime, timezone
+        
+        from opensessionscribe.schemas.package import (
+            Package, Source, Transcript, Segment, Word, Slide, OCRResult, Speaker
+        )
+        
+        segments = [
+            Segment(
+                id=f"seg_{i:06d}", start=float(i), end=i + 1.0, speaker="SPEAKER_00",
+                text="café \"quoted\"", words=[Word.from_values(float(i), i + 0.5, "café", 0.9)]
+            )
+            for i in range(3)
+        ]
+        package = Package(
+            source=Source(
+                type="video", url="https://example.com", downloaded_at=datetime.now(timezone.utc),
+                media_file="media.mp4", duration_sec=3.0
+            ),
+            transcript=Transcript(model="large-v3", diarization_model="pyannote", language="en", segments=segments),
+            slides=[Slide(index=0, timestamp=1.0, image_path="slides/0.png", ocr=OCRResult(engine="e", text="t", confidence=0.5))],
+            speakers=[Speaker(label="SPEAKER_00")],
+            notes={"nested": {"empty": []}}
+        )
+        
+        buffer = io.BytesIO()
+        _stream_write_package(package, buffer)
+        
+        assert buffer.getvalue() == package.model_dump_json(indent=2).encode("utf-8")
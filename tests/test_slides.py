@@ -0,0 +1,135 @@
+"""Tests for slide detection helpers."""
+
+import pytest
+
+from opensessionscribe.config import Config
+from opensessionscribe.slides.detector import SlideDetector
+
+
+class TestDeduplicateSlides:
+    """Test perceptual-hash slide deduplication."""
+
+    def test_matches_pairwise_comparison(self, tmp_path):
+        """Test vectorized dedup keeps the same slides as comparing hash objects pairwise."""
+        np = pytest.importorskip("numpy")
+        imagehash = pytest.importorskip("imagehash")
+        from PIL import Image
+
+        rng = np.random.default_rng(0)
+        bases = [rng.integers(0, 255, (64, 64), dtype=np.uint8) for _ in range(4)]
+        slide_paths = []
+        for i in range(24):
+            pixels = bases[i % 4].copy()
+            pixels[rng.integers(0, 64, 20), rng.integers(0, 64, 20)] = 0
+            slide_paths.append(tmp_path / f"slide_{i:03d}.png")
+            Image.fromarray(pixels).save(slide_paths[-1])
+        unreadable = tmp_path / "broken.png"
+        unreadable.write_bytes(b"not an image")
+        slide_paths.insert(5, unreadable)
+
+        expected, kept_hashes = [], []
+        for path in slide_paths:
+            try:
+                with Image.open(path) as image:
+                    dhash = imagehash.dhash(image)
+            except Exception:
+                expected.append(path)
+                continue
+            if not any(dhash - kept < 8 for kept in kept_hashes):
+                expected.append(path)
+                kept_hashes.append(dhash)
+
+        unique = SlideDetector(Config(force_cpu=True, slide_dedup_window=0)).deduplicate_slides(slide_paths)
+
+        assert unique == expected
+        assert unreadable in unique
+        assert len(unique) < len(slide_paths)
+
+    def test_window_only_compares_recent_slides(self, tmp_path):
+        """Test a slide repeated after the window is kept, but dropped with the window disabled."""
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("imagehash")
+        from PIL import Image
+
+        rng = np.random.default_rng(1)
+        bases = [rng.integers(0, 255, (64, 64), dtype=np.uint8) for _ in range(4)]
+        slide_paths = []
+        for i, base in enumerate(bases + bases[:1]):
+            slide_paths.append(tmp_path / f"slide_{i:03d}.png")
+            Image.fromarray(base).save(slide_paths[-1])
+
+        windowed = SlideDetector(Config(force_cpu=True, slide_dedup_window=3)).deduplicate_slides(slide_paths)
+        unbounded = SlideDetector(Config(force_cpu=True, slide_dedup_window=0)).deduplicate_slides(slide_paths)
+
+        assert windowed == slide_paths
+        assert unbounded == slide_paths[:4]
+
+
+class TestVLMDescriptionCache:
+    """Test caching VLM descriptions by perceptual hash."""
+
+    def test_repeat_slide_skips_model(self, tmp_path, monkeypatch):
+        """Test a re-extracted copy of a described slide is served from the cache."""
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("imagehash")
+        from PIL import Image
+
+        from opensessionscribe.slides.vlm_describer import VLMDescriber
+
+        pixels = np.random.default_rng(2).integers(0, 255, (64, 64), dtype=np.uint8)
+        first, second = tmp_path / "a.png", tmp_path / "b.png"
+        Image.fromarray(pixels).save(first)
+        Image.fromarray(pixels).save(second)
+
+        calls = []
+
+        def fake_generate(image_path, prompt, image=None):
+            calls.append(image_path)
+            return {"description": "A chart", "bullets": ["up"], "chart_info": None, "ascii_art": None}
+
+        describer = VLMDescriber(Config(force_cpu=True, cache_dir=tmp_path / "cache"))
+        monkeypatch.setattr(describer, "_generate", fake_generate)
+
+        assert describer.describe_slide(first, "Q3")["description"] == "A chart"
+        assert describer.describe_slide(second, "Q3")["bullets"] == ["up"]
+        assert calls == [first]
+
+        describer.describe_slide(second, "Q4")
+        assert calls == [first, second]
+
+
+class TestVLMStructuredResponse:
+    """Test parsing JSON-mode VLM responses."""
+
+    def test_invalid_json_retries_without_json_mode(self, tmp_path):
+        """Test a response failing the schema is retried once in free-text mode."""
+        from opensessionscribe.slides.vlm_describer import VLMDescriber
+
+        image = tmp_path / "slide.png"
+        image.write_bytes(b"not really a png")
+        replies = iter(['{"bullets": "not a list"}', 'Sure! {"description": "Revenue", "chart_type": "bar"}'])
+        formats = []
+
+        class FakeResponse:
+            def __init__(self, text):
+                self.text = text
+
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return {"response": self.text}
+
+        class FakeClient:
+            def post(self, url, json):
+                formats.append(json["format"])
+                return FakeResponse(next(replies))
+
+        describer = VLMDescriber(Config(force_cpu=True, cache_dir=tmp_path / "cache"))
+        describer.client = FakeClient()
+
+        result = describer._generate(image, "prompt")
+
+        assert formats == ["json", ""]
+        assert result["description"] == "Revenue"
+        assert result["chart_info"] == {"type": "bar", "trend": None}
@@ -0,0 +1,231 @@
+"""Tests for utility helpers."""
+
+import json
+
+import pytest
+
+from opensessionscribe.asr.columns import WordColumns
+from opensessionscribe.ingest.downloader import make_safe_title
+from opensessionscribe.utils import ffmpeg, jsonio
+from opensessionscribe.utils.jsonio import write_json
+
+
+class TestJsonIO:
+    """Test streaming JSON output."""
+
+    @pytest.fixture(autouse=True, params=["orjson", "stdlib"])
+    def encoder(self, request, monkeypatch):
+        """Run each test with orjson (when installed) and with the stdlib fallback."""
+        if request.param == "stdlib":
+            monkeypatch.setattr(jsonio, "orjson", None)
+        elif jsonio.orjson is None:
+            pytest.skip("orjson not installed")
+        return request.param
+
+    def test_write_json_matches_stdlib(self, tmp_path):
+        """Test streamed output is identical to json.dump with indent=2."""
+        data = {
+            "language": "en",
+            "segments": [
+                {"id": "seg_000000", "start": 0.0, "end": 1.5, "text": "héllo", "words": []},
+                {"id": "seg_000001", "start": 1.5, "end": 3.0, "text": "world", "words": [{"text": "world"}]},
+            ],
+            "summary": {"total_segments": 2, "speakers": []},
+        }
+        output = tmp_path / "out.json"
+
+        write_json(output, data)
+
+        assert output.read_text(encoding="utf-8") == json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+    def test_write_json_streams_word_columns(self, tmp_path):
+        """Test columnar word stores serialize like the equivalent dict list."""
+        segments = [
+            {"words": [{"start": 0.0, "end": 0.4, "text": "héllo", "conf": 0.91}]},
+            {"words": []},
+            {"words": [{"start": 1.5, "end": 1.9, "text": "world", "conf": 0.5}]},
+        ]
+        columns = WordColumns.from_segments(segments)
+        output = tmp_path / "out.json"
+
+        write_json(output, {"word_segments": columns})
+
+        expected = {"word_segments": [w for seg in segments for w in seg["words"]]}
+        assert len(columns) == 2
+        assert output.read_text(encoding="utf-8") == json.dumps(expected, indent=2, ensure_ascii=False) + "\n"
+
+    def test_numpy_values_serialize(self):
+        """Test numpy arrays and scalars encode the same with either encoder."""
+        import numpy as np
+
+        data = {"starts": np.array([0.5, 1.25]), "count": np.int64(2), "conf": np.float32(0.5)}
+
+        assert json.loads(jsonio.dumps(data)) == {"starts": [0.5, 1.25], "count": 2, "conf": 0.5}
+
+
+class TestMediaInfoCache:
+    """Test ffprobe result caching."""
+
+    def test_probe_runs_once_per_file_version(self, tmp_path, monkeypatch):
+        """Test repeated lookups hit the memory and disk caches until the file changes."""
+        calls = []
+
+        def fake_probe(path):
+            calls.append(path)
+            return {"duration": 12.5, "size_bytes": path.stat().st_size}
+
+        monkeypatch.setattr(ffmpeg.FFmpegProcessor, "_probe_media_info", staticmethod(fake_probe))
+        ffmpeg._media_info_cached.cache_clear()
+        media = tmp_path / "media.mp4"
+        media.write_bytes(b"abc")
+        cache_dir = tmp_path / "cache"
+
+        first = ffmpeg.FFmpegProcessor.get_media_info(media, cache_dir)
+        first["url"] = "mutated by caller"
+        ffmpeg._media_info_cached.cache_clear()  # Simulate a new process
+        second = ffmpeg.FFmpegProcessor.get_media_info(media, cache_dir)
+
+        assert second == {"duration": 12.5, "size_bytes": 3}
+        assert len(calls) == 1
+
+        media.write_bytes(b"abcdef")
+        assert ffmpeg.FFmpegProcessor.get_media_info(media, cache_dir)["size_bytes"] == 6
+        assert len(calls) == 2
+
+    def test_frame_rate_is_parsed_not_evaluated(self, tmp_path, monkeypatch):
+        """Test ffprobe frame rates are parsed as fractions and malformed ones are not executed."""
+        import subprocess
+
+        rates = iter(["30000/1001", "0/0", "__import__('os').getcwd()"])
+
+        def fake_run(cmd, **kwargs):
+            probe = {
+                "format": {"duration": "1.0"},
+                "streams": [{"codec_type": "video", "r_frame_rate": next(rates)}],
+            }
+            return subprocess.CompletedProcess(cmd, 0, stdout=json.dumps(probe), stderr="")
+
+        monkeypatch.setattr(subprocess, "run", fake_run)
+        probe = ffmpeg.FFmpegProcessor._probe_media_info
+
+        assert abs(probe(tmp_path / "a.mp4")["video"]["fps"] - 29.97) < 0.01
+        assert probe(tmp_path / "b.mp4")["video"]["fps"] == 0.0
+        assert probe(tmp_path / "c.mp4")["video"]["fps"] == 0.0
+
+
+class TestPerceptualHash:
+    """Test perceptual hashing of slide images."""
+
+    def test_reduced_jpeg_decode_stays_close_to_full_decode(self, tmp_path):
+        """Test draft-mode JPEG hashes stay well inside the dedup threshold."""
+        np = pytest.importorskip("numpy")
+        imagehash = pytest.importorskip("imagehash")
+        from PIL import Image
+
+        from opensessionscribe.utils.hashing import perceptual_hash
+
+        rng = np.random.default_rng(0)
+        for i in range(10):
+            cells = rng.integers(0, 255, (9, 16), dtype=np.uint8)
+            image = Image.fromarray(cells).resize((1920, 1080), Image.NEAREST).convert("RGB")
+            path = tmp_path / f"slide_{i}.jpg"
+            image.save(path, quality=85)
+
+            with Image.open(path) as full:
+                expected = imagehash.dhash(full)
+
+            assert expected - imagehash.hex_to_hash(perceptual_hash(path)) <= 2
+
+
+class TestManifest:
+    """Test manifest generation and verification."""
+
+    @pytest.mark.parametrize("algorithm", ["sha256", "blake3"])
+    def test_round_trip(self, tmp_path, algorithm):
+        """Test a generated manifest verifies until a file changes."""
+        if algorithm == "blake3":
+            pytest.importorskip("blake3")
+        from opensessionscribe.utils.hashing import generate_manifest, verify_manifest
+
+        (tmp_path / "slides").mkdir()
+        (tmp_path / "slides" / "slide_000.jpg").write_bytes(b"\xff\xd8" * 1000)
+        (tmp_path / "empty.txt").write_bytes(b"")
+
+        manifest = generate_manifest(tmp_path, algorithm)
+
+        assert verify_manifest(tmp_path, manifest)
+        assert list(manifest["empty.txt"]) == [algorithm]
+        (tmp_path / "empty.txt").write_bytes(b"changed")
+        assert not verify_manifest(tmp_path, manifest)
+
+    def test_stat_fast_path_skips_unchanged_files(self, tmp_path, monkeypatch):
+        """Test files with unchanged size and mtime are not re-hashed."""
+        import os
+
+        from opensessionscribe.utils import hashing
+
+        media = tmp_path / "media.mp4"
+        media.write_bytes(b"original")
+        manifest = hashing.generate_manifest(tmp_path, with_stat=True)
+
+        hashed = []
+        real_file_hash = hashing.file_hash
+        monkeypatch.setattr(hashing, "file_hash", lambda path, algorithm: hashed.append(path) or real_file_hash(path, algorithm))
+
+        assert hashing.verify_manifest(tmp_path, manifest)
+        assert hashed == []
+
+        stat = media.stat()
+        media.write_bytes(b"tampered")  # Same size, mtime restored
+        os.utime(media, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert hashing.verify_manifest(tmp_path, manifest)
+        assert not hashing.verify_manifest(tmp_path, manifest, trust_stat=False)
+
+    def test_verifies_package_json_entries(self, tmp_path):
+        """Test the entry list stored in package.json verifies like the manifest dict."""
+        from opensessionscribe.utils.hashing import generate_manifest, verify_manifest
+
+        (tmp_path / "audio.wav").write_bytes(b"wav")
+        manifest = generate_manifest(tmp_path, with_stat=True)
+        entries = [{"path": rel_path, **entry} for rel_path, entry in manifest.items()]
+
+        assert verify_manifest(tmp_path, entries)
+        (tmp_path / "audio.wav").write_bytes(b"changed")
+        assert not verify_manifest(tmp_path, entries)
+
+    def test_iter_files_skips_excluded_names_and_symlinks(self, tmp_path):
+        """Test the walker recurses, drops excluded names and ignores symlinks."""
+        import os
+
+        from opensessionscribe.utils.hashing import iter_files
+
+        (tmp_path / "slides").mkdir()
+        (tmp_path / "slides" / "slide_000.jpg").write_bytes(b"jpg")
+        (tmp_path / "package.json").write_text("{}")
+        (tmp_path / "audio.wav").write_bytes(b"wav")
+        if hasattr(os, "symlink"):
+            (tmp_path / "link.wav").symlink_to(tmp_path / "audio.wav")
+            (tmp_path / "slides_link").symlink_to(tmp_path / "slides")
+
+        found = sorted(os.path.relpath(e.path, tmp_path) for e in iter_files(tmp_path, exclude=("package.json",)))
+
+        assert found == ["audio.wav", os.path.join("slides", "slide_000.jpg")]
+
+
+class TestSafeTitle:
+    """Test media titles become filesystem-safe file stems."""
+
+    def test_ascii_punctuation_is_dropped(self):
+        """Test unsafe ASCII is removed and path separators are replaced."""
+        assert make_safe_title('Talk: "Q&A" 1/2') == "Talk QA 1_2"
+
+    def test_non_ascii_letters_are_kept(self):
+        """Test CJK and accented titles keep their letters intact."""
+        assert make_safe_title("データ分析") == "データ分析"
+        assert make_safe_title("Ελληνικά") == "Ελληνικά"
+        assert make_safe_title("Café Résumé") == "Café Résumé"
+        assert make_safe_title("Cafe\u0301") == "Café"
+
+    def test_full_width_is_folded(self):
+        """Test full-width characters fold to ASCII and emoji are dropped."""
+        assert make_safe_title("ＡＢＣ １２３ 🎉") == "ABC 123 "